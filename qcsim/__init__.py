@@ -0,0 +1,33 @@
+"""Quantum Causality Simulator engine.
+
+Importing this package only loads NumPy; the Tk/matplotlib front-end
+lives in `qcsim.gui` and is imported on demand.
+"""
+from .engine import LocalCellState, FinalGridSimulator, SimulationParams
+from .ensemble import EnsembleSimulator
+from .entanglement import EntanglementRegistry
+from .rng import SimulationRNG
+from .regions import RegionMap, REGION_FIELDS
+from .topology import GraphTopology, TOPOLOGIES
+from .snapshots import SnapshotRecorder, SnapshotArchive
+from .checkpoint import save_checkpoint, load_checkpoint
+from .profiling import PhaseProfiler
+from .framebus import FramePublisher, FrameViewer
+from .cache import ResultCache, RunResult, run_key
+from .stats import RunningStats, merge_stats
+from .diffusion import DiffusionKernel, DIFFUSION_BOUNDARIES
+from .events import (StepEvents, EVENT_KINDS, EVENT_BLACK_HOLE, EVENT_OBSERVATION,
+                     EVENT_ENTANGLEMENT_CREATED, EVENT_ENTANGLEMENT_EFFECT,
+                     LOG_OFF, LOG_SUMMARY, LOG_EVENTS)
+
+__all__ = [
+    'LocalCellState', 'FinalGridSimulator', 'SimulationParams', 'EnsembleSimulator', 'EntanglementRegistry',
+    'SimulationRNG', 'RegionMap', 'REGION_FIELDS', 'GraphTopology', 'TOPOLOGIES',
+    'SnapshotRecorder', 'SnapshotArchive',
+    'save_checkpoint', 'load_checkpoint', 'PhaseProfiler', 'RunningStats', 'merge_stats',
+    'FramePublisher', 'FrameViewer', 'ResultCache', 'RunResult', 'run_key',
+    'DiffusionKernel', 'DIFFUSION_BOUNDARIES',
+    'StepEvents', 'EVENT_KINDS', 'EVENT_BLACK_HOLE', 'EVENT_OBSERVATION',
+    'EVENT_ENTANGLEMENT_CREATED', 'EVENT_ENTANGLEMENT_EFFECT',
+    'LOG_OFF', 'LOG_SUMMARY', 'LOG_EVENTS',
+]
@@ -0,0 +1,214 @@
+"""Benchmark suite: step throughput, memory, per-step allocations, frame time and export speed.
+
+    python -m qcsim bench --out bench.json
+    python -m qcsim bench --out new.json --baseline bench.json --threshold 0.15
+    python -m qcsim bench --quick
+
+Results are a JSON file of named metrics. With --baseline, every metric
+present in both files is compared and the command fails when any one is
+worse than the baseline by more than the threshold (relative).
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .engine import FinalGridSimulator, SimulationParams
+from .events import LOG_OFF
+from .topology import GraphTopology
+
+GRID_SIZES = (5, 64, 256, 1024)
+QUICK_SIZES = (5, 64)
+FRAME_SIZES = (5, 64, 256)
+
+# Parameter regimes: name -> SimulationParams overrides
+REGIMES = {
+    'default': {},
+    'chaos': {'causality_strength': 0.1},
+    'determinism': {'causality_strength': 1.0},
+    'bh_heavy': {'bh_prob': 0.2},
+}
+
+def _metric(value, unit, higher_is_better):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+def _timed_steps(sim, min_time, max_steps):
+    """Steps/s over at least `min_time` seconds (or `max_steps` steps)."""
+    steps = 0
+    start = time.perf_counter()
+    while steps < max_steps:
+        sim.step()
+        steps += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    return steps / elapsed
+
+def bench_step(size, regime, min_time=1.0, warmup=3, repeat=3):
+    """Best steps/s of `repeat` runs, and peak traced memory (bytes) of a short run."""
+    params = SimulationParams().replace(**REGIMES[regime])
+    sim = FinalGridSimulator(size=size, seed=0, log_level=LOG_OFF, params=params)
+    for _ in range(warmup):
+        sim.step()
+    rate = max(_timed_steps(sim, min_time / repeat, max_steps=100000) for _ in range(repeat))
+
+    # Peak memory in a separate run: tracemalloc slows stepping down
+    tracemalloc.start()
+    sim = FinalGridSimulator(size=size, seed=0, log_level=LOG_OFF, params=params)
+    for _ in range(warmup + 2):
+        sim.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rate, peak
+
+def bench_step_alloc(size, steps=20, warmup=3, params=None, topology=None):
+    """Median bytes allocated (tracemalloc peak above the starting point) by one steady-state step.
+
+    The dense per-cell work (random draws, events, diffusion, on the
+    lattice or a `topology`) runs in reused buffers and allocates nothing
+    that scales with the grid. What remains are the rare-event records:
+    the number of black holes and observations per step is proportional
+    to the cell count.
+    """
+    sim = FinalGridSimulator(size=size, seed=0, log_level=LOG_OFF, params=params, topology=topology)
+    for _ in range(warmup):
+        sim.step()
+    tracemalloc.start()
+    peaks = []
+    for _ in range(steps):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        sim.step()
+        peaks.append(tracemalloc.get_traced_memory()[1] - start)
+    tracemalloc.stop()
+    return statistics.median(peaks)
+
+def bench_frame(size, frames=60, warmup=10):
+    """Mean and fastest Agg frame time (ms) of the renderer behind `SimulationGUI.update_plots`.
+
+    No display is needed. The mean includes the full redraws triggered by
+    growing colour scales and axis ranges; the fastest frame is a blit.
+    """
+    import logging
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from .gui import FieldView, StatsView, FrameRenderer, MinMaxSeries
+    # The GUI asks for Arial, which headless machines often lack
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+    sim = FinalGridSimulator(size=size, seed=0, log_level=LOG_OFF)
+    fig, ((a1, a2), (a3, a4)) = plt.subplots(2, 2, figsize=(7, 5))
+    fields = [FieldView(fig, ax, sim.shape, title, cmap, 'w', title, sim.regions)
+              for ax, title, cmap in ((a1, 'T', 'inferno'), (a2, 'F', 'viridis'), (a3, 'O', 'plasma'))]
+    fig.tight_layout()
+    renderer = FrameRenderer(fig, fig.canvas, fields, StatsView(a4, a4.twinx()))
+    entropy, temp = MinMaxSeries(), MinMaxSeries()
+    v_max = [1, 1, 1]
+    times = []
+    for k in range(warmup + frames):
+        _, t, f, o, bh, ent = sim.step()
+        entropy.append(sim.step_count, float(f.sum()))
+        temp.append(sim.step_count, float(t.sum()))
+        v_max = [max(v_max[0], t.max()), max(v_max[1], f.max()), max(v_max[2], o.max())]
+        start = time.perf_counter()
+        renderer.update((t, f, o), v_max, bh, ent, entropy, temp)
+        if k >= warmup:
+            times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return statistics.mean(times) * 1000, min(times) * 1000
+
+def bench_export(steps=5000):
+    sim = FinalGridSimulator(size=5, seed=0, log_level=LOG_OFF)
+    for _ in range(steps):
+        sim.step()
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        sim.export_to_csv(path)
+        return steps / (time.perf_counter() - start)
+    finally:
+        os.remove(path)
+
+def run_benchmarks(sizes=GRID_SIZES, regimes=tuple(REGIMES), frame_sizes=FRAME_SIZES, min_time=1.0,
+                   log=print):
+    results = {}
+    for size in sizes:
+        for regime in regimes:
+            rate, peak = bench_step(size, regime, min_time=min_time)
+            results[f"step.{regime}.{size}"] = _metric(rate, 'steps/s', True)
+            results[f"peak_memory.{regime}.{size}"] = _metric(peak, 'bytes', False)
+            log(f"step {regime:<12} {size:>5}: {rate:10.1f} steps/s | peak {peak / 2**20:8.2f} MiB")
+        alloc = bench_step_alloc(size)
+        results[f"step_alloc.{size}"] = _metric(alloc, 'bytes', False)
+        log(f"step allocations   {size:>5}: {alloc / 1024:10.1f} KiB/step ({alloc / (size * size * 8):.2f} fields)")
+        alloc = bench_step_alloc(size, topology=GraphTopology.hexagonal(size))
+        results[f"step_alloc.hex.{size}"] = _metric(alloc, 'bytes', False)
+        log(f"step allocations hex {size:>3}: {alloc / 1024:10.1f} KiB/step ({alloc / (size * size * 8):.2f} fields)")
+    for size in frame_sizes:
+        try:
+            mean, blit = bench_frame(size)
+        except ImportError as e:
+            log(f"frame {size}: skipped ({e})")
+            continue
+        results[f"frame_ms.{size}"] = _metric(mean, 'ms', False)
+        results[f"frame_blit_ms.{size}"] = _metric(blit, 'ms', False)
+        log(f"frame              {size:>5}: {mean:10.2f} ms mean | {blit:8.2f} ms blit")
+    rate = bench_export()
+    results['export_csv'] = _metric(rate, 'rows/s', True)
+    log(f"export_csv              : {rate:10.0f} rows/s")
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+def compare(current, baseline, threshold):
+    """[(name, baseline, current, relative change, regressed)] for metrics in both runs.
+
+    The relative change is positive when the metric got better.
+    """
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None or not old['value']:
+            continue
+        change = (new['value'] - old['value']) / old['value']
+        if not new['higher_is_better']:
+            change = -change
+        rows.append((name, old['value'], new['value'], change, change < -threshold))
+    return rows
+
+def main(out=None, baseline=None, threshold=0.1, quick=False, min_time=1.0):
+    sizes = QUICK_SIZES if quick else GRID_SIZES
+    frame_sizes = QUICK_SIZES if quick else FRAME_SIZES
+    report = run_benchmarks(sizes=sizes, frame_sizes=frame_sizes, min_time=min_time)
+    if out:
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    if not baseline:
+        return 0
+    with open(baseline, encoding='utf-8') as f:
+        base = json.load(f)
+    regressions = 0
+    print(f"\nCompared with {baseline} (threshold {threshold:.0%}):")
+    for name, old, new, change, regressed in compare(report, base, threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<28} {old:14.2f} -> {new:14.2f} {change:+8.1%} {flag}")
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,299 @@
+"""Content-addressed on-disk cache of complete runs.
+
+    cache = ResultCache('~/.cache/qcsim', max_bytes=2**30)
+    result = cache.run(size=32, steps=500, seed=7, params=SimulationParams(causality_strength=0.5))
+    result.step_data, result.total_entropy_history, result.cached
+
+A run is identified by a SHA-256 over everything that determines its
+output: ENGINE_VERSION, size, steps, seed, RNG block size, boundary, all
+SimulationParams, and the region map and graph topology arrays. Runs
+without a seed are random and are never cached.
+
+Each result is one .npz of the step_data columns (the histories are the
+total_entropy/total_temperature columns), written to a private temporary
+file in `tmp/` and renamed into place, so readers in other processes see
+either nothing or a complete file. A hit refreshes the file's mtime,
+which is the LRU order: when the stored bytes exceed `max_bytes`, the
+least recently used results are deleted.
+
+`stats.json` holds the hit/miss counters and an index of the stored
+entries and bytes, updated by every store and eviction, so neither
+`put()` nor `stats()` walks the object tree. The tree is scanned only
+when the index says the cache is over its limit, every SCAN_EVERY
+stores, and on an explicit `evict()`. A scan re-syncs the index, counts
+temporaries towards the limit, deletes those older than `tmp_max_age`
+(left by crashed writers) and removes empty shard directories. All of
+this is serialised across processes with a lock file.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from .engine import ENGINE_VERSION, FinalGridSimulator, SimulationParams, default_regions
+from .events import LOG_OFF
+from .metrics import STEP_FIELDS, FIELD_DTYPES
+from .rng import SimulationRNG
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, renames stay atomic
+    fcntl = None
+
+STAT_FIELDS = ('hits', 'misses', 'uncacheable', 'stores', 'evictions', 'evicted_bytes')
+# The index of what is stored; 'bytes' is None until the first scan
+INDEX_FIELDS = ('bytes', 'entries', 'unscanned')
+SCAN_EVERY = 256
+
+def run_key(size, steps, seed, params=None, boundary='open', regions=None, topology=None, rng_block=1):
+    """Hex SHA-256 identifying the run, or None when it is not reproducible (no seed)."""
+    if seed is None:
+        return None
+    params = params if params is not None else SimulationParams()
+    regions = regions if regions is not None else default_regions(size, topology)
+    config = {
+        'engine': ENGINE_VERSION, 'size': size, 'steps': steps, 'seed': seed, 'rng_block': rng_block,
+        'boundary': boundary if topology is None else topology.boundary,
+        'params': params.to_dict(),
+    }
+    h = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8'))
+    for name, a in sorted(regions.to_arrays().items()):
+        h.update(name.encode('utf-8'))
+        h.update(np.ascontiguousarray(a).tobytes())
+    if topology is not None:
+        arrays = topology.to_arrays()
+        for name in ('nodes', 'indptr', 'indices', 'weights'):
+            h.update(name.encode('utf-8'))
+            h.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return h.hexdigest()
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class RunResult:
+    """Per-step output of one run: `step_data` rows and the two total histories."""
+    def __init__(self, key, columns, cached=False):
+        self.key = key
+        self.columns = columns
+        self.cached = cached
+
+    @classmethod
+    def from_simulator(cls, key, sim):
+        columns = {name: np.array([row[name] for row in sim.step_data], dtype=FIELD_DTYPES[name])
+                   for name in STEP_FIELDS}
+        return cls(key, columns)
+
+    @property
+    def steps(self):
+        return len(self.columns['step'])
+
+    @property
+    def step_data(self):
+        lists = [self.columns[name].tolist() for name in STEP_FIELDS]
+        return [dict(zip(STEP_FIELDS, values)) for values in zip(*lists)]
+
+    @property
+    def total_entropy_history(self):
+        return self.columns['total_entropy']
+
+    @property
+    def total_temp_history(self):
+        return self.columns['total_temperature']
+
+class ResultCache:
+    """Size-bounded LRU cache of RunResults in directory `path`, shareable between processes."""
+    def __init__(self, path, max_bytes=1 << 30, tmp_max_age=3600.0):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.tmp_max_age = tmp_max_age
+        self._objects = os.path.join(self.path, 'objects')
+        self._tmp = os.path.join(self.path, 'tmp')
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self._objects, key[:2], f"{key}.npz")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(os.path.join(self.path, 'lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stats_path(self):
+        return os.path.join(self.path, 'stats.json')
+
+    def _read_stats(self):
+        try:
+            with open(self._stats_path(), encoding='utf-8') as f:
+                stats = json.load(f)
+        except (FileNotFoundError, ValueError):
+            stats = {}
+        out = {name: int(stats.get(name, 0)) for name in STAT_FIELDS}
+        out.update((name, stats.get(name)) for name in INDEX_FIELDS)
+        return out
+
+    def _write_stats(self, stats):
+        tmp = f"{self._stats_path()}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+        os.replace(tmp, self._stats_path())
+
+    def _count(self, **increments):
+        with self._locked():
+            stats = self._read_stats()
+            for name, n in increments.items():
+                stats[name] += n
+            self._write_stats(stats)
+
+    def stats(self):
+        """Counters over every process that used this cache, plus the current entries and bytes."""
+        stats = self._read_stats()
+        if stats['bytes'] is None:
+            # No index yet (a new or cleared cache): build it
+            self.evict(max_bytes=float('inf'))
+            stats = self._read_stats()
+        out = {name: stats[name] for name in STAT_FIELDS + ('entries', 'bytes')}
+        lookups = out['hits'] + out['misses']
+        out['hit_rate'] = out['hits'] / lookups if lookups else 0.0
+        return out
+
+    def get(self, key):
+        """The cached RunResult for `key`, or None (a miss)."""
+        path = self._file(key)
+        try:
+            with np.load(path) as data:
+                columns = {name: data[name] for name in STEP_FIELDS}
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            # Absent, or evicted/replaced by another process while we looked
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        return RunResult(key, columns, cached=True)
+
+    def put(self, result):
+        """Store `result` under its key, then evict least recently used results beyond `max_bytes`."""
+        path = self._file(result.key)
+        tmp = os.path.join(self._tmp, f"{result.key}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(f, **result.columns)
+        size = os.path.getsize(tmp)
+        with self._locked():
+            # Under the lock: eviction removes empty shard directories
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                old = os.stat(path).st_size
+            except FileNotFoundError:
+                old = None
+            os.replace(tmp, path)
+            stats = self._read_stats()
+            stats['stores'] += 1
+            if stats['bytes'] is not None:
+                stats['bytes'] += size - (old or 0)
+                stats['entries'] += old is None
+                stats['unscanned'] += 1
+            self._write_stats(stats)
+        self.evict()
+
+    def _scan(self):
+        """([(path, bytes, mtime)] of stored results, the same for temporaries, [shard directories])."""
+        entries, temporaries, shards = [], [], []
+        for root in [self._tmp] + [e.path for e in os.scandir(self._objects) if e.is_dir()]:
+            if root != self._tmp:
+                shards.append(root)
+            for entry in os.scandir(root):
+                if entry.name.endswith('.npz'):
+                    found = entries
+                elif entry.name.endswith('.tmp'):
+                    found = temporaries
+                else:
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((entry.path, st.st_size, st.st_mtime))
+        return entries, temporaries, shards
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used results until at most `max_bytes` (default: the limit) remain.
+
+        With the default limit this only reads the index unless a scan is
+        due; an explicit `max_bytes` always scans.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._locked():
+            stats = self._read_stats()
+            if (max_bytes is None and stats['bytes'] is not None and stats['bytes'] <= limit
+                    and stats['unscanned'] < SCAN_EVERY):
+                return 0
+            entries, temporaries, shards = self._scan()
+            stored = sum(size for _, size, _ in entries)
+            pending = evicted = freed = 0
+            stale = time.time() - self.tmp_max_age
+            for path, size, mtime in temporaries:
+                if mtime < stale:
+                    _remove(path)
+                    freed += size
+                else:
+                    # Being written: counts towards the limit but cannot be deleted
+                    pending += size
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                if stored + pending <= limit:
+                    break
+                _remove(path)
+                stored -= size
+                evicted += 1
+                freed += size
+            for shard in shards:
+                try:
+                    os.rmdir(shard)
+                except OSError:
+                    pass  # not empty
+            stats['evictions'] += evicted
+            stats['evicted_bytes'] += freed
+            stats.update(bytes=stored, entries=len(entries) - evicted, unscanned=0)
+            self._write_stats(stats)
+        return evicted
+
+    def clear(self):
+        """Remove every result and reset the counters."""
+        self.evict(max_bytes=0)
+        with self._locked():
+            try:
+                os.remove(self._stats_path())
+            except FileNotFoundError:
+                pass
+
+    def run(self, size=5, steps=500, seed=None, params=None, boundary='open', regions=None, topology=None,
+            rng_block=1):
+        """The result of this run: from the cache if present, else simulated (and stored when seeded)."""
+        key = run_key(size, steps, seed, params, boundary, regions, topology, rng_block)
+        if key is not None:
+            result = self.get(key)
+            if result is not None:
+                return result
+        else:
+            self._count(uncacheable=1)
+        sim = FinalGridSimulator(size=size, boundary=boundary, log_level=LOG_OFF,
+                                 params=params.replace() if params is not None else None,
+                                 rng=SimulationRNG(seed, block_steps=rng_block), regions=regions, topology=topology)
+        for _ in range(steps):
+            sim.step()
+        sim.close()
+        result = RunResult.from_simulator(key, sim)
+        if key is not None:
+            self.put(result)
+        return result
@@ -0,0 +1,125 @@
+"""Checkpoint/restore of the complete FinalGridSimulator state.
+
+A checkpoint is one uncompressed .npz file: the cell arrays, the region
+map, any graph topology, the in-memory histories, the RNG block and any running statistics as arrays, plus a JSON `meta`
+entry with the parameters, counters and bit generator states. Files are
+written to a temporary name, fsynced and renamed, so a checkpoint on
+disk is always complete. A simulator restored from a checkpoint
+continues bit-identically to the one that wrote it.
+"""
+import json
+import os
+
+import numpy as np
+
+from .engine import FinalGridSimulator, SimulationParams
+from .metrics import MetricsSink, STEP_FIELDS, FIELD_DTYPES
+from .regions import RegionMap
+from .rng import SimulationRNG
+from .snapshots import SnapshotRecorder
+from .stats import RunningStats
+from .topology import GraphTopology
+
+CHECKPOINT_VERSION = 4
+
+# Cell arrays saved verbatim; the per-cell parameter arrays are rebuilt from params and regions
+STATE_ARRAYS = ('local_temperature', 'entropy_fragments', 'postponed_buffer',
+                'observation_count', 'entangled_with')
+
+def save_checkpoint(sim, path):
+    """Write the full state of `sim` to `path` atomically.
+
+    Attached metrics and snapshot streams are flushed first, and their
+    lengths recorded, so they can be resumed in step with the simulator.
+    """
+    if type(sim) is not FinalGridSimulator:
+        raise TypeError(f"Checkpointing {type(sim).__name__} is not supported")
+    if sim.metrics is not None:
+        sim.metrics.checkpoint()
+    if sim.snapshots is not None:
+        sim.snapshots.flush()
+
+    rng_meta, rng_arrays = sim.rng.get_state()
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'size': sim.size,
+        'boundary': sim.diffusion.boundary,
+        'log_level': sim.log_level,
+        'params': sim.params.to_dict(),
+        'step_count': sim.step_count,
+        'bh_events': int(sim.bh_events),
+        'rng': rng_meta,
+        'metrics_rows': sim.metrics.rows_written if sim.metrics is not None else None,
+        'snapshot_frames': sim.snapshots.count if sim.snapshots is not None else None,
+        'stats': sim.stats is not None,
+        'topology': isinstance(sim.diffusion, GraphTopology),
+    }
+    arrays = {name: getattr(sim, name) for name in STATE_ARRAYS}
+    arrays.update((f"rng_{name}", a) for name, a in rng_arrays.items())
+    arrays.update((f"region_{name}", a) for name, a in sim.regions.to_arrays().items())
+    if meta['topology']:
+        arrays.update((f"topology_{name}", a) for name, a in sim.diffusion.to_arrays().items())
+    arrays['total_entropy_history'] = np.asarray(sim.total_entropy_history, dtype=np.float64)
+    arrays['total_temp_history'] = np.asarray(sim.total_temp_history, dtype=np.float64)
+    for name in STEP_FIELDS:
+        arrays[f"step_{name}"] = np.array([row[name] for row in sim.step_data], dtype=FIELD_DTYPES[name])
+    if sim.stats is not None:
+        arrays.update((f"stats_{name}", a) for name, a in sim.stats.to_arrays().items())
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path, log_level=None, tiles=1, threads=None, metrics=None, snapshots=None):
+    """Rebuild the simulator saved at `path`.
+
+    `metrics` and `snapshots` reattach output streams. Pass either a
+    MetricsSink/SnapshotRecorder, or a dict of its constructor arguments;
+    with a dict, a stream that was attached when the checkpoint was written
+    is reopened and cut back to the length it had at that point, and one
+    that was not is appended to rather than overwritten.
+    """
+    with np.load(path) as data:
+        meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+        if meta['version'] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {meta['version']}")
+        rng = SimulationRNG.from_state(meta['rng'], {name[4:]: data[name] for name in data.files
+                                                     if name.startswith('rng_')})
+        regions = RegionMap.from_arrays({name[7:]: data[name] for name in data.files
+                                         if name.startswith('region_')})
+        topology = None
+        if meta.get('topology'):
+            topology = GraphTopology.from_arrays({name[9:]: data[name] for name in data.files
+                                                  if name.startswith('topology_')})
+        sim = FinalGridSimulator(size=meta['size'], boundary=meta['boundary'],
+                                 log_level=meta['log_level'] if log_level is None else log_level,
+                                 params=SimulationParams.from_dict(meta['params']), rng=rng,
+                                 tiles=tiles, threads=threads, regions=regions, topology=topology)
+        for name in STATE_ARRAYS:
+            getattr(sim, name)[...] = data[name]
+        sim.entanglement.invalidate()
+        columns = {name: data[f"step_{name}"].tolist() for name in STEP_FIELDS}
+        rows = [dict(zip(STEP_FIELDS, values)) for values in zip(*(columns[name] for name in STEP_FIELDS))]
+        entropy = data['total_entropy_history'].tolist()
+        temp = data['total_temp_history'].tolist()
+        stats = None
+        if meta.get('stats'):
+            stats = RunningStats.from_arrays({name[6:]: data[name] for name in data.files
+                                              if name.startswith('stats_')})
+
+    if isinstance(metrics, dict):
+        metrics = MetricsSink(resume_rows=meta['metrics_rows'], append=meta['metrics_rows'] is None, **metrics)
+    if isinstance(snapshots, dict):
+        snapshots = SnapshotRecorder(resume_frames=meta['snapshot_frames'] or None, **snapshots)
+    # Attach after construction so the simulator does not reset the resumed streams
+    sim.metrics = metrics
+    sim.snapshots = snapshots
+    sim.stats = stats
+    sim.step_count = meta['step_count']
+    sim.bh_events = meta['bh_events']
+    sim._set_history(entropy, temp, rows)
+    return sim
@@ -0,0 +1,441 @@
+"""Headless command-line runner.
+
+    python -m qcsim run --size 64 --steps 1000 --seed 1 --out run.csv
+    python -m qcsim ensemble --replicas 1000 --size 5 --steps 500 --out ensemble.csv
+    python -m qcsim sweep --grid causality_strength=0.2,0.5,0.8 --grid bh_prob=0.01,0.05 \
+        --seeds 0-9 --size 32 --steps 500 --out sweep.csv --workers 8
+    python -m qcsim run --size 512 --steps 100000 --snapshots snaps/ --snapshot-every 100
+    python -m qcsim replay snaps/ --step 25000 --fields frame.npz
+    python -m qcsim run --size 256 --steps 100000 --stats stats.npz --stats-every 10
+    python -m qcsim run --size 512 --topology hex --boundary periodic --steps 1000
+    python -m qcsim gui
+    python -m qcsim run --size 256 --steps 1000000 --publish qcsim & python -m qcsim view qcsim
+    python -m qcsim import-check --budget 0.5
+    python -m qcsim bench --out bench.json --baseline baseline.json --threshold 0.1
+
+Only `gui` imports tkinter/matplotlib.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from . import engine
+from .diffusion import DIFFUSION_BOUNDARIES
+from .events import LOG_OFF, LOG_SUMMARY, LOG_EVENTS
+from .rng import SimulationRNG
+from .metrics import MetricsSink, METRICS_FORMATS
+from .snapshots import SnapshotRecorder, SnapshotArchive
+from .checkpoint import save_checkpoint, load_checkpoint
+from .framebus import FramePublisher
+from .profiling import PhaseProfiler
+from .regions import RegionMap
+from .topology import GraphTopology, TOPOLOGIES
+from .stats import RunningStats, merge_stats
+
+# Modules that must never be pulled in by `import qcsim`
+GUI_MODULES = ('tkinter', 'matplotlib')
+
+def _parse_assignment(text):
+    name, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{text}'")
+    return name.strip(), value
+
+def _parse_seeds(text):
+    """'0-9', '1,5,7' or a mix such as '0-3,10'."""
+    seeds = []
+    for part in text.split(','):
+        lo, sep, hi = part.partition('-')
+        seeds.extend(range(int(lo), int(hi) + 1) if sep else [int(lo)])
+    return seeds
+
+def _add_physics_args(parser, seed=True):
+    parser.add_argument('--size', type=int, default=5, help="grid edge length")
+    if seed:
+        parser.add_argument('--seed', type=int, default=None, help="RNG seed")
+    parser.add_argument('--causality', type=float, default=engine.CAUSALITY_STRENGTH,
+                        help="CAUSALITY_STRENGTH (0 = chaos, 1 = determinism)")
+    parser.add_argument('--bh-prob', type=float, default=engine.BH_PROB)
+    parser.add_argument('--diffusion-rate', type=float, default=engine.DIFFUSION_RATE)
+    parser.add_argument('--entanglement-prob', type=float, default=engine.ENTANGLEMENT_PROB)
+    parser.add_argument('--param', action='append', type=_parse_assignment, default=[], metavar='NAME=VALUE',
+                        help=f"any SimulationParams field: {', '.join(engine.SimulationParams.names())}")
+    parser.add_argument('--boundary', choices=DIFFUSION_BOUNDARIES, default='open')
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='lattice',
+                        help="cell graph for diffusion: the 4-neighbour lattice (see --boundary), hexagonal "
+                             "(periodic with --boundary periodic) or small-world (see --rewire)")
+    parser.add_argument('--rewire', type=float, default=0.1, help="small-world rewiring probability")
+    parser.add_argument('--edge-list', metavar='FILE',
+                        help="diffuse over the graph in FILE ('src dst [weight]' lines); the grid size "
+                             "follows the node count")
+    parser.add_argument('--directed', action='store_true', help="treat --edge-list edges as directed")
+    parser.add_argument('--regions', help=".npz region map (labels + per-region parameters, see RegionMap.save)")
+    parser.add_argument('--rng-block', type=int, default=1, metavar='STEPS',
+                        help="pre-generate random draws for this many steps at a time")
+    parser.add_argument('--tiles', type=int, default=1, help="row bands stepped in parallel")
+    parser.add_argument('--threads', type=int, default=None, help="tile worker threads (default: one per tile)")
+
+def _add_snapshot_args(parser):
+    parser.add_argument('--snapshots', help="archive the full fields into this directory")
+    parser.add_argument('--snapshot-every', type=int, default=1, metavar='STEPS')
+    parser.add_argument('--snapshot-dtype', choices=('float64', 'float32'), default='float64')
+
+def _add_checkpoint_args(parser):
+    parser.add_argument('--checkpoint', help="checkpoint file, also written when the run ends")
+    parser.add_argument('--checkpoint-every', type=int, default=0, metavar='STEPS',
+                        help="write the checkpoint every N steps (0 = only at the end)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue from --checkpoint if it exists (physics options are then ignored)")
+
+def _add_profile_args(parser):
+    parser.add_argument('--profile', action='store_true', help="time every phase of step() and report it")
+    parser.add_argument('--profile-allocations', action='store_true',
+                        help="also record per-phase allocations (tracemalloc; slower)")
+    parser.add_argument('--profile-window', type=int, default=1000, metavar='STEPS',
+                        help="samples kept per phase for the percentiles")
+
+def _add_stats_args(parser):
+    parser.add_argument('--stats', help=".npz file for per-cell running statistics (mean/var/min/max, event rates)")
+    parser.add_argument('--stats-every', type=int, default=1, metavar='STEPS',
+                        help="sample the fields for the statistics every N steps (events are counted every step)")
+
+def _add_publish_args(parser):
+    parser.add_argument('--publish', metavar='NAME',
+                        help="publish frames to the shared-memory frame bus NAME for `qcsim view NAME`")
+    parser.add_argument('--publish-fps', type=float, default=60, help="maximum frames published per second")
+
+def _build_profiler(args):
+    if not (args.profile or args.profile_allocations):
+        return None
+    return PhaseProfiler(window=args.profile_window, allocations=args.profile_allocations)
+
+def _build_params(args):
+    values = {
+        'causality_strength': args.causality,
+        'bh_prob': args.bh_prob,
+        'diffusion_rate': args.diffusion_rate,
+        'entanglement_prob': args.entanglement_prob,
+    }
+    values.update(args.param)
+    return engine.SimulationParams.from_dict(values)
+
+def _build_regions(args):
+    return RegionMap.load(args.regions) if args.regions else None
+
+def _build_topology(args):
+    """A GraphTopology for --edge-list/--topology, or None for the lattice stencil."""
+    if args.edge_list:
+        return GraphTopology.load_edge_list(args.edge_list, directed=args.directed)
+    if args.topology == 'hex':
+        return GraphTopology.hexagonal(args.size, periodic=args.boundary == 'periodic')
+    if args.topology == 'small-world':
+        return GraphTopology.small_world(args.size, rewire=args.rewire, seed=args.seed)
+    return None
+
+def _build_rng(args):
+    return SimulationRNG(args.seed, block_steps=args.rng_block)
+
+def _metrics_args(args):
+    if not getattr(args, 'metrics', None):
+        return None
+    return dict(path=args.metrics, fmt=args.metrics_format, flush_every=args.flush_every,
+                fsync_every=args.fsync_every)
+
+def _snapshot_args(args):
+    if not args.snapshots:
+        return None
+    return dict(path=args.snapshots, capacity=max(1, args.steps // args.snapshot_every),
+                every=args.snapshot_every, dtype=args.snapshot_dtype)
+
+def _build_simulator(args, log_level=LOG_OFF):
+    """A new simulator, or the one saved in --checkpoint when --resume is given and it exists."""
+    metrics, snapshots = _metrics_args(args), _snapshot_args(args)
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        sim = load_checkpoint(args.checkpoint, log_level=log_level, tiles=args.tiles, threads=args.threads,
+                              metrics=metrics, snapshots=snapshots)
+        print(f"Resuming {args.checkpoint} at step {sim.step_count}", file=sys.stderr)
+        return sim
+    topology = _build_topology(args)
+    return engine.FinalGridSimulator(size=topology.size if topology else args.size, boundary=args.boundary,
+                                     log_level=log_level, params=_build_params(args), rng=_build_rng(args),
+                                     tiles=args.tiles, threads=args.threads, regions=_build_regions(args),
+                                     topology=topology,
+                                     metrics=MetricsSink(**metrics) if metrics else None,
+                                     snapshots=SnapshotRecorder(**snapshots) if snapshots else None)
+
+def cmd_run(args):
+    log_level = {'off': LOG_OFF, 'summary': LOG_SUMMARY, 'events': LOG_EVENTS}[args.log]
+    sim = _build_simulator(args, log_level)
+    sim.profiler = _build_profiler(args)
+    if args.stats and sim.stats is None:
+        sim.stats = RunningStats(every=args.stats_every)
+    if args.publish:
+        sim.bus = FramePublisher(sim.shape, name=args.publish, regions=sim.regions, fps=args.publish_fps)
+        print(f"Publishing frames to '{sim.bus.name}'", file=sys.stderr)
+
+    first = sim.step_count + 1
+    start = time.perf_counter()
+    try:
+        for step in range(first, args.steps + 1):
+            log = sim.step()[0]
+            if log:
+                sys.stdout.write(f"─── Step {step} ───\n{log}")
+            if args.progress and step % args.progress == 0:
+                print(f"step {step}/{args.steps}", file=sys.stderr)
+            if args.checkpoint and args.checkpoint_every and step % args.checkpoint_every == 0:
+                save_checkpoint(sim, args.checkpoint)
+        elapsed = time.perf_counter() - start
+        if args.checkpoint:
+            save_checkpoint(sim, args.checkpoint)
+
+        if args.out and not sim.export_to_csv(args.out):
+            print(f"Failed to write {args.out}", file=sys.stderr)
+            return 1
+    finally:
+        sim.close()
+    if args.stats:
+        sim.stats.save(args.stats)
+    if args.fields:
+        import numpy as np
+        np.savez_compressed(args.fields, temperature=sim.local_temperature, fragments=sim.entropy_fragments,
+                            observations=sim.observation_count.astype(np.float64))
+
+    ran = max(0, args.steps - first + 1)
+    rate = ran / elapsed if elapsed > 0 else float('inf')
+    final = sim.step_data[-1] if sim.step_data else {}
+    print(f"Steps: {ran} (to step {sim.step_count}) | Grid: {sim.size}x{sim.size} | {elapsed:.2f}s "
+          f"({rate:.1f} steps/s)")
+    print(f"BH events: {sim.bh_events} | Total Entropy: {final.get('total_entropy', 0):.0f} | "
+          f"Total Temp: {final.get('total_temperature', 0):.0f}")
+    if sim.profiler is not None:
+        print(sim.profiler.format_summary())
+        sim.profiler.close()
+    return 0
+
+def cmd_replay(args):
+    import numpy as np
+    archive = SnapshotArchive(args.archive)
+    if not len(archive):
+        print(f"{args.archive}: empty archive", file=sys.stderr)
+        return 1
+    if args.step is None:
+        entropy = archive.totals('fragments')
+        print(f"{args.archive}: {len(archive)} frames of {archive.shape} | steps {archive.steps[0]}-"
+              f"{archive.steps[-1]} every {archive.every}")
+        print(f"Total Entropy: first {entropy[0]:.0f} | last {entropy[-1]:.0f} | max {entropy.max():.0f}")
+        return 0
+    try:
+        frame = archive.frame(args.step)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    print(f"Step {frame.step} | Total Entropy: {np.sum(frame.fragments):.0f} | "
+          f"Total Temp: {np.sum(frame.temperature):.0f} | BH: {len(frame.black_holes)} | "
+          f"Entanglements: {len(frame.entanglements)}")
+    if args.fields:
+        np.savez_compressed(args.fields, temperature=frame.temperature, fragments=frame.fragments,
+                            observations=frame.observations)
+    return 0
+
+def cmd_ensemble(args):
+    from .ensemble import EnsembleSimulator
+    topology = _build_topology(args)
+    sim = EnsembleSimulator(args.replicas, size=topology.size if topology else args.size,
+                            boundary=args.boundary, params=_build_params(args), rng=_build_rng(args),
+                            tiles=args.tiles, threads=args.threads, regions=_build_regions(args), topology=topology,
+                            stats=RunningStats(every=args.stats_every) if args.stats else None)
+    sim.profiler = _build_profiler(args)
+
+    start = time.perf_counter()
+    try:
+        entropy, temp = sim.run(args.steps)
+        elapsed = time.perf_counter() - start
+
+        if args.out and not sim.export_to_csv(args.out):
+            print(f"Failed to write {args.out}", file=sys.stderr)
+            return 1
+    finally:
+        sim.close()
+    if args.stats:
+        # Pooled over replicas: one (size, size) set of statistics
+        merge_stats(sim.stats.split()).save(args.stats)
+    print(f"Replicas: {args.replicas} | Steps: {args.steps} | Grid: {sim.size}x{sim.size} | {elapsed:.2f}s")
+    print(f"Final Total Entropy: mean {entropy[:, -1].mean():.0f}, std {entropy[:, -1].std():.0f} | "
+          f"BH events per replica: mean {sim.bh_events.mean():.1f}")
+    if sim.profiler is not None:
+        print(sim.profiler.format_summary())
+        sim.profiler.close()
+    return 0
+
+def cmd_gui(args):
+    from . import gui
+    sim = None if args.replay else _build_simulator(args)
+    gui.main(size=args.size, steps=args.steps, delay=args.delay, seed=args.seed, params=_build_params(args),
+             replay=args.replay, simulator=sim, checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every,
+             fps=args.fps, log_lines=args.log_lines, profiler=_build_profiler(args), publish=args.publish)
+    return 0
+
+def cmd_view(args):
+    from . import gui
+    gui.main(fps=args.fps, log_lines=args.log_lines, attach=args.name)
+    return 0
+
+def cmd_sweep(args):
+    import json
+    from .sweep import grid_points, run_sweep
+    points = []
+    if args.points:
+        with open(args.points, encoding='utf-8') as f:
+            points.extend(json.load(f))
+    if args.grid:
+        points.extend(grid_points({name: [float(v) for v in values.split(',')] for name, values in args.grid}))
+    if not points:
+        print("Nothing to sweep: give --grid and/or --points", file=sys.stderr)
+        return 2
+    ran = run_sweep(points, args.seeds, args.out, size=args.size, steps=args.steps, boundary=args.boundary,
+                    workers=args.workers, chunk_size=args.chunk_size, resume=not args.no_resume,
+                    cache=args.cache, cache_bytes=int(args.cache_size * 2**20))
+    print(f"Sweep: {len(points)} points x {len(args.seeds)} seeds | ran {ran} tasks | results in {args.out}")
+    if args.cache:
+        _print_cache_stats(args.cache)
+    return 0
+
+def _print_cache_stats(path):
+    from .cache import ResultCache
+    stats = ResultCache(path).stats()
+    print(f"Cache {path}: {stats['entries']} results, {stats['bytes'] / 2**20:.1f} MB | "
+          f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}) | "
+          f"{stats['evictions']} evicted")
+
+def cmd_cache(args):
+    from .cache import ResultCache
+    if args.clear:
+        ResultCache(args.path).clear()
+    elif args.max_size is not None:
+        ResultCache(args.path).evict(int(args.max_size * 2**20))
+    _print_cache_stats(args.path)
+    return 0
+
+def cmd_import_check(args):
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})\n"
+        "t = time.perf_counter()\n"
+        "import qcsim\n"
+        "print(time.perf_counter() - t)\n"
+        f"print(','.join(m for m in {GUI_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split('\n')
+    seconds, loaded = float(out[0]), out[1]
+    print(f"import qcsim: {seconds * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms)")
+    if loaded:
+        print(f"GUI modules imported by the engine: {loaded}")
+        return 1
+    return 0 if seconds <= args.budget else 1
+
+def cmd_bench(args):
+    from . import bench
+    return bench.main(out=args.out, baseline=args.baseline, threshold=args.threshold, quick=args.quick,
+                      min_time=args.min_time)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='qcsim', description="Quantum Causality Simulator")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="run headless and write results")
+    _add_physics_args(run)
+    run.add_argument('--steps', type=int, default=500)
+    run.add_argument('--out', help="CSV file for per-step data")
+    run.add_argument('--fields', help=".npz file for the final temperature/fragment/observation fields")
+    run.add_argument('--metrics', help="stream per-step metrics to this file (csv) or directory (columns)")
+    run.add_argument('--metrics-format', choices=METRICS_FORMATS, default='csv')
+    run.add_argument('--flush-every', type=int, default=100, metavar='STEPS', help="metrics write interval")
+    run.add_argument('--fsync-every', type=int, default=10000, metavar='STEPS', help="metrics fsync interval")
+    _add_snapshot_args(run)
+    _add_checkpoint_args(run)
+    _add_stats_args(run)
+    _add_profile_args(run)
+    _add_publish_args(run)
+    run.add_argument('--log', choices=('off', 'summary', 'events'), default='off',
+                     help="event log printed to stdout")
+    run.add_argument('--progress', type=int, default=0, metavar='N',
+                     help="report progress on stderr every N steps")
+    run.set_defaults(func=cmd_run)
+
+    replay = sub.add_parser('replay', help="inspect a snapshot archive")
+    replay.add_argument('archive', help="directory written with --snapshots")
+    replay.add_argument('--step', type=int, default=None, help="frame to show (latest at or before this step)")
+    replay.add_argument('--fields', help=".npz file for the fields of --step")
+    replay.set_defaults(func=cmd_replay)
+
+    ens = sub.add_parser('ensemble', help="run many independent replicas as one batch")
+    _add_physics_args(ens)
+    ens.add_argument('--replicas', type=int, default=100)
+    ens.add_argument('--steps', type=int, default=500)
+    ens.add_argument('--out', help="CSV file with one row per (replica, step)")
+    _add_stats_args(ens)
+    _add_profile_args(ens)
+    ens.set_defaults(func=cmd_ensemble)
+
+    sweep = sub.add_parser('sweep', help="run a parameter sweep on a process pool")
+    sweep.add_argument('--grid', action='append', type=_parse_assignment, default=[], metavar='NAME=V1,V2,...',
+                       help="values of one SimulationParams field; several --grid give their product")
+    sweep.add_argument('--points', help="JSON file with a list of {param: value} points")
+    sweep.add_argument('--seeds', type=_parse_seeds, default=[0], help="e.g. 0-9 or 1,5,7")
+    sweep.add_argument('--size', type=int, default=5)
+    sweep.add_argument('--steps', type=int, default=500)
+    sweep.add_argument('--boundary', choices=DIFFUSION_BOUNDARIES, default='open')
+    sweep.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    sweep.add_argument('--chunk-size', type=int, default=1, help="tasks per worker submission")
+    sweep.add_argument('--out', required=True, help="tidy CSV result table")
+    sweep.add_argument('--no-resume', action='store_true', help="discard previous results instead of resuming")
+    sweep.add_argument('--cache', metavar='DIR', help="result cache shared across sweeps (seeded runs are reused)")
+    sweep.add_argument('--cache-size', type=float, default=1024, metavar='MB',
+                       help="evict least recently used results beyond this size")
+    sweep.set_defaults(func=cmd_sweep)
+
+    cache = sub.add_parser('cache', help="show hit/miss statistics of a result cache, or shrink it")
+    cache.add_argument('path', help="directory given to --cache")
+    cache.add_argument('--max-size', type=float, metavar='MB', help="evict least recently used results down to this")
+    cache.add_argument('--clear', action='store_true', help="remove every result and reset the statistics")
+    cache.set_defaults(func=cmd_cache)
+
+    gui = sub.add_parser('gui', help="open the Tk interface")
+    _add_physics_args(gui)
+    gui.add_argument('--steps', type=int, default=500)
+    gui.add_argument('--delay', type=float, default=0.5, help="seconds per step (0 = as fast as possible)")
+    gui.add_argument('--fps', type=float, default=20, help="display refresh rate")
+    gui.add_argument('--log-lines', type=int, default=2000, help="event lines kept in the log panel")
+    _add_snapshot_args(gui)
+    _add_checkpoint_args(gui)
+    _add_profile_args(gui)
+    gui.add_argument('--replay', help="browse a snapshot archive instead of simulating")
+    gui.add_argument('--publish', metavar='NAME',
+                     help="also publish frames to the shared-memory frame bus NAME for other viewers")
+    gui.set_defaults(func=cmd_gui)
+
+    view = sub.add_parser('view', help="open the Tk interface on another process's frame bus")
+    view.add_argument('name', help="frame bus name given to --publish")
+    view.add_argument('--fps', type=float, default=20, help="display refresh rate")
+    view.add_argument('--log-lines', type=int, default=2000, help="event lines kept in the log panel")
+    view.set_defaults(func=cmd_view)
+
+    check = sub.add_parser('import-check', help="time `import qcsim` in a fresh interpreter")
+    check.add_argument('--budget', type=float, default=0.5, help="maximum import time in seconds")
+    check.set_defaults(func=cmd_import_check)
+
+    bench = sub.add_parser('bench', help="measure step throughput, peak memory, frame time and export speed")
+    bench.add_argument('--out', help="JSON file for the results")
+    bench.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    bench.add_argument('--threshold', type=float, default=0.1,
+                       help="relative slowdown that counts as a regression (exit status 1)")
+    bench.add_argument('--quick', action='store_true', help="small grids only")
+    bench.add_argument('--min-time', type=float, default=1.0, help="seconds of stepping per measurement")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
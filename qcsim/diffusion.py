@@ -0,0 +1,164 @@
+"""4-neighbour diffusion stencil for the grid engine."""
+import numpy as np
+
+# --------------------------
+# --- Diffusion ---
+# --------------------------
+DIFFUSION_BOUNDARIES = ('open', 'periodic', 'reflecting')
+
+class DiffusionKernel:
+    """4-neighbour averaging stencil over the last two axes of a field.
+
+    Boundary modes:
+    - 'open': edge cells average only the neighbours inside the grid.
+    - 'periodic': the grid wraps around (torus).
+    - 'reflecting': out-of-grid neighbours mirror the edge cell itself,
+      so no heat or fragments flow across the boundary.
+    """
+    def __init__(self, size, boundary='open'):
+        if boundary not in DIFFUSION_BOUNDARIES:
+            raise ValueError(f"Unknown diffusion boundary '{boundary}', expected one of {DIFFUSION_BOUNDARIES}")
+        self.size = size
+        self.boundary = boundary
+
+        # Number of in-grid neighbours per cell, only needed for open edges
+        counts = np.zeros((size, size))
+        counts[1:, :] += 1
+        counts[:-1, :] += 1
+        counts[:, 1:] += 1
+        counts[:, :-1] += 1
+        self.has_neighbors = counts > 0
+        counts[~self.has_neighbors] = 1
+        self.neighbor_counts = counts
+
+    def _rows(self, field, lo, hi):
+        """Rows lo..hi-1 of `field`, resolving out-of-grid rows by the boundary mode."""
+        if 0 <= lo and hi <= self.size:
+            return field[..., lo:hi, :]
+        idx = np.arange(lo, hi)
+        if self.boundary == 'periodic':
+            idx %= self.size
+        else:
+            np.clip(idx, 0, self.size - 1, out=idx)
+        return np.take(field, idx, axis=-2)
+
+    def neighbor_mean(self, field, rows=None):
+        """Mean of the four neighbours of every cell.
+
+        `rows=(r0, r1)` restricts the result to that band of rows; the
+        band reads one halo row on each side from `field`, so stitching
+        bands together reproduces the whole-grid result exactly.
+        """
+        r0, r1 = rows if rows is not None else (0, self.size)
+        mid = field[..., r0:r1, :]
+
+        if self.boundary == 'open':
+            total = np.zeros_like(mid)
+            if r1 <= r0:
+                return total
+            top = max(r0, 1)
+            total[..., top - r0:, :] += field[..., top - 1:r1 - 1, :]
+            bottom = min(r1, self.size - 1)
+            total[..., :bottom - r0, :] += field[..., r0 + 1:bottom + 1, :]
+            total[..., :, 1:] += mid[..., :, :-1]
+            total[..., :, :-1] += mid[..., :, 1:]
+            return total / self.neighbor_counts[r0:r1]
+
+        up = self._rows(field, r0 - 1, r1 - 1)
+        down = self._rows(field, r0 + 1, r1 + 1)
+        if self.boundary == 'periodic':
+            left = np.roll(mid, 1, axis=-1)
+            right = np.roll(mid, -1, axis=-1)
+        else:
+            left = np.concatenate([mid[..., :, :1], mid[..., :, :-1]], axis=-1)
+            right = np.concatenate([mid[..., :, 1:], mid[..., :, -1:]], axis=-1)
+        # Summed in the same order as the original neighbour list
+        return (((up + down) + left) + right) / 4
+
+    def _copy_rows(self, field, lo, hi, out):
+        """Write rows lo..hi-1 of `field` (out-of-grid rows resolved by the boundary mode) into `out`."""
+        inner_lo, inner_hi = max(lo, 0), min(hi, self.size)
+        out[..., inner_lo - lo:inner_hi - lo, :] = field[..., inner_lo:inner_hi, :]
+        for r in [*range(lo, inner_lo), *range(inner_hi, hi)]:
+            src = r % self.size if self.boundary == 'periodic' else min(max(r, 0), self.size - 1)
+            out[..., r - lo, :] = field[..., src, :]
+
+    @staticmethod
+    def _add_shifted(out, mid, shift, scratch):
+        """out[..., :, 1:] += mid[..., :, :-1] for shift=1, out[..., :, :-1] += mid[..., :, 1:] for shift=-1.
+
+        NumPy buffers column-shifted 2-D operands (temporaries of up to its
+        buffer size per call), so contiguous bands are added as flat arrays
+        instead: the one column that picks up a value from the neighbouring
+        row is saved in `scratch` first and restored afterwards.
+        """
+        if not (out.flags.c_contiguous and mid.flags.c_contiguous):
+            if shift == 1:
+                out[..., :, 1:] += mid[..., :, :-1]
+            else:
+                out[..., :, :-1] += mid[..., :, 1:]
+            return
+        edge = 0 if shift == 1 else -1
+        keep = scratch[..., :, 0]
+        keep[...] = out[..., :, edge]
+        flat_out, flat_mid = out.reshape(-1), mid.reshape(-1)
+        if shift == 1:
+            flat_out[1:] += flat_mid[:-1]
+        else:
+            flat_out[:-1] += flat_mid[1:]
+        out[..., :, edge] = keep
+
+    def neighbor_mean_into(self, field, rows, out, work):
+        """`neighbor_mean(field, rows)` computed into `out` without temporaries.
+
+        `out` and `work` have the band's shape; `work` is scratch. The sums
+        are done in the same order as `neighbor_mean`, so results match
+        bit for bit.
+        """
+        r0, r1 = rows
+        mid = field[..., r0:r1, :]
+        if r1 <= r0:
+            return out
+        if self.boundary == 'open':
+            out[...] = 0.0
+            top = max(r0, 1)
+            out[..., top - r0:, :] += field[..., top - 1:r1 - 1, :]
+            bottom = min(r1, self.size - 1)
+            out[..., :bottom - r0, :] += field[..., r0 + 1:bottom + 1, :]
+            self._add_shifted(out, mid, 1, work)
+            self._add_shifted(out, mid, -1, work)
+            return np.divide(out, self.neighbor_counts[r0:r1], out=out)
+
+        self._copy_rows(field, r0 - 1, r1 - 1, out)
+        self._copy_rows(field, r0 + 1, r1 + 1, work)
+        out += work
+        # Left then right neighbours; edge columns wrap (periodic) or mirror themselves (reflecting)
+        wrap = self.boundary == 'periodic'
+        self._add_shifted(out, mid, 1, work)
+        out[..., :, 0] += mid[..., :, -1 if wrap else 0]
+        self._add_shifted(out, mid, -1, work)
+        out[..., :, -1] += mid[..., :, 0 if wrap else -1]
+        return np.divide(out, 4, out=out)
+
+    def apply(self, field, rate, rows=None, out=None, work=None):
+        """Relax `field` towards its neighbour mean by `rate` (optionally one band of rows).
+
+        With `out` (and a scratch array `work` of the same shape) the result
+        is written there without allocating; `field` must not overlap them.
+        """
+        r0, r1 = rows if rows is not None else (0, self.size)
+        mid = field[..., r0:r1, :]
+        if out is None:
+            diffused = mid * (1 - rate) + self.neighbor_mean(field, rows) * rate
+            if self.boundary == 'open':
+                # A 1x1 grid has no neighbours and keeps its value
+                diffused = np.where(self.has_neighbors[r0:r1], diffused, mid)
+            return diffused
+
+        self.neighbor_mean_into(field, (r0, r1), work, out)
+        work *= rate
+        np.multiply(mid, 1 - rate, out=out)
+        out += work
+        if self.boundary == 'open' and self.size == 1:
+            out[...] = mid
+        return out
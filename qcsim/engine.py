@@ -0,0 +1,613 @@
+"""Simulation engine: cell model and array-backed grid simulator.
+
+This module has no GUI dependencies.
+"""
+import numpy as np
+import random
+import csv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, fields, replace
+
+from .diffusion import DiffusionKernel
+from .entanglement import EntanglementRegistry, sample_pairs
+from .regions import RegionMap
+from .topology import GraphTopology
+from .rng import SimulationRNG
+from .metrics import STEP_FIELDS
+from .events import (StepEvents, LOG_EVENTS, EVENT_BLACK_HOLE, EVENT_OBSERVATION,
+                     EVENT_ENTANGLEMENT_CREATED, EVENT_ENTANGLEMENT_EFFECT)
+
+# --------------------------
+# --- Physical Constants ---
+# --------------------------
+GLOBAL_CBR_STRENGTH = 2.0
+UNCERTAINTY_PROB = 0.1
+BH_PROB = 0.01
+DIFFUSION_RATE = 0.2
+DISSIPATION_FACTOR = 0.5
+QUANTUM_AMPLITUDE_TEMP = 0.5
+QUANTUM_AMPLITUDE_FRAG = 50.0
+CAUSALITY_STRENGTH = 0.8 
+ENTANGLEMENT_PROB = 0.05
+ENTANGLEMENT_ATTEMPTS = 1
+ENTANGLEMENT_HEAT = 0.1
+ENTANGLEMENT_RANGE = 0
+
+# Bump whenever a seeded run's results change: cached results are keyed on it
+ENGINE_VERSION = 4
+
+def default_regions(size, topology=None):
+    """The central 3x3 agent, or no agent on an edge-list graph, whose node ids have no geometry."""
+    if topology is not None and not topology.embedded:
+        return RegionMap.background(size)
+    return RegionMap.square(size)
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+# --------------------------
+# --- SimulationParams ---
+# --------------------------
+@dataclass
+class SimulationParams:
+    """Per-simulator physical parameters; defaults are the module constants."""
+    cbr_strength: float = GLOBAL_CBR_STRENGTH
+    uncertainty_prob: float = UNCERTAINTY_PROB
+    bh_prob: float = BH_PROB
+    diffusion_rate: float = DIFFUSION_RATE
+    dissipation_factor: float = DISSIPATION_FACTOR
+    quantum_amplitude_temp: float = QUANTUM_AMPLITUDE_TEMP
+    quantum_amplitude_frag: float = QUANTUM_AMPLITUDE_FRAG
+    causality_strength: float = CAUSALITY_STRENGTH
+    entanglement_prob: float = ENTANGLEMENT_PROB
+    # Pair-creation attempts per step, each succeeding with entanglement_prob
+    entanglement_attempts: float = ENTANGLEMENT_ATTEMPTS
+    # Maximum graph distance (hops) between the two cells of a new pair; 0 = any two cells
+    entanglement_range: float = ENTANGLEMENT_RANGE
+    agent_obs_prob: float = 0.1
+    agent_resolve_frac: float = 0.5
+    bg_obs_prob: float = 0.01
+    bg_resolve_frac: float = 0.1
+
+    @classmethod
+    def names(cls):
+        return [f.name for f in fields(cls)]
+
+    @classmethod
+    def from_dict(cls, values):
+        unknown = set(values) - set(cls.names())
+        if unknown:
+            raise ValueError(f"Unknown simulation parameters: {sorted(unknown)}")
+        return cls(**{k: float(v) for k, v in values.items()})
+
+    def to_dict(self):
+        return asdict(self)
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+# --------------------------
+# --- LocalCellState ---
+# --------------------------
+class LocalCellState:
+    def __init__(self, cbr_strength, uncert_prob):
+        self.cbr_strength = cbr_strength
+        self.uncert_prob = uncert_prob
+        self.local_temperature = cbr_strength * 10
+        self.entropy_fragments = 0
+        self.postponed_buffer = 0
+        self.observation_count = 0
+        self.causality_links = []
+        self.entangled_with = None
+        
+    def update_local_events(self, new_events, bh_prob, dissipation_factor):
+        at_risk_info = new_events * self.uncert_prob
+        self.postponed_buffer += at_risk_info
+        
+        temp_increase = new_events * 0.05
+        self.local_temperature += temp_increase
+        entropy_increase = int(new_events * 0.02 * (1 + self.local_temperature / 100))
+        self.entropy_fragments += entropy_increase
+
+        action_log = f"Events: {new_events}, Temp+{temp_increase:.1f}, Fragments+{entropy_increase}, Postponed+{at_risk_info:.1f}\n"
+
+        if random.random() < bh_prob:
+            bh_residual = new_events * 0.3
+            self.entropy_fragments += int(bh_residual * 0.5)
+            dissipated_amount = self.entropy_fragments * dissipation_factor
+            self.entropy_fragments -= int(dissipated_amount)
+            self.local_temperature += int(dissipated_amount * 0.01)
+            action_log += f"⚫BlackHole! Fragments adjusted, Temp+{int(dissipated_amount*0.01)}\n" 
+
+        clean_up = int(self.entropy_fragments * 0.01 * self.cbr_strength)
+        self.entropy_fragments -= clean_up
+        if self.entropy_fragments < 0:
+            self.entropy_fragments = 0
+        action_log += f"Cleanup: {clean_up}, Fragments now {self.entropy_fragments:.0f}\n"
+
+        return action_log
+
+    def handle_observation(self, resolve_fraction):
+        if self.postponed_buffer > 0:
+            self.observation_count += 1
+            resolved_amount = self.postponed_buffer * resolve_fraction
+            self.postponed_buffer -= resolved_amount
+            
+            temp_spike = resolved_amount * 0.15
+            self.local_temperature += temp_spike
+            self.entropy_fragments += int(resolved_amount * 0.5)
+            
+            return f"👁️Observation #{self.observation_count}: resolved {resolved_amount:.1f}, Temp+{temp_spike:.1f}, Fragments+{int(resolved_amount*0.5)}\n"
+        return ""
+
+# --------------------------
+# --- FinalGridSimulator ---
+# --------------------------
+class FinalGridSimulator:
+    """Struct-of-arrays grid engine.
+
+    Every LocalCellState field lives in a contiguous (size, size) array and
+    each step runs its phases (events, black holes, cleanup, observation,
+    entanglement effect, fluctuation, diffusion) as whole-grid operations.
+    """
+    def __init__(self, size=5, seed=None, boundary='open', log_level=LOG_EVENTS, params=None, rng=None,
+                 tiles=1, threads=None, metrics=None, snapshots=None, profiler=None, stats=None, regions=None,
+                 topology=None, bus=None):
+        self.size = size
+        self.shape = (size, size)
+        self.log_level = log_level
+        self.params = params if params is not None else SimulationParams()
+        # `rng` plugs in a custom SimulationRNG (block size, bit generator, spawned stream)
+        self.rng = rng if rng is not None else SimulationRNG(seed)
+        # The 4-neighbour stencil, or a GraphTopology (sparse mat-vec diffusion over any cell graph)
+        if topology is not None and topology.size != size:
+            raise ValueError(f"Topology of a {topology.size}x{topology.size} grid does not fit a {size}x{size} grid")
+        self.diffusion = topology if topology is not None else DiffusionKernel(size, boundary)
+        self._graph = topology
+        # Cells 0..nodes-1 take part in the dynamics; a graph's padding cells stay at zero
+        self.nodes = topology.nodes if topology is not None else size * size
+        # Row bands stepped on a thread pool; results do not depend on tiles/threads
+        self.tiles = max(1, tiles)
+        self.threads = threads
+        self._pool = None
+        # Optional MetricsSink; when set, step_data and the histories are bounded rings
+        self.metrics = metrics
+        # Optional SnapshotRecorder archiving the full fields every K steps
+        self.snapshots = snapshots
+        # Optional RunningStats accumulating per-cell statistics of the run
+        self.stats = stats
+        # Optional PhaseProfiler timing each phase of step(); `_prof` is the one active this step
+        self.profiler = profiler
+        self._prof = None
+        # Optional FramePublisher: every step is published to out-of-process viewers, whose
+        # parameter changes are applied before the next step
+        self.bus = bus
+
+        # Agent regions and their parameter overrides; the default is the central 3x3 agent
+        self.regions = self._check_regions(regions if regions is not None else default_regions(size, topology))
+
+        self._init_state()
+        self._init_history()
+
+    # Backwards-compatible views onto self.params
+    @property
+    def bh_prob(self):
+        return self.params.bh_prob
+
+    @bh_prob.setter
+    def bh_prob(self, value):
+        self.params.bh_prob = value
+
+    @property
+    def diffusion_rate(self):
+        return self.params.diffusion_rate
+
+    @diffusion_rate.setter
+    def diffusion_rate(self, value):
+        self.params.diffusion_rate = value
+
+    @property
+    def agent_params(self):
+        return {'obs_prob': self.params.agent_obs_prob, 'resolve_frac': self.params.agent_resolve_frac}
+
+    @property
+    def bg_params(self):
+        return {'obs_prob': self.params.bg_obs_prob, 'resolve_frac': self.params.bg_resolve_frac}
+
+    def set_params(self, **changes):
+        """Change parameters mid-run and refresh the per-cell parameter arrays."""
+        self.params = self.params.replace(**changes)
+        self._apply_params()
+
+    def _check_regions(self, regions):
+        if regions.labels.shape != (self.size, self.size):
+            raise ValueError(f"Region map of shape {regions.labels.shape} does not fit a {self.size}x{self.size} grid")
+        return regions
+
+    def set_regions(self, regions):
+        """Swap in a new RegionMap mid-run (or refresh after editing the current one)."""
+        self.regions = self._check_regions(regions)
+        self.agent_mask = regions.agent_mask
+        self._apply_params()
+
+    def _apply_params(self):
+        values = self.regions.resolve(self.params)
+        self.cbr_strength = np.broadcast_to(values['cbr_strength'], self.shape).copy()
+        self.uncert_prob = np.broadcast_to(values['uncert_prob'], self.shape).copy()
+        self.obs_prob = values['obs_prob']
+        self.resolve_frac = values['resolve_frac']
+        # Observation candidates grouped by probability, for sparse sampling
+        obs_prob = np.broadcast_to(self.obs_prob, self.shape)
+        if self._padding is not None:
+            obs_prob = np.where(self._active, obs_prob, np.nan)
+        self._obs_groups = [(np.flatnonzero(obs_prob == value), float(value))
+                            for value in np.unique(obs_prob) if not np.isnan(value)]
+
+    def _init_padding(self):
+        cells = self.size * self.size
+        if self.nodes < cells:
+            # Flat indices of the padding within one grid, and the active cells of the whole state
+            self._padding = np.arange(self.nodes, cells)
+            self._active = np.broadcast_to(np.arange(cells).reshape(self.size, self.size) < self.nodes, self.shape)
+            self._event_cells = np.flatnonzero(self._active)
+        else:
+            self._padding = self._active = None
+            self._event_cells = int(np.prod(self.shape))
+
+    def _clear_padding(self, *fields):
+        if self._padding is not None:
+            for field in fields:
+                field.reshape(field.shape[:-2] + (-1,))[..., self._padding] = 0
+
+    def _init_state(self):
+        shape = self.shape
+        self.agent_mask = self.regions.agent_mask
+        self._init_padding()
+        self._apply_params()
+
+        self.local_temperature = self.cbr_strength * 10
+        self._clear_padding(self.local_temperature)
+        self.entropy_fragments = np.zeros(shape, dtype=np.float64)
+        self.postponed_buffer = np.zeros(shape, dtype=np.float64)
+        self.observation_count = np.zeros(shape, dtype=np.int64)
+        self.entanglement = EntanglementRegistry(self.local_temperature.size)
+        # Flat index of the entangled partner, -1 when not entangled (the registry's array)
+        self.entangled_with = self.entanglement.partner
+
+        # Work buffers reused by every step; tiled phases use disjoint row bands of them
+        self._observed = np.zeros(shape, dtype=bool)
+        self._work = (np.empty(shape, dtype=np.float64), np.empty(shape, dtype=np.float64))
+        self._obs_field = np.empty(shape, dtype=np.float64)
+        # Back buffers of the double-buffered fields: diffusion writes into them and they are swapped in
+        self._temp_back = np.empty(shape, dtype=np.float64)
+        self._frag_back = np.empty(shape, dtype=np.float64)
+
+    def _init_history(self):
+        self.step_count = 0
+        self.bh_events = 0
+        self.last_events = None
+        if self.snapshots is not None:
+            self.snapshots.reset()
+        if self.metrics is not None:
+            self.metrics.reset()
+        if self.stats is not None:
+            self.stats.reset()
+        self._set_history([], [], [])
+
+    def _set_history(self, entropy, temp, rows):
+        if self.metrics is not None:
+            self.total_entropy_history = deque(entropy, maxlen=self.metrics.ring.maxlen)
+            self.total_temp_history = deque(temp, maxlen=self.metrics.ring.maxlen)
+            self.metrics.ring.extend(rows)
+            self.step_data = self.metrics.ring
+            return
+        self.total_entropy_history = list(entropy)
+        self.total_temp_history = list(temp)
+        
+        # Export data storage
+        self.step_data = list(rows)
+
+    def cell(self, i, j):
+        """Return a LocalCellState snapshot of cell (i, j)."""
+        cell = LocalCellState(self.cbr_strength[i, j], self.uncert_prob[i, j])
+        cell.local_temperature = self.local_temperature[i, j]
+        cell.entropy_fragments = self.entropy_fragments[i, j]
+        cell.postponed_buffer = self.postponed_buffer[i, j]
+        cell.observation_count = int(self.observation_count[i, j])
+        partner = self.entangled_with[i * self.size + j]
+        if partner >= 0:
+            cell.entangled_with = divmod(int(partner), self.size)
+        return cell
+
+    @property
+    def graph(self):
+        """The cell graph: the topology, or the lattice of the stencil as a GraphTopology (built on first use)."""
+        if self._graph is None:
+            self._graph = GraphTopology.lattice(self.size, self.diffusion.boundary)
+        return self._graph
+
+    def _sample_pairs(self, rng, k):
+        """Up to k disjoint pairs of flat cell indices: uniform, or within entanglement_range hops."""
+        hops = int(self.params.entanglement_range)
+        if hops <= 0:
+            return sample_pairs(rng, self.nodes, k)
+        return self.graph.sample_pairs(rng, k, hops)
+
+    def _create_entanglement(self, events_rec):
+        rng = self.rng.entanglement
+        p = self.params
+        k = rng.binomial(int(p.entanglement_attempts), p.entanglement_prob)
+        if k:
+            a, b = self._sample_pairs(rng, k)
+            self.entanglement.link(a, b)
+            events_rec.entanglements_created = np.column_stack([a, b])
+
+    @property
+    def bands(self):
+        """Row bands (r0, r1) that the tiled phases run over."""
+        cuts = np.linspace(0, self.size, min(self.tiles, self.size) + 1).astype(int)
+        return [(int(r0), int(r1)) for r0, r1 in zip(cuts[:-1], cuts[1:])]
+
+    def _run_tiles(self, phase, *args):
+        """Run `phase(r0, r1, *args)` on every band, on the thread pool when tiled."""
+        bands = self.bands
+        if len(bands) == 1:
+            return [phase(*bands[0], *args)]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads or len(bands),
+                                            thread_name_prefix='qcsim-tile')
+        futures = [self._pool.submit(phase, r0, r1, *args) for r0, r1 in bands]
+        return [f.result() for f in futures]
+
+    def _in_band(self, flat, r0, r1):
+        """The flat cell indices of `flat` that lie in rows r0..r1-1."""
+        if r0 == 0 and r1 == self.size:
+            return flat
+        rows = flat // self.size % self.size
+        return flat[(rows >= r0) & (rows < r1)]
+
+    def _local_phase(self, r0, r1, draws, black_holes, observed):
+        """Local events, black holes, cleanup and observation for rows r0..r1-1.
+
+        Returns the flat indices of the observed cells that resolved
+        postponed information, and the amounts resolved.
+        """
+        p = self.params
+        rows = np.s_[..., r0:r1, :]
+        temp = self.local_temperature[rows]
+        frag = self.entropy_fragments[rows]
+        postponed = self.postponed_buffer[rows]
+        w1, w2 = self._work[0][rows], self._work[1][rows]
+
+        # Local Events
+        events = draws.events[rows]
+        postponed += np.multiply(events, self.uncert_prob[rows], out=w1)
+        temp += np.multiply(events, 0.05, out=w1)
+        # trunc(events * 0.02 * (1 + temp / 100))
+        np.multiply(events, 0.02, out=w1)
+        np.divide(temp, 100, out=w2)
+        w2 += 1
+        w1 *= w2
+        frag += np.trunc(w1, out=w1)
+
+        # Black Holes: only the sampled cells
+        bh = self._in_band(black_holes, r0, r1)
+        if bh.size:
+            temp_flat, frag_flat = self.local_temperature.reshape(-1), self.entropy_fragments.reshape(-1)
+            frag_flat[bh] += np.trunc(draws.events.reshape(-1)[bh] * 0.3 * 0.5)
+            dissipated = frag_flat[bh] * p.dissipation_factor
+            frag_flat[bh] -= np.trunc(dissipated)
+            temp_flat[bh] += np.trunc(dissipated * 0.01)
+
+        # Cleanup
+        np.multiply(frag, 0.01, out=w1)
+        w1 *= self.cbr_strength[rows]
+        frag -= np.trunc(w1, out=w1)
+        np.maximum(frag, 0, out=frag)
+
+        # Observations: only the sampled cells, and of those only the ones with postponed information
+        obs = self._in_band(observed, r0, r1)
+        postponed_flat = self.postponed_buffer.reshape(-1)
+        res = obs[postponed_flat[obs] > 0]
+        amount = postponed_flat[res] * self.resolve_frac.reshape(-1)[res % self.resolve_frac.size]
+        if res.size:
+            temp_flat, frag_flat = self.local_temperature.reshape(-1), self.entropy_fragments.reshape(-1)
+            self.observation_count.reshape(-1)[res] += 1
+            postponed_flat[res] -= amount
+            temp_flat[res] += amount * 0.15
+            frag_flat[res] += np.trunc(amount * 0.5)
+        return res, amount
+
+    def _fluctuation_phase(self, r0, r1, draws):
+        p = self.params
+        rows = np.s_[..., r0:r1, :]
+        temp = self.local_temperature[rows]
+        frag = self.entropy_fragments[rows]
+        w = self._work[0][rows]
+        temp += np.multiply(draws.noise_temp[rows], p.quantum_amplitude_temp * (1 - p.causality_strength), out=w)
+        frag += np.multiply(draws.noise_frag[rows], p.quantum_amplitude_frag * (1 - p.causality_strength), out=w)
+        np.maximum(frag, 0, out=frag)
+
+    def _diffusion_phase(self, r0, r1, rate):
+        # Each band reads a one-row halo from the shared pre-diffusion fields and writes its rows of the back buffers
+        rows = np.s_[..., r0:r1, :]
+        work = self._work[0][rows]
+        self.diffusion.apply(self.local_temperature, rate, (r0, r1), out=self._temp_back[rows], work=work)
+        self.diffusion.apply(self.entropy_fragments, rate, (r0, r1), out=self._frag_back[rows], work=work)
+
+    def _update_cells(self, events_rec):
+        """Local events through quantum fluctuation, over the whole state shape."""
+        prof = self._prof
+        draws = self.rng.draws(self.shape)
+        # Rare events: a binomial count and that many random cells, instead of a roll per cell
+        black_holes = self.rng.sample_cells('black_hole', self._event_cells, self.params.bh_prob)
+        observed = [self.rng.sample_cells('observation', cells, prob) for cells, prob in self._obs_groups]
+        observed = np.sort(np.concatenate(observed)) if len(observed) > 1 else observed[0]
+        if prof is not None:
+            prof.lap('rng')
+        results = self._run_tiles(self._local_phase, draws, black_holes, observed)
+        if prof is not None:
+            prof.lap('local_events')
+
+        resolving = np.concatenate([res for res, _ in results])
+        resolved = np.concatenate([amount for _, amount in results])
+        if len(results) > 1:
+            order = np.argsort(resolving, kind='stable')
+            resolving, resolved = resolving[order], resolved[order]
+        events_rec.black_holes = black_holes
+        events_rec.observations = resolving
+        events_rec.observation_counts = self.observation_count.reshape(-1)[resolving]
+        events_rec.resolved = resolved
+
+        # Entanglement Effects: observed cells heat their partners (crosses tiles, so run once)
+        observed_mask = self._observed.reshape(-1)
+        observed_mask[observed] = True
+        sources, targets, heat = self.entanglement.scatter_effect(
+            observed_mask, self.local_temperature.reshape(-1), ENTANGLEMENT_HEAT)
+        observed_mask[observed] = False
+        if sources.size:
+            events_rec.effect_sources = sources
+            events_rec.effect_targets = targets
+            events_rec.effect_heat = heat
+        if prof is not None:
+            prof.lap('entanglement_effect')
+
+        # Quantum Fluctuation
+        self._run_tiles(self._fluctuation_phase, draws)
+        # Graph padding: the dense phases touched every cell, put the padding back to zero
+        self._clear_padding(self.local_temperature, self.entropy_fragments, self.postponed_buffer)
+        if prof is not None:
+            prof.lap('fluctuation')
+
+    def _advance(self):
+        """Run one step of the dynamics.
+
+        Returns the step's events plus the pre-diffusion temperature and
+        fragment fields and the diffused fields that become the new state.
+        The fields are the simulator's own buffers: the diffused ones are
+        the state, the pre-diffusion ones are overwritten by the next step.
+        """
+        prof = self._prof = self.profiler if self.profiler is not None and self.profiler.enabled else None
+        if prof is not None:
+            prof.begin()
+        events_rec = StepEvents(self.step_count + 1, self.size)
+        self._create_entanglement(events_rec)
+        if prof is not None:
+            prof.lap('entanglement')
+        self._update_cells(events_rec)
+
+        # Diffusion into the back buffers, which then become the state; the old state keeps the pre-diffusion fields
+        effective_diffusion = self.params.diffusion_rate * self.params.causality_strength
+        self._run_tiles(self._diffusion_phase, effective_diffusion)
+        temp_matrix, frag_matrix = self.local_temperature, self.entropy_fragments
+        self.local_temperature, self._temp_back = self._temp_back, temp_matrix
+        self.entropy_fragments, self._frag_back = self._frag_back, frag_matrix
+        if prof is not None:
+            prof.lap('diffusion')
+        return events_rec, temp_matrix, frag_matrix, self.local_temperature, self.entropy_fragments
+
+    def _apply_controls(self):
+        for changes in self.bus.controls():
+            try:
+                self.set_params(**{name: float(value) for name, value in changes.items()})
+            except (TypeError, ValueError):
+                # A viewer sent an unknown parameter or a non-number; nothing to apply
+                continue
+
+    def close(self):
+        """Shut down the tile thread pool and close the metrics, snapshot and frame streams, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.snapshots is not None:
+            self.snapshots.close()
+        if self.bus is not None:
+            self.bus.close()
+
+    def step(self, copy=False):
+        """Advance one step; returns (log, temperature, fragments, observations, bh_locs, ent_locs).
+
+        The three fields are read-only views of the simulator's buffers and
+        change with the next step. Pass copy=True for arrays that stay
+        valid (e.g. to hand them to another thread).
+        """
+        if self.bus is not None:
+            self._apply_controls()
+        events_rec, temp_matrix, frag_matrix, new_temp, new_frag = self._advance()
+        obs_matrix = self._obs_field
+        np.copyto(obs_matrix, self.observation_count)
+        self.bh_events += len(events_rec.black_holes)
+
+        total_entropy = np.sum(frag_matrix)
+        total_temp = np.sum(temp_matrix)
+        self.total_entropy_history.append(total_entropy)
+        self.total_temp_history.append(total_temp)
+        
+        # Store step data for export
+        counts = events_rec.counts()
+        row = {
+            'step': self.step_count + 1,
+            'total_entropy': total_entropy,
+            'total_temperature': total_temp,
+            'bh_events_total': self.bh_events,
+            'bh_events_this_step': counts[EVENT_BLACK_HOLE],
+            'entanglement_pairs': counts[EVENT_ENTANGLEMENT_CREATED],
+            'observations_this_step': counts[EVENT_OBSERVATION],
+            'entanglement_effects_this_step': counts[EVENT_ENTANGLEMENT_EFFECT],
+            'causality_strength': self.params.causality_strength
+        }
+        if self.metrics is not None:
+            self.metrics.append(row)
+        else:
+            self.step_data.append(row)
+        self.step_count += 1
+        self.last_events = events_rec
+        if self.snapshots is not None and self.snapshots.wants(self.step_count):
+            self.snapshots.record(self.step_count, new_temp, new_frag, obs_matrix,
+                                  events_rec.black_holes, events_rec.entanglements_created)
+        if self.stats is not None:
+            self.stats.update(self.step_count, new_temp, new_frag, events_rec.black_holes, events_rec.observations)
+        if self.bus is not None:
+            self.bus.publish(self.step_count, new_temp, new_frag, obs_matrix, events_rec.black_holes,
+                             events_rec.entanglements_created, self.bh_events, total_entropy, total_temp,
+                             self.params.causality_strength)
+
+        log = events_rec.format(self.log_level)
+        fields = (new_temp, new_frag, obs_matrix)
+        fields = [f.copy() for f in fields] if copy else [_read_only(f) for f in fields]
+        if self._prof is not None:
+            self._prof.lap('bookkeeping')
+        return (log, *fields, events_rec.bh_locs, events_rec.ent_locs)
+
+    def reset(self):
+        self._init_state()
+        self._init_history()
+        
+    def export_to_csv(self, filename):
+        """Export simulation data to CSV file"""
+        try:
+            if self.metrics is not None:
+                if not self.step_count:
+                    return False
+                self.metrics.export_csv(filename)
+                return True
+            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                if not self.step_data:
+                    return False
+                    
+                writer = csv.DictWriter(csvfile, fieldnames=STEP_FIELDS)
+                
+                writer.writeheader()
+                for step, data in enumerate(self.step_data, start=1):
+                    row = {'step': step}
+                    row.update(data)
+                    writer.writerow(row)
+            return True
+        except Exception as e:
+            print(f"Export error: {e}")
+            return False
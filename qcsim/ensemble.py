@@ -0,0 +1,120 @@
+"""Batched ensembles: many independent replicas stepped as one array."""
+import csv
+
+import numpy as np
+
+from .engine import FinalGridSimulator
+from .events import LOG_OFF
+
+# --------------------------
+# --- EnsembleSimulator ---
+# --------------------------
+class EnsembleSimulator(FinalGridSimulator):
+    """R independent universes of the same size and parameters.
+
+    All cell state carries a leading replica axis, shape (R, size, size),
+    so every phase runs once per step for the whole ensemble. Each replica
+    draws its own random numbers, black holes and entanglement pairs;
+    partner indices are flat over the whole (R, size, size) state and never
+    cross replicas. Histories are (R, steps) arrays.
+    """
+    def __init__(self, replicas, size=5, seed=None, boundary='open', params=None, rng=None,
+                 tiles=1, threads=None, stats=None, regions=None, topology=None):
+        self.replicas = replicas
+        super().__init__(size=size, seed=seed, boundary=boundary, log_level=LOG_OFF, params=params, rng=rng,
+                         tiles=tiles, threads=threads, stats=stats, regions=regions,
+                         topology=topology)
+        self.shape = (replicas, size, size)
+        self._init_state()
+        self._init_history()
+
+    def _init_history(self):
+        self.step_count = 0
+        self._entropy_rows = []
+        self._temp_rows = []
+        self.bh_events = np.zeros(self.replicas, dtype=np.int64)
+        self.entanglement_pairs_created = np.zeros(self.replicas, dtype=np.int64)
+        self.last_events = None
+        self.step_data = []
+        if self.stats is not None:
+            self.stats.reset()
+
+    @property
+    def total_entropy_history(self):
+        if not self._entropy_rows:
+            return np.empty((self.replicas, 0))
+        return np.stack(self._entropy_rows, axis=1)
+
+    @property
+    def total_temp_history(self):
+        if not self._temp_rows:
+            return np.empty((self.replicas, 0))
+        return np.stack(self._temp_rows, axis=1)
+
+    def cell(self, i, j):
+        raise NotImplementedError("EnsembleSimulator has no per-cell snapshots; index the state arrays directly")
+
+    def replica_of(self, flat):
+        """Replica index of flat state indices."""
+        return np.asarray(flat) // (self.size * self.size)
+
+    def _create_entanglement(self, events_rec):
+        cells = self.size * self.size
+        rng = self.rng.entanglement
+        p = self.params
+        created = rng.binomial(int(p.entanglement_attempts), p.entanglement_prob, size=self.replicas)
+        a, b = [], []
+        for r in np.flatnonzero(created):
+            pa, pb = self._sample_pairs(rng, created[r])
+            a.append(pa + r * cells)
+            b.append(pb + r * cells)
+        if a:
+            a, b = np.concatenate(a), np.concatenate(b)
+            self.entanglement.link(a, b)
+            events_rec.entanglements_created = np.column_stack([a, b])
+
+    def step(self):
+        """Advance every replica by one step.
+
+        Returns the per-replica (total_entropy, total_temp) of this step,
+        each of shape (R,).
+        """
+        events_rec, temp_matrix, frag_matrix, new_temp, new_frag = self._advance()
+        self.bh_events += np.bincount(self.replica_of(events_rec.black_holes), minlength=self.replicas)
+        self.entanglement_pairs_created += np.bincount(
+            self.replica_of(events_rec.entanglements_created[:, 0]), minlength=self.replicas)
+
+        total_entropy = frag_matrix.sum(axis=(1, 2))
+        total_temp = temp_matrix.sum(axis=(1, 2))
+        self._entropy_rows.append(total_entropy)
+        self._temp_rows.append(total_temp)
+        self.step_count += 1
+        self.last_events = events_rec
+        if self.stats is not None:
+            self.stats.update(self.step_count, new_temp, new_frag, events_rec.black_holes, events_rec.observations)
+        if self._prof is not None:
+            self._prof.lap('bookkeeping')
+        return total_entropy, total_temp
+
+    def run(self, steps):
+        """Step `steps` times and return the (R, step_count) entropy and temperature histories."""
+        for _ in range(steps):
+            self.step()
+        return self.total_entropy_history, self.total_temp_history
+
+    def export_to_csv(self, filename):
+        """Export per-replica totals as one row per (replica, step)."""
+        if not self._entropy_rows:
+            return False
+        try:
+            entropy, temp = self.total_entropy_history, self.total_temp_history
+            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['replica', 'step', 'total_entropy', 'total_temperature'])
+                for r in range(self.replicas):
+                    for step in range(entropy.shape[1]):
+                        writer.writerow([r, step + 1, entropy[r, step], temp[r, step]])
+            return True
+        except Exception as e:
+            print(f"Export error: {e}")
+            return False
@@ -0,0 +1,80 @@
+"""Array-backed registry of entangled cell pairs."""
+import numpy as np
+
+class EntanglementRegistry:
+    """Symmetric partner array over flat cell indices.
+
+    `partner[i]` is the cell entangled with i, or -1. Pairing a cell that
+    is already entangled releases its old partner, so the array is always
+    an involution: partner[partner[i]] == i for every paired cell.
+    """
+    def __init__(self, cells):
+        self.partner = np.full(cells, -1, dtype=np.intp)
+        self._paired = None
+
+    def __len__(self):
+        return self.paired.size // 2
+
+    @property
+    def paired(self):
+        """Ascending flat indices of every entangled cell, cached until the pairs change."""
+        if self._paired is None:
+            self._paired = np.flatnonzero(self.partner >= 0)
+        return self._paired
+
+    def invalidate(self):
+        """Drop cached lookups; call after writing `partner` directly."""
+        self._paired = None
+
+    def _release(self, cells):
+        """Unpair the old partners of `cells`; returns them."""
+        old = self.partner[cells]
+        old = old[old >= 0]
+        self.partner[old] = -1
+        return old
+
+    def link(self, a, b):
+        """Pair a[k] with b[k]; all cells in a and b must be distinct."""
+        a = np.asarray(a, dtype=np.intp)
+        b = np.asarray(b, dtype=np.intp)
+        cells = np.concatenate([a, b])
+        released = self._release(cells)
+        self.partner[a] = b
+        self.partner[b] = a
+        if self._paired is not None:
+            # Update the cache from the changed cells rather than rescanning the grid
+            self._paired = np.union1d(np.setdiff1d(self._paired, released, assume_unique=True), cells)
+
+    def unlink(self, cells):
+        """Break the pairs of `cells` (both sides)."""
+        cells = np.asarray(cells, dtype=np.intp)
+        released = self._release(cells)
+        self.partner[cells] = -1
+        if self._paired is not None:
+            self._paired = np.setdiff1d(self._paired, np.concatenate([cells, released]))
+
+    def pairs(self):
+        """(k, 2) array of current pairs, each listed once with a < b."""
+        a = np.flatnonzero(self.partner > np.arange(self.partner.size))
+        return np.column_stack([a, self.partner[a]])
+
+    def scatter_effect(self, observed, values, factor):
+        """Add factor * values[i] to the partner of every observed, paired cell i.
+
+        All heat is read before any is added, and partners are unique, so
+        this is a single fancy-indexed scatter-add. Only paired cells are
+        looked at, so the cost follows the number of pairs, not the grid.
+        Returns (sources, targets, amounts).
+        """
+        paired = self.paired
+        sources = paired[observed[paired]]
+        targets = self.partner[sources]
+        amounts = values[sources] * factor
+        values[targets] += amounts
+        return sources, targets, amounts
+
+def sample_pairs(rng, cells, k):
+    """k disjoint random pairs over `cells` cells, as two index arrays (fewer if cells run out)."""
+    k = min(int(k), cells // 2)
+    chosen = rng.choice(cells, size=2 * k, replace=False)
+    return chosen[:k], chosen[k:]
@@ -0,0 +1,85 @@
+"""Structured per-step event records."""
+import numpy as np
+
+# --------------------------
+# --- Event Records ---
+# --------------------------
+EVENT_BLACK_HOLE = 'black_hole'
+EVENT_OBSERVATION = 'observation'
+EVENT_ENTANGLEMENT_CREATED = 'entanglement_created'
+EVENT_ENTANGLEMENT_EFFECT = 'entanglement_effect'
+EVENT_KINDS = (EVENT_BLACK_HOLE, EVENT_OBSERVATION, EVENT_ENTANGLEMENT_CREATED, EVENT_ENTANGLEMENT_EFFECT)
+
+# Log verbosity: no text, one summary line per event kind, one line per event
+LOG_OFF = 0
+LOG_SUMMARY = 1
+LOG_EVENTS = 2
+
+_NO_CELLS = np.empty(0, dtype=np.intp)
+
+class StepEvents:
+    """Typed, array-backed records of the notable events of one step.
+
+    Cells are stored as flat grid indices (row * size + col); `cells()`,
+    `bh_locs` and `ent_locs` convert them to (row, col) pairs.
+    """
+    def __init__(self, step, size):
+        self.step = step
+        self.size = size
+        self.black_holes = _NO_CELLS
+        self.observations = _NO_CELLS
+        self.observation_counts = np.empty(0, dtype=np.int64)
+        self.resolved = np.empty(0)
+        # (k, 2) array of flat index pairs
+        self.entanglements_created = np.empty((0, 2), dtype=np.intp)
+        self.effect_sources = _NO_CELLS
+        self.effect_targets = _NO_CELLS
+        self.effect_heat = np.empty(0)
+
+    def count(self, kind):
+        if kind == EVENT_BLACK_HOLE:
+            return len(self.black_holes)
+        if kind == EVENT_OBSERVATION:
+            return len(self.observations)
+        if kind == EVENT_ENTANGLEMENT_CREATED:
+            return len(self.entanglements_created)
+        if kind == EVENT_ENTANGLEMENT_EFFECT:
+            return len(self.effect_targets)
+        raise ValueError(f"Unknown event kind '{kind}'")
+
+    def counts(self):
+        return {kind: self.count(kind) for kind in EVENT_KINDS}
+
+    def cells(self, flat):
+        """(row, col) tuples for an array of flat indices."""
+        rows, cols = np.divmod(np.asarray(flat), self.size)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    @property
+    def bh_locs(self):
+        return self.cells(self.black_holes)
+
+    @property
+    def ent_locs(self):
+        return self.cells(self.entanglements_created.ravel())
+
+    def lines(self):
+        """Yield (kind, text) for every event, in phase order."""
+        for a, b in self.entanglements_created.tolist():
+            (i1, j1), (i2, j2) = divmod(a, self.size), divmod(b, self.size)
+            yield EVENT_ENTANGLEMENT_CREATED, f"🔗Entanglement created between ({i1},{j1}) and ({i2},{j2})\n"
+        for i, j in self.bh_locs:
+            yield EVENT_BLACK_HOLE, f"[Cell {i},{j}] ⚫BlackHole! Fragments adjusted\n"
+        for (i, j), n, amount in zip(self.cells(self.observations), self.observation_counts.tolist(), self.resolved.tolist()):
+            yield EVENT_OBSERVATION, f"[Cell {i},{j}] 👁️Observation #{n}: resolved {amount:.1f}\n"
+        for (ei, ej), heat in zip(self.cells(self.effect_targets), self.effect_heat.tolist()):
+            yield EVENT_ENTANGLEMENT_EFFECT, f"↔️Entanglement effect on ({ei},{ej}), Temp+{heat:.1f}\n"
+
+    def format(self, level=LOG_EVENTS):
+        if level <= LOG_OFF:
+            return ""
+        if level == LOG_SUMMARY:
+            counts = self.counts()
+            return (f"⚫BlackHoles: {counts[EVENT_BLACK_HOLE]} | 👁️Observations: {counts[EVENT_OBSERVATION]} | "
+                    f"🔗Entanglements: {counts[EVENT_ENTANGLEMENT_CREATED]} | ↔️Effects: {counts[EVENT_ENTANGLEMENT_EFFECT]}\n")
+        return "".join(text for _, text in self.lines())
@@ -0,0 +1,339 @@
+"""Shared-memory frame bus: one simulating process, any number of viewer processes.
+
+    bus = FramePublisher(sim.shape, name='qcsim', regions=sim.regions)
+    sim.bus = bus                       # step() publishes every frame, applies viewer controls
+    ...
+    viewer = FrameViewer('qcsim')       # in another process, at any time
+    frame = viewer.latest()             # None until something new is published
+    viewer.send(causality_strength=0.3)
+
+The block holds a header, the region labels, a ring of per-step totals
+(so late joiners get recent history) and two frame slots. Frames are
+written alternately into the slots under a per-slot sequence number: the
+writer marks the slot busy, fills it, stamps it with the new sequence and
+then advertises it in the header. Readers never block the writer:
+`latest()` returns views into the slot, and `frame.valid()` tells
+afterwards whether the writer has since started reusing it (two
+publishes later), in which case the reader just takes the next frame.
+Readers that keep a frame past that point use `latest(copy=True)`, which
+copies it out and re-checks it, dropping a frame overwritten meanwhile.
+
+Parameter changes travel the other way over a multiprocessing connection
+whose address and key are in the block, so several viewers can send at
+once. The publisher queues them; the simulator applies them between
+steps.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+MAGIC = 0x51435342  # 'QCSB'
+BUS_VERSION = 1
+INFO_BYTES = 1024
+
+# Header slots (int64)
+_H_MAGIC, _H_VERSION, _H_SIZE, _H_POINTS, _H_HISTORY, _H_LATEST, _H_CLOSED, _H_STEPS = range(8)
+_HEADER = 16
+# Slot meta (int64) and scalars (float64)
+_M_SEQ, _M_STEP, _M_BH_EVENTS, _M_BH, _M_ENT = range(5)
+_META = 8
+_S_ENTROPY, _S_TEMP, _S_CAUSALITY, _S_TIME = range(4)
+_SCALARS = 4
+
+def _layout(size, points, history):
+    """Byte offsets of every region of the block, and its total size."""
+    cells = size * size
+    offsets = {}
+    pos = 0
+    for name, nbytes in (('header', _HEADER * 8), ('info', INFO_BYTES), ('labels', cells * 8),
+                         ('history', history * 3 * 8)):
+        offsets[name] = pos
+        pos += nbytes
+    slot_bytes = (_META + _SCALARS + 3 * cells + 3 * points) * 8
+    offsets['slots'] = pos
+    offsets['slot_bytes'] = slot_bytes
+    return offsets, pos + 2 * slot_bytes
+
+class _Block:
+    """Typed views onto a bus block."""
+    def __init__(self, buf, size, points, history):
+        offsets, _ = _layout(size, points, history)
+        cells = size * size
+        self.header = np.ndarray(_HEADER, np.int64, buf, offsets['header'])
+        self.info = np.ndarray(INFO_BYTES, np.uint8, buf, offsets['info'])
+        self.labels = np.ndarray((size, size), np.int64, buf, offsets['labels'])
+        self.history = np.ndarray((history, 3), np.float64, buf, offsets['history'])
+        self.slots = []
+        for k in range(2):
+            pos = offsets['slots'] + k * offsets['slot_bytes']
+            meta = np.ndarray(_META, np.int64, buf, pos)
+            pos += _META * 8
+            scalars = np.ndarray(_SCALARS, np.float64, buf, pos)
+            pos += _SCALARS * 8
+            fields = np.ndarray((3, size, size), np.float64, buf, pos)
+            pos += 3 * cells * 8
+            bh = np.ndarray(points, np.int64, buf, pos)
+            ent = np.ndarray(2 * points, np.int64, buf, pos + points * 8)
+            self.slots.append((meta, scalars, fields, bh, ent))
+
+def _attach(name):
+    """Open an existing block without letting this process's resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+class FramePublisher:
+    """Writes frames of a (size, size) simulator into a new shared-memory block.
+
+    `fps` caps how often fields are published (None = every step); the
+    per-step totals ring is written every step regardless. Up to `points`
+    black holes and entanglement pairs are kept per frame.
+    """
+    def __init__(self, shape, name=None, points=1024, history=4096, regions=None, fps=None, control=True):
+        size = shape[-1]
+        if tuple(shape) != (size, size):
+            raise ValueError(f"The frame bus carries a single (size, size) grid, not {tuple(shape)}")
+        self.size = size
+        self.points = points
+        self.history = history
+        self.interval = 1.0 / fps if fps else 0.0
+        _, nbytes = _layout(size, points, history)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+        self.name = self.shm.name
+        self._block = _Block(self.shm.buf, size, points, history)
+        self._seq = 0
+        self._last_time = 0.0
+
+        self._controls = queue.SimpleQueue()
+        self._listener = None
+        info = {}
+        if control:
+            authkey = os.urandom(16)
+            self._listener = connection.Listener(authkey=authkey)
+            info = {'address': self._listener.address, 'authkey': authkey.hex()}
+            threading.Thread(target=self._accept, name='qcsim-bus-accept', daemon=True).start()
+        raw = json.dumps(info).encode('utf-8')
+        if len(raw) > INFO_BYTES:
+            raise ValueError("Control address does not fit the bus header")
+        self._block.info[:len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+        if regions is not None:
+            self._block.labels[...] = regions.labels
+        header = self._block.header
+        header[_H_SIZE], header[_H_POINTS], header[_H_HISTORY] = size, points, history
+        header[_H_VERSION] = BUS_VERSION
+        # Written last: viewers treat the block as ready once the magic is there
+        header[_H_MAGIC] = MAGIC
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, connection.AuthenticationError):
+                if self._listener is None:
+                    return
+                continue
+            threading.Thread(target=self._receive, args=(conn,), name='qcsim-bus-control', daemon=True).start()
+
+    def _receive(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if isinstance(message, dict):
+                    self._controls.put(message)
+
+    def controls(self):
+        """Parameter changes ({name: value} dicts) received since the last call, oldest first."""
+        out = []
+        while True:
+            try:
+                out.append(self._controls.get_nowait())
+            except queue.Empty:
+                return out
+
+    def publish(self, step, temp, frag, obs, black_holes, entanglements, bh_events, total_entropy, total_temp,
+                causality):
+        """Record the step's totals and, unless throttled by `fps`, publish its frame."""
+        block = self._block
+        header = block.header
+        steps = int(header[_H_STEPS])
+        block.history[steps % self.history] = (step, total_entropy, total_temp)
+        header[_H_STEPS] = steps + 1
+
+        now = time.perf_counter()
+        if self.interval and now - self._last_time < self.interval:
+            return False
+        self._last_time = now
+        self._seq += 1
+        meta, scalars, fields, bh, ent = block.slots[self._seq % 2]
+        meta[_M_SEQ] = -1
+        fields[0], fields[1], fields[2] = temp, frag, obs
+        n_bh = min(len(black_holes), self.points)
+        bh[:n_bh] = black_holes[:n_bh]
+        entanglements = np.asarray(entanglements).reshape(-1)
+        n_ent = min(entanglements.size, 2 * self.points)
+        ent[:n_ent] = entanglements[:n_ent]
+        meta[_M_STEP], meta[_M_BH_EVENTS], meta[_M_BH], meta[_M_ENT] = step, bh_events, n_bh, n_ent
+        scalars[_S_ENTROPY], scalars[_S_TEMP], scalars[_S_CAUSALITY] = total_entropy, total_temp, causality
+        scalars[_S_TIME] = time.time()
+        meta[_M_SEQ] = self._seq
+        header[_H_LATEST] = self._seq
+        return True
+
+    def close(self):
+        """Tell viewers the run is over and remove the block (attached viewers keep their mapping)."""
+        if self.shm is None:
+            return
+        self._block.header[_H_CLOSED] = 1
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        self._block = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+class BusFrame:
+    """One frame read from the bus; the arrays are views into shared memory."""
+    __slots__ = ('seq', 'step', 'temp', 'frag', 'obs', 'black_holes', 'entanglements', 'bh_events',
+                 'total_entropy', 'total_temp', 'causality', 'time', 'size', '_meta')
+
+    def __init__(self, seq, meta, scalars, fields, bh, ent, size):
+        self.seq = seq
+        self.step = int(meta[_M_STEP])
+        self.bh_events = int(meta[_M_BH_EVENTS])
+        self.temp, self.frag, self.obs = fields
+        self.black_holes = bh[:meta[_M_BH]]
+        self.entanglements = ent[:meta[_M_ENT]].reshape(-1, 2)
+        self.total_entropy, self.total_temp, self.causality, self.time = scalars.tolist()
+        self.size = size
+        self._meta = meta
+
+    def valid(self):
+        """True while the writer has not started overwriting this frame's slot (always, for a copy)."""
+        return self._meta is None or int(self._meta[_M_SEQ]) == self.seq
+
+    def copy(self):
+        """This frame with its arrays copied out of shared memory, or None if it was overwritten meanwhile."""
+        frame = object.__new__(BusFrame)
+        for name in ('seq', 'step', 'bh_events', 'total_entropy', 'total_temp', 'causality', 'time', 'size'):
+            setattr(frame, name, getattr(self, name))
+        frame.temp, frame.frag, frame.obs = self.temp.copy(), self.frag.copy(), self.obs.copy()
+        frame.black_holes = self.black_holes.copy()
+        frame.entanglements = self.entanglements.copy()
+        frame._meta = None
+        # Checked after copying: the writer invalidates the slot before it touches any of it
+        return frame if self.valid() else None
+
+    @property
+    def bh_locs(self):
+        return np.column_stack(np.divmod(self.black_holes, self.size))
+
+    @property
+    def ent_locs(self):
+        return np.column_stack(np.divmod(self.entanglements.reshape(-1), self.size))
+
+class FrameViewer:
+    """Read side of a bus; attach, detach and re-attach at will."""
+    def __init__(self, name, timeout=5.0):
+        self.shm = _attach(name)
+        self.name = name
+        header = np.ndarray(_HEADER, np.int64, self.shm.buf, 0)
+        deadline = time.monotonic() + timeout
+        while header[_H_MAGIC] != MAGIC:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Frame bus '{name}' is not ready")
+            time.sleep(0.01)
+        if header[_H_VERSION] != BUS_VERSION:
+            raise ValueError(f"Unsupported frame bus version {header[_H_VERSION]}")
+        self.size = int(header[_H_SIZE])
+        self.shape = (self.size, self.size)
+        self._history_cap = int(header[_H_HISTORY])
+        self._block = _Block(self.shm.buf, self.size, int(header[_H_POINTS]), self._history_cap)
+        raw = self._block.info.tobytes().rstrip(b'\0')
+        self._info = json.loads(raw.decode('utf-8')) if raw else {}
+        self._conn = None
+        self.last_seq = 0
+
+    @property
+    def closed(self):
+        """True once the publisher has shut down."""
+        return bool(self._block.header[_H_CLOSED])
+
+    @property
+    def labels(self):
+        return self._block.labels
+
+    @property
+    def steps(self):
+        """Steps recorded in the totals ring so far."""
+        return int(self._block.header[_H_STEPS])
+
+    def latest(self, copy=False):
+        """The newest frame if it is newer than the last one returned, else None.
+
+        With `copy` the frame is copied out of shared memory, so it stays
+        valid however long it is kept; one overwritten during the copy is
+        dropped (None) and the next call returns its successor.
+        """
+        seq = int(self._block.header[_H_LATEST])
+        if seq <= self.last_seq:
+            return None
+        meta, scalars, fields, bh, ent = self._block.slots[seq % 2]
+        frame = BusFrame(seq, meta, scalars, fields, bh, ent, self.size)
+        if not frame.valid():
+            return None
+        self.last_seq = seq
+        return frame.copy() if copy else frame
+
+    def history(self, since=0):
+        """(steps after `since`, as an (n, 3) array of step, total entropy, total temperature; next `since`).
+
+        Only the last `history` steps are kept, so a late joiner starts there.
+        """
+        steps = self.steps
+        start = max(since, steps - self._history_cap)
+        idx = np.arange(start, steps) % self._history_cap
+        return self._block.history[idx], steps
+
+    def send(self, **changes):
+        """Ask the simulator to change parameters; False when there is no one to ask."""
+        if not self._info.get('address') or self.closed:
+            return False
+        try:
+            if self._conn is None:
+                address = self._info['address']
+                self._conn = connection.Client(tuple(address) if isinstance(address, list) else address,
+                                               authkey=bytes.fromhex(self._info['authkey']))
+            self._conn.send(changes)
+            return True
+        except (OSError, EOFError, connection.AuthenticationError):
+            self._conn = None
+            return False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.shm is not None:
+            self._block = None
+            try:
+                self.shm.close()
+            except BufferError:
+                # Frames still referenced by the caller keep the mapping alive until they are dropped
+                pass
+            self.shm = None
@@ -0,0 +1,1160 @@
+"""Tkinter/matplotlib front-end for the simulator."""
+import numpy as np
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import matplotlib
+# Font settings
+matplotlib.rcParams['font.family'] = 'Arial' 
+import matplotlib.pyplot as plt
+from tkinter import scrolledtext
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+import threading
+import queue
+import time
+from collections import deque
+from datetime import datetime
+
+from .engine import FinalGridSimulator, SimulationParams
+from .framebus import FramePublisher, FrameViewer
+from .regions import RegionMap
+from .snapshots import SnapshotArchive
+from .checkpoint import save_checkpoint
+from .profiling import PhaseProfiler
+from .events import (LOG_OFF, EVENT_BLACK_HOLE, EVENT_OBSERVATION, EVENT_ENTANGLEMENT_CREATED,
+                     EVENT_ENTANGLEMENT_EFFECT)
+
+# --------------------------
+# --- Style Constants ---
+# --------------------------
+# Dark Theme Color Palette
+BG_DARK = "#1a1a2e"
+BG_MEDIUM = "#16213e"
+BG_LIGHT = "#0f3460"
+ACCENT_PRIMARY = "#e94560" # Red/Pink Accent
+ACCENT_SECONDARY = "#00d4ff" # Cyan Accent
+TEXT_PRIMARY = "#eaeaea"
+TEXT_SECONDARY = "#a0a0a0"
+SPECIAL_BH_COLOR = "#FF00FF" # Vivid Pink/Magenta for Black Hole
+SPECIAL_OBS_COLOR = "#ffff00" # Vivid Yellow for Observation
+
+# --------------------------
+# --- Modern Styled Button ---
+# --------------------------
+class ModernButton(tk.Canvas):
+    def __init__(self, parent, text, command, width=120, height=40, bg_color=ACCENT_PRIMARY, hover_color=ACCENT_SECONDARY):
+        super().__init__(parent, width=width, height=height, bg=BG_DARK, highlightthickness=0)
+        self.text = text
+        self.command = command
+        self.bg_color = bg_color
+        self.hover_color = hover_color
+        self.current_color = bg_color
+        
+        self.rect = self.create_rectangle(2, 2, width-2, height-2, fill=bg_color, outline=bg_color, width=2)
+        self.text_obj = self.create_text(width//2, height//2, text=text, fill=TEXT_PRIMARY, font=("Arial", 11, "bold"))
+        
+        self.bind("<Enter>", self.on_enter)
+        self.bind("<Leave>", self.on_leave)
+        self.bind("<Button-1>", self.on_click)
+        
+    def on_enter(self, e):
+        self.itemconfig(self.rect, fill=self.hover_color, outline=self.hover_color)
+        
+    def on_leave(self, e):
+        self.itemconfig(self.rect, fill=self.bg_color, outline=self.bg_color)
+        
+    def on_click(self, e):
+        original_fill = self.bg_color
+        self.itemconfig(self.rect, fill=ACCENT_SECONDARY if original_fill != ACCENT_SECONDARY else ACCENT_PRIMARY, outline="white")
+        self.update_idletasks()
+        self.after(100, lambda: self.itemconfig(self.rect, fill=original_fill, outline=original_fill))
+        self.command()
+
+# --------------------------
+# --- Rendering Layer ---
+# --------------------------
+def _fit_limits(lo, hi, data_lo, data_hi, headroom):
+    """Current (lo, hi) if the data fits, else a wider range with `headroom` spare on each side."""
+    if lo <= data_lo and data_hi <= hi:
+        return lo, hi
+    span = max(data_hi - data_lo, 1.0)
+    return data_lo - headroom * span, data_hi + headroom * span
+
+class FieldView:
+    """One heat-map panel whose artists are created once and updated in place."""
+    def __init__(self, fig, ax, shape, title, cmap, agent_color, label_text, regions):
+        self.ax = ax
+        ax.set_facecolor(BG_LIGHT)
+        ax.set_title(title, color=TEXT_PRIMARY, fontsize=12, fontweight='bold', pad=10)
+        self.vmin = 0.1
+        self.vmax = 1
+        self.image = ax.imshow(np.zeros(shape), cmap=cmap, interpolation='nearest',
+                               vmin=self.vmin, vmax=self.vmax, animated=True)
+        self.cbar = fig.colorbar(self.image, ax=ax, fraction=0.046, pad=0.04)
+        self.cbar.set_label(label_text, color=TEXT_PRIMARY, fontsize=9, rotation=270, labelpad=15)
+        self.cbar.ax.tick_params(colors=TEXT_PRIMARY, labelsize=8)
+        self.cbar.outline.set_edgecolor(TEXT_SECONDARY)
+
+        # Region borders as one collection; animated like the image so it is drawn on top of it on every blit
+        self.region_outline = ax.add_collection(LineCollection(
+            regions.boundary_segments(), colors=agent_color, linewidths=2.5, linestyles='--', animated=True))
+        self.bh = ax.scatter([], [], s=12**2, marker='o', facecolor=SPECIAL_BH_COLOR, edgecolor=BG_DARK,
+                             alpha=0.9, label='Black Hole', animated=True)
+        self.ent = ax.scatter([], [], s=14**2, marker='X', facecolor=ACCENT_SECONDARY, edgecolor=ACCENT_SECONDARY,
+                              linewidth=2, alpha=0.9, label='Entangled', animated=True)
+        ax.set_xlim(-0.5, shape[-1] - 0.5)
+        ax.set_ylim(shape[-2] - 0.5, -0.5)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_color(BG_LIGHT)
+
+    @property
+    def artists(self):
+        return (self.image, self.region_outline, self.bh, self.ent)
+
+    @staticmethod
+    def _offsets(locs):
+        # (row, col) cells -> (x, y) = (col, row) points
+        return np.asarray(locs, dtype=float).reshape(-1, 2)[:, ::-1]
+
+    def update(self, matrix, v_max, bh_locs, ent_locs):
+        """Refresh the panel; returns True when the colour scale changed (colorbar needs a full draw)."""
+        self.image.set_data(matrix)
+        self.bh.set_offsets(self._offsets(bh_locs))
+        self.ent.set_offsets(self._offsets(ent_locs))
+        v_max = max(v_max, 1)
+        if v_max <= self.vmax:
+            return False
+        # Grow the scale with headroom so a slowly rising maximum does not redraw the colorbar every step
+        self.vmax = v_max * 1.2
+        self.image.set_clim(self.vmin, self.vmax)
+        return True
+
+    def reset(self):
+        self.vmax = 1
+        self.image.set_data(np.zeros(self.image.get_array().shape))
+        self.image.set_clim(self.vmin, self.vmax)
+        self.bh.set_offsets(np.empty((0, 2)))
+        self.ent.set_offsets(np.empty((0, 2)))
+
+class MinMaxSeries:
+    """Append-only (x, y) series drawn with a bounded number of vertices.
+
+    Consecutive samples are grouped into buckets of `stride` points and each
+    bucket keeps only its minimum and maximum, so short spikes (black-hole
+    bursts) stay visible. When `budget` vertices are reached the stride
+    doubles and neighbouring buckets are merged; appending is O(1) and the
+    drawn vertex count never exceeds budget + 3.
+    """
+    def __init__(self, budget=2000):
+        self.buckets = max(2, budget // 2)
+        self._min = np.empty((self.buckets, 2))
+        self._max = np.empty((self.buckets, 2))
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.stride = 1
+        self.samples = 0
+        self.first = None
+        self.last = None
+        self.ymin = np.inf
+        self.ymax = -np.inf
+        self._pending = 0
+        self._pmin = self._pmax = None
+
+    def append(self, x, y):
+        point = (x, y)
+        if self.first is None:
+            self.first = point
+        self.last = point
+        self.samples += 1
+        self.ymin = min(self.ymin, y)
+        self.ymax = max(self.ymax, y)
+        if not self._pending:
+            self._pmin = self._pmax = point
+        elif y < self._pmin[1]:
+            self._pmin = point
+        elif y > self._pmax[1]:
+            self._pmax = point
+        self._pending += 1
+        if self._pending == self.stride:
+            if self.count == self.buckets:
+                self._merge()
+            self._min[self.count] = self._pmin
+            self._max[self.count] = self._pmax
+            self.count += 1
+            self._pending = 0
+
+    def _merge(self):
+        half = self.count // 2
+        pairs = slice(0, 2 * half, 2), slice(1, 2 * half, 2)
+        a, b = self._min[pairs[0]], self._min[pairs[1]]
+        self._min[:half] = np.where((b[:, 1] < a[:, 1])[:, None], b, a)
+        a, b = self._max[pairs[0]], self._max[pairs[1]]
+        self._max[:half] = np.where((b[:, 1] > a[:, 1])[:, None], b, a)
+        if self.count % 2:
+            self._min[half] = self._min[self.count - 1]
+            self._max[half] = self._max[self.count - 1]
+            half += 1
+        self.count = half
+        self.stride *= 2
+
+    def vertices(self):
+        """(x, y) arrays to draw: each bucket's min and max in x order, then the partial bucket."""
+        mn, mx = self._min[:self.count], self._max[:self.count]
+        min_first = (mn[:, 0] <= mx[:, 0])[:, None]
+        points = np.empty((2 * self.count, 2))
+        points[0::2] = np.where(min_first, mn, mx)
+        points[1::2] = np.where(min_first, mx, mn)
+        if self.last is not None:
+            # The newest sample is always drawn, even when it is neither its bucket's min nor max
+            tail = sorted({self._pmin, self._pmax, self.last}) if self._pending else [self.last]
+            points = np.concatenate([points, np.array(tail, dtype=float)])
+        return points[:, 0], points[:, 1]
+
+class StatsView:
+    """Global statistics panel: entropy and temperature lines on twin axes."""
+    def __init__(self, ax, ax2):
+        self.ax = ax
+        self.ax2 = ax2
+        ax.set_title(" Global Statistics", color=TEXT_PRIMARY, fontsize=12, fontweight='bold', pad=10)
+        ax.set_facecolor(BG_LIGHT)
+        (self.entropy_line,) = ax.plot([], [], label='Total Entropy', color='#2ecc71', linewidth=2, alpha=0.6,
+                                       animated=True)
+        (self.entropy_dot,) = ax.plot([], [], 'o', color='#2ecc71', markersize=6, alpha=1.0, animated=True)
+        ax.set_ylabel('Total Entropy', color='#2ecc71', fontsize=10, fontweight='bold')
+        ax.tick_params(axis='y', labelcolor='#2ecc71')
+        (self.temp_line,) = ax2.plot([], [], label='Total Temp', color=ACCENT_PRIMARY, linestyle='--',
+                                     linewidth=2, alpha=0.6, animated=True)
+        (self.temp_dot,) = ax2.plot([], [], 'o', color=ACCENT_PRIMARY, markersize=6, alpha=1.0, animated=True)
+        ax2.set_ylabel('Total Temp', color=ACCENT_PRIMARY, fontsize=10, fontweight='bold')
+        ax2.tick_params(axis='y', labelcolor=ACCENT_PRIMARY)
+
+        lines = [self.entropy_line, self.temp_line]
+        ax.legend(lines, [l.get_label() for l in lines], loc='upper left', fontsize=8,
+                  framealpha=0.8, facecolor=BG_MEDIUM, edgecolor=TEXT_SECONDARY)
+        ax.set_xlabel('Step', fontsize=10, color=TEXT_PRIMARY)
+        ax.grid(True, alpha=0.2, color=TEXT_SECONDARY)
+        for a in (ax, ax2):
+            a.spines['top'].set_color(BG_LIGHT)
+            a.spines['bottom'].set_color(TEXT_SECONDARY)
+            a.spines['left'].set_color(TEXT_SECONDARY)
+            a.spines['right'].set_color(TEXT_SECONDARY)
+            a.tick_params(colors=TEXT_SECONDARY)
+        self.reset()
+
+    @property
+    def artists(self):
+        return (self.entropy_line, self.entropy_dot, self.temp_line, self.temp_dot)
+
+    def reset(self):
+        for line in self.artists:
+            line.set_data([], [])
+        self.ax.set_xlim(0, 10)
+        self.ax.set_ylim(0, 1)
+        self.ax2.set_ylim(0, 1)
+
+    def update(self, entropy, temp):
+        """Redraw from two MinMaxSeries; returns True when an axis range changed (ticks need a full draw)."""
+        if entropy.samples < 2:
+            return False
+        self.entropy_line.set_data(*entropy.vertices())
+        self.temp_line.set_data(*temp.vertices())
+        self.entropy_dot.set_data([entropy.last[0]], [entropy.last[1]])
+        self.temp_dot.set_data([temp.last[0]], [temp.last[1]])
+
+        changed = False
+        for ax, getter, setter, lo, hi, headroom in (
+                (self.ax, self.ax.get_xlim, self.ax.set_xlim, entropy.first[0], entropy.last[0], 0.5),
+                (self.ax, self.ax.get_ylim, self.ax.set_ylim, entropy.ymin, entropy.ymax, 0.25),
+                (self.ax2, self.ax2.get_ylim, self.ax2.set_ylim, temp.ymin, temp.ymax, 0.25)):
+            old = getter()
+            new = _fit_limits(old[0], old[1], lo, hi, headroom)
+            if new != old:
+                setter(*new)
+                changed = True
+        return changed
+
+class FrameRenderer:
+    """Blitted drawing of the four panels.
+
+    Static parts (titles, colorbars, agent outlines, legend, grid) live in a
+    cached background; each frame restores it and redraws only the animated
+    artists. A full draw (and new background) happens only when a colour
+    scale or axis range changes, or the figure is resized.
+    """
+    def __init__(self, fig, canvas, fields, stats):
+        self.fig = fig
+        self.canvas = canvas
+        self.fields = fields
+        self.stats = stats
+        # Figure-level animated artists (e.g. the profiling overlay) drawn on top of every frame
+        self.overlays = []
+        self.background = None
+        self.dirty = True
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _animated(self):
+        for view in self.fields:
+            yield from ((view.ax, a) for a in view.artists)
+        yield from ((a.axes, a) for a in self.stats.artists)
+        yield from ((self.fig, a) for a in self.overlays)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for ax, artist in self._animated():
+            ax.draw_artist(artist)
+
+    def invalidate(self):
+        self.dirty = True
+
+    def draw(self):
+        if self.dirty or self.background is None:
+            self.dirty = False
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def update(self, matrices, v_maxes, bh_locs, ent_locs, entropy, temp):
+        for view, matrix, v_max in zip(self.fields, matrices, v_maxes):
+            if view.update(matrix, v_max, bh_locs, ent_locs):
+                self.dirty = True
+        if self.stats.update(entropy, temp):
+            self.dirty = True
+        self.draw()
+
+    def reset(self):
+        for view in self.fields:
+            view.reset()
+        self.stats.reset()
+        self.dirty = True
+        self.draw()
+
+# --------------------------
+# --- Log Panel ---
+# --------------------------
+# Text tag that colours each kind of event line
+EVENT_TAGS = {
+    EVENT_BLACK_HOLE: "bh_event",
+    EVENT_OBSERVATION: "observation",
+    EVENT_ENTANGLEMENT_CREATED: "entanglement",
+    EVENT_ENTANGLEMENT_EFFECT: "entanglement",
+}
+LOG_FILTERS = {
+    "All events": None,
+    "Black holes": {EVENT_BLACK_HOLE},
+    "Observations": {EVENT_OBSERVATION},
+    "Entanglement": {EVENT_ENTANGLEMENT_CREATED, EVENT_ENTANGLEMENT_EFFECT},
+}
+
+class LogPanel:
+    """System log backed by a ring of the newest `max_lines` event lines.
+
+    New lines are buffered and written to the Text widget at most once per
+    `interval` seconds in a single insert, each line carrying the tag of its
+    event kind. Old lines are trimmed from the widget in bulk. The ring
+    keeps every kind, so changing the filter just redraws from it.
+    """
+    def __init__(self, text, max_lines=2000, interval=0.25):
+        self.text = text
+        self.max_lines = max_lines
+        self.interval = interval
+        self.lines = deque(maxlen=max_lines)
+        self._pending = deque(maxlen=max_lines)
+        self.kinds = None
+        self._shown = 0
+        self._shown_step = None
+        self._last_flush = 0.0
+
+    def add_steps(self, steps):
+        """Queue the event lines of [(step, StepEvents)], oldest first.
+
+        Only the newest `max_lines` lines can survive in the ring, so older
+        steps of a large batch are never formatted at all.
+        """
+        batches, total = [], 0
+        for step, events in reversed(steps):
+            if total >= self.max_lines:
+                break
+            batch = [(step, kind, text) for kind, text in events.lines()]
+            batches.append(batch)
+            total += len(batch)
+        for batch in reversed(batches):
+            self.lines.extend(batch)
+            self._pending.extend(batch)
+
+    def _chunks(self, lines):
+        """Insert arguments (text, tag, text, tag, ...) for the lines that pass the filter."""
+        args = []
+        for step, kind, text in lines:
+            if self.kinds is not None and kind not in self.kinds:
+                continue
+            if step != self._shown_step:
+                args += [f"─── Step {step} ───\n", "step_header"]
+                self._shown_step = step
+            args += [text, EVENT_TAGS[kind]]
+        return args
+
+    def flush(self, force=False):
+        now = time.perf_counter()
+        if not self._pending or (not force and now - self._last_flush < self.interval):
+            return
+        self._last_flush = now
+        args = self._chunks(self._pending)
+        self._pending.clear()
+        if not args:
+            return
+        self.text.insert(tk.END, *args)
+        self._shown += len(args) // 2
+        # Trim in bulk once the widget is 10% over its cap
+        excess = self._shown - self.max_lines
+        if excess > self.max_lines // 10:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._shown -= excess
+        self.text.yview(tk.END)
+
+    def set_filter(self, kinds):
+        """Show only these event kinds (None = all) and redraw from the ring."""
+        self.kinds = kinds
+        self.text.delete("1.0", tk.END)
+        self._shown = 0
+        self._shown_step = None
+        self._pending = deque(self.lines, maxlen=self.max_lines)
+        self.flush(force=True)
+
+    def clear(self):
+        self.lines.clear()
+        self._pending.clear()
+        self.text.delete("1.0", tk.END)
+        self._shown = 0
+        self._shown_step = None
+
+# --------------------------
+# --- Frame Pipeline ---
+# --------------------------
+class Frame:
+    """Latest simulation output, handed from the stepping thread to the Tk main loop."""
+    __slots__ = ('step', 'temp', 'frag', 'obs', 'bh_locs', 'ent_locs', 'bh_events')
+
+    def __init__(self, step, temp, frag, obs, bh_locs, ent_locs, bh_events):
+        self.step = step
+        self.temp = temp
+        self.frag = frag
+        self.obs = obs
+        self.bh_locs = bh_locs
+        self.ent_locs = ent_locs
+        self.bh_events = bh_events
+
+# --------------------------
+# --- GUI ---
+# --------------------------
+class SimulationGUI:
+    def __init__(self, root, simulator, steps=500, delay=0.5, archive=None, checkpoint=None, checkpoint_every=0,
+                 fps=20, log_lines=2000, viewer=None):
+        self.root = root
+        self.simulator = simulator
+        # FrameViewer of another process's simulation; then `simulator` is None and frames come from the bus
+        self.viewer = viewer
+        # Phase timings of the engine (worker thread) and of drawing (Tk thread); off unless enabled
+        if simulator is None:
+            self.profiler = PhaseProfiler(enabled=False)
+        else:
+            if simulator.profiler is None:
+                simulator.profiler = PhaseProfiler(enabled=False)
+            self.profiler = simulator.profiler
+        self._profile_time = 0.0
+        # SnapshotArchive browsed with the replay slider, if any
+        self.archive = archive
+        # Checkpoint file written every `checkpoint_every` steps and when the run completes
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.steps = steps
+        # Seconds per simulation step (0 = as fast as the engine goes); drawing never slows stepping
+        self.delay = delay 
+        self.running = False
+        self.current_step = simulator.step_count if viewer is None else 0
+
+        # Stepping thread -> Tk main loop: only the newest frame is kept, every step's record is
+        self._frames = queue.Queue(maxsize=1)
+        self._records = deque()
+        self._worker = None
+        self.finished = False
+        self.frame_interval = max(1, int(1000 / fps))
+        # Decimated copies of the simulator's histories for the stats panel
+        self.entropy_series = MinMaxSeries()
+        self.temp_series = MinMaxSeries()
+        if viewer is None:
+            first = simulator.step_count - len(simulator.total_entropy_history) + 1
+            for step, total_entropy, total_temp in zip(range(first, simulator.step_count + 1),
+                                                       simulator.total_entropy_history, simulator.total_temp_history):
+                self.entropy_series.append(step, total_entropy)
+                self.temp_series.append(step, total_temp)
+        # Position in the bus's per-step totals ring
+        self._history_pos = 0
+        self._causality_synced = False
+        # Value last put on the slider by code: its command echo must not be sent to the publisher
+        self._slider_set = None
+        self._rate_time = time.perf_counter()
+        self._rate_steps = self.current_step
+        self._rate_frames = 0
+        self.steps_per_sec = 0.0
+        self.fps = 0.0
+        
+        # Attached viewers do not know the publisher's parameters beyond what frames carry
+        params = simulator.params if viewer is None else SimulationParams()
+        self.max_temp_val = params.cbr_strength * 10
+        self.max_frag_val = 1 
+        self.max_obs_val = 1 
+
+        self.loading_text_ref = None 
+
+        root.title("Quantum Causality Simulator")
+        root.configure(bg=BG_DARK)
+        
+        style = ttk.Style()
+        style.theme_use('clam')
+        style.configure('Dark.TFrame', background=BG_DARK)
+        style.configure('Medium.TFrame', background=BG_MEDIUM)
+        style.configure('Dark.TLabel', background=BG_DARK, foreground=TEXT_PRIMARY, font=("Arial", 10))
+        style.configure('Title.TLabel', background=BG_DARK, foreground=ACCENT_SECONDARY, font=("Arial", 14, "bold"))
+        style.configure('Dark.TLabelframe', background=BG_MEDIUM, foreground=TEXT_PRIMARY, borderwidth=2)
+        style.configure('Dark.TLabelframe.Label', background=BG_MEDIUM, foreground=ACCENT_SECONDARY, font=("Arial", 11, "bold"))
+
+        style.configure('TProgressbar', 
+                        troughcolor=BG_DARK, 
+                        background=ACCENT_PRIMARY,
+                        bordercolor=BG_MEDIUM,
+                        lightcolor=ACCENT_SECONDARY,
+                        darkcolor=ACCENT_PRIMARY,
+                        thickness=10)
+        
+        main_container = ttk.Frame(root, style='Dark.TFrame')
+        main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        header_frame = ttk.Frame(main_container, style='Dark.TFrame')
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        title_label = ttk.Label(header_frame, text="⚛️ Quantum Causality Simulator (Enhanced)", style='Title.TLabel')
+        title_label.pack(side=tk.LEFT)
+        
+        left_panel = ttk.Frame(main_container, style='Dark.TFrame')
+        left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        
+        log_frame = ttk.LabelFrame(left_panel, text="📊 System Log (Important Events Highlighted)", style='Dark.TLabelframe')
+        log_frame.pack(fill=tk.X, pady=(0, 8))
+
+        filter_frame = ttk.Frame(log_frame, style='Medium.TFrame')
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(filter_frame, text="Show:", style='Dark.TLabel', background=BG_MEDIUM).pack(side=tk.LEFT)
+        self.log_filter = ttk.Combobox(filter_frame, values=list(LOG_FILTERS), state='readonly', width=14)
+        self.log_filter.current(0)
+        self.log_filter.bind('<<ComboboxSelected>>', self.update_log_filter)
+        self.log_filter.pack(side=tk.LEFT, padx=5)
+        
+        self.text_area = scrolledtext.ScrolledText(log_frame, width=60, height=6, 
+                                                 bg=BG_LIGHT, fg=TEXT_PRIMARY, 
+                                                 insertbackground=ACCENT_SECONDARY,
+                                                 font=("Consolas", 8),
+                                                 relief=tk.FLAT)
+        self.text_area.pack(padx=5, pady=5)
+        
+        self.text_area.tag_config("bh_event", foreground=SPECIAL_BH_COLOR, font=("Consolas", 8, "bold"))
+        self.text_area.tag_config("observation", foreground=SPECIAL_OBS_COLOR, font=("Consolas", 8, "bold"))
+        self.text_area.tag_config("entanglement", foreground=ACCENT_SECONDARY, font=("Consolas", 8, "bold"))
+        self.text_area.tag_config("step_header", foreground=TEXT_SECONDARY, font=("Consolas", 8))
+        self.log_panel = LogPanel(self.text_area, max_lines=log_lines)
+
+        viz_frame = ttk.Frame(left_panel, style='Medium.TFrame')
+        viz_frame.pack(fill=tk.BOTH, expand=True)
+        
+        plt.style.use('dark_background')
+        self.fig, ((self.ax_temp, self.ax_frag), (self.ax_obs, self.ax_stats)) = plt.subplots(
+            2, 2, figsize=(7, 5), facecolor=BG_MEDIUM
+        )
+        
+        for ax in [self.ax_temp, self.ax_frag, self.ax_obs, self.ax_stats]:
+            ax.set_facecolor(BG_LIGHT)
+        
+        self.ax2_stats = self.ax_stats.twinx()
+        
+        self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
+        self.canvas.get_tk_widget().configure(bg=BG_MEDIUM)
+        self.canvas.get_tk_widget().pack(padx=5, pady=5)
+
+        if viewer is None:
+            shape, regions = simulator.shape, simulator.regions
+        else:
+            shape, regions = viewer.shape, RegionMap(viewer.labels)
+        fields = [
+            FieldView(self.fig, self.ax_temp, shape, " Local Temperature", 'inferno', SPECIAL_OBS_COLOR,
+                      'Temperature (Hot)', regions),
+            FieldView(self.fig, self.ax_frag, shape, " Info Fragments", 'viridis', SPECIAL_OBS_COLOR,
+                      'Fragments (High Entropy)', regions),
+            FieldView(self.fig, self.ax_obs, shape, " Observation Density", 'plasma', ACCENT_SECONDARY,
+                      'Observations (Fixed Reality)', regions),
+        ]
+        self.fig.tight_layout()
+        self.renderer = FrameRenderer(self.fig, self.canvas, fields, StatsView(self.ax_stats, self.ax2_stats))
+        self.profile_text = self.fig.text(0.01, 0.99, '', ha='left', va='top', family='monospace', fontsize=7,
+                                          color=TEXT_PRIMARY, animated=True, visible=self.profiler.enabled,
+                                          bbox=dict(facecolor=BG_DARK, edgecolor=ACCENT_SECONDARY, alpha=0.85))
+        self.renderer.overlays.append(self.profile_text)
+
+        control_panel = ttk.Frame(left_panel, style='Medium.TFrame')
+        control_panel.pack(fill=tk.X, pady=(10, 0))
+        
+        button_frame = ttk.Frame(control_panel, style='Medium.TFrame')
+        button_frame.pack(side=tk.LEFT, padx=10, pady=10)
+        
+        self.start_button = ModernButton(button_frame, "▶ Start", self.start_simulation, 
+                                         bg_color="#2ecc71", hover_color="#27ae60")
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        
+        self.pause_button = ModernButton(button_frame, "⏸ Pause", self.pause_simulation,
+                                         bg_color="#f39c12", hover_color="#e67e22")
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        
+        self.reset_button = ModernButton(button_frame, "🔄 Reset", self.reset_simulation,
+                                         bg_color=ACCENT_PRIMARY, hover_color="#c0392b")
+        self.reset_button.pack(side=tk.LEFT, padx=5)
+        
+        self.help_button = ModernButton(button_frame, "❓ Help", self.show_help,
+                                        bg_color=ACCENT_SECONDARY, hover_color="#0099cc")
+        self.help_button.pack(side=tk.LEFT, padx=5)
+        
+        # NEW: Export Button
+        self.export_button = ModernButton(button_frame, "💾 Export", self.export_data,
+                                         bg_color="#9b59b6", hover_color="#8e44ad")
+        self.export_button.pack(side=tk.LEFT, padx=5)
+        
+        status_progress_frame = ttk.Frame(control_panel, style='Medium.TFrame')
+        status_progress_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        
+        self.stats_label = ttk.Label(status_progress_frame, text="Step: 0 | BH events: 0 | Total Entropy: 0", 
+                                     style='Dark.TLabel', font=("Arial", 11, "bold"))
+        self.stats_label.pack(pady=(0, 5))
+        
+        self.progress_bar = ttk.Progressbar(status_progress_frame, orient=tk.HORIZONTAL, length=200, mode='determinate', style='TProgressbar')
+        self.progress_bar.pack(pady=(0, 5), fill=tk.X)
+
+        right_panel = ttk.Frame(main_container, style='Medium.TFrame')
+        right_panel.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 0))
+        
+        causality_frame = ttk.LabelFrame(right_panel, text="⚡ Causality Control", style='Dark.TLabelframe')
+        causality_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+        
+        self.causality_label = ttk.Label(causality_frame, 
+                                         text=f"Causality Strength: {params.causality_strength:.2f}", 
+                                         style='Dark.TLabel', font=("Arial", 10, "bold"))
+        self.causality_label.pack(pady=(10, 5))
+        
+        slider_container = tk.Frame(causality_frame, bg=BG_MEDIUM)
+        slider_container.pack(pady=5)
+        
+        self.causality_slider = tk.Scale(slider_container, from_=0.0, to=1.0, resolution=0.01,
+                                         orient=tk.HORIZONTAL, length=200, 
+                                         command=self.update_causality,
+                                         bg=BG_LIGHT, fg=TEXT_PRIMARY, 
+                                         troughcolor=BG_DARK, 
+                                         activebackground=ACCENT_SECONDARY,
+                                         highlightthickness=0,
+                                         font=("Arial", 8))
+        self._set_causality_slider(params.causality_strength)
+        self.causality_slider.pack()
+        
+        slider_label = ttk.Label(causality_frame, text="← Chaos | Determinism →", 
+                                 style='Dark.TLabel', font=("Arial", 9, "italic"))
+        slider_label.pack(pady=(0, 10))
+
+        profile_frame = ttk.LabelFrame(right_panel, text="⏱ Profiling", style='Dark.TLabelframe')
+        profile_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+        self.profile_var = tk.BooleanVar(value=self.profiler.enabled)
+        tk.Checkbutton(profile_frame, text="Show phase timings", variable=self.profile_var,
+                       command=self.toggle_profiling,
+                       bg=BG_MEDIUM, fg=TEXT_PRIMARY, selectcolor=BG_DARK,
+                       activebackground=BG_MEDIUM, activeforeground=TEXT_PRIMARY,
+                       highlightthickness=0, font=("Arial", 9)).pack(anchor=tk.W, padx=5, pady=5)
+
+        if archive is not None and len(archive):
+            replay_frame = ttk.LabelFrame(right_panel, text="⏪ Replay", style='Dark.TLabelframe')
+            replay_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+            self.replay_slider = tk.Scale(replay_frame, from_=int(archive.steps[0]), to=int(archive.steps[-1]),
+                                          resolution=archive.every, orient=tk.HORIZONTAL, length=200,
+                                          command=self.seek_snapshot,
+                                          bg=BG_LIGHT, fg=TEXT_PRIMARY,
+                                          troughcolor=BG_DARK,
+                                          activebackground=ACCENT_SECONDARY,
+                                          highlightthickness=0,
+                                          font=("Arial", 8))
+            self.replay_slider.pack(pady=10)
+
+        desc_frame = ttk.LabelFrame(right_panel, text="📖 Quick Guide", style='Dark.TLabelframe')
+        desc_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        self.description = scrolledtext.ScrolledText(desc_frame, width=30, height=15,
+                                                     bg=BG_LIGHT, fg=TEXT_PRIMARY,
+                                                     font=("Arial", 8),
+                                                     relief=tk.FLAT,
+                                                     wrap=tk.WORD)
+        self.description.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
+        self.description.insert(tk.END,
+            "🎯 Quick Guide\n\n"
+            "【Grid Explanation】\n"
+            "• **Refer to colorbars**\n"
+            "• **Grid markers:**\n"
+            "  - ⚫︎: Black Hole event\n"
+            "  - ✖️: Quantum entanglement\n\n"
+            "• Top-left: Local Temperature \n"
+            "  Information processing activity\n\n"
+            "• Top-right: Info Fragments \n"
+            "  Entropy accumulation\n\n"
+            "• Bottom-left: Observation Density \n"
+            "  Consciousness emergence zone\n\n"
+            "• Bottom-right: Statistics Graph \n"
+            "  (Latest data emphasized)\n\n"
+            "【Causality Control】\n"
+            "Adjust determinism vs.\n"
+            "randomness with slider\n\n"
+            "Central 3×3 white box is\n"
+            "the observation agent area\n\n"
+            "【Export Function】\n"
+            "Click 💾 Export to save\n"
+            "simulation data as CSV"
+        )
+        self.description.config(state=tk.DISABLED)
+
+    def _get_help_text(self):
+        return """
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    ⚛️ Quantum Causality Simulator - Complete Guide
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+[OVERVIEW]
+This simulator visualizes the computational physics concept 
+that "the universe is an information processing system."
+
+Observe in real-time how concepts from quantum theory, 
+thermodynamics, and information theory interact within 
+a 5x5 grid space.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[DETAILED GRID EXPLANATION]
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+ Local Temperature
+• Color Scale: **Inferno (Black → Yellow)**
+• Meaning: **Information processing activity** or 
+  **energy density** at each cell.
+• Dynamics: Rises due to new events and observation. 
+  Diffuses to neighbors based on CAUSALITY_STRENGTH.
+→ **Brighter colors (more yellow) = higher temperature**
+
+ Info Fragments (Entropy Fragments)
+• Color Scale: **Viridis (Purple → Yellow)**
+• Meaning: Represents the **trace of lost/dissipated 
+  information** and total **entropy (randomness)**.
+• Dynamics: Increases due to information processing 
+  and Black Hole events.
+→ **Brighter colors (more yellow) = greater entropy**
+
+ Observation Density
+• Color Scale: **Plasma (Dark Blue → Yellow)**
+• Meaning: Cumulative count of **"observations 
+  (information determination)"** in that cell.
+• Feature: The **Agent Area** (central 3x3) has high 
+  observation probability.
+→ **Brighter colors = more "determined reality"**
+
+ Global Statistics
+• **Green Line: Total Entropy** | **Red Line: Total Temp**
+• Dynamics: Uses transparency on the line and marks 
+  the latest data point for visual dynamism.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[GRID ICONS]
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+• **⚫︎ (Vivid Pink Circle)**: Black Hole (BH) event 
+  occurred in this cell in the current step.
+• **✖️ (Cyan Cross)**: This cell is currently part of 
+  a Quantum Entanglement pair.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[CAUSALITY CONTROL PARAMETER]
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+⚡ **CAUSALITY_STRENGTH**
+
+| Value | 1.0 (Determinism) | 0.0 (Chaos/Free Will) |
+|---|---|---|
+| **Diffusion** | Maximized | Stopped |
+| **Quantum Fluctuation**| Minimized | Dominant |
+
+→ Visual philosophical experiment: **"Fate vs. Free Will"**
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[EXPORT FUNCTION]
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+💾 **Export to CSV**
+
+Click the Export button to save simulation data including:
+• Step number
+• Total entropy per step
+• Total temperature per step
+• Black hole events (total and per step)
+• Entanglement pairs count
+• Observations and entanglement effects per step
+• Causality strength value
+
+Data is saved with timestamp in filename for easy tracking.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+        
+    def show_help(self):
+        help_window = tk.Toplevel(self.root)
+        help_window.title("Complete Guide | Quantum Causality Simulator")
+        help_window.configure(bg=BG_DARK)
+        
+        help_text_area = scrolledtext.ScrolledText(help_window, width=80, height=35, 
+                                                 wrap=tk.WORD, font=("Arial", 10),
+                                                 bg=BG_LIGHT, fg=TEXT_PRIMARY,
+                                                 relief=tk.FLAT)
+        help_text_area.pack(padx=15, pady=15)
+        
+        help_text_area.insert(tk.END, self._get_help_text())
+        help_text_area.config(state=tk.DISABLED)
+
+    def update_log_filter(self, event=None):
+        self.log_panel.set_filter(LOG_FILTERS[self.log_filter.get()])
+
+    def toggle_profiling(self):
+        enabled = self.profile_var.get()
+        self.profiler.reset()
+        self.profiler.enabled = enabled
+        self.profile_text.set_text("Collecting phase timings..." if enabled else "")
+        self.profile_text.set_visible(enabled)
+        self.renderer.draw()
+
+    def _update_profile_overlay(self):
+        # Percentiles are recomputed about once a second, not every frame
+        now = time.perf_counter()
+        if now - self._profile_time < 1.0:
+            return
+        self._profile_time = now
+        self.profile_text.set_text(self.profiler.format_summary())
+
+    def _set_causality_slider(self, value):
+        """Move the slider from code. Tk still calls update_causality, possibly later, but a viewer sends nothing."""
+        self._slider_set = round(value, 2)
+        self.causality_slider.set(self._slider_set)
+
+    def update_causality(self, value):
+        if self.viewer is not None:
+            programmatic, self._slider_set = float(value) == self._slider_set, None
+            if not programmatic:
+                # Moved by the user: applied by the simulating process before its next step
+                self.viewer.send(causality_strength=float(value))
+        else:
+            self.simulator.params.causality_strength = float(value)
+        self.causality_label.config(text=f"Causality Strength: {float(value):.2f}")
+
+    def seek_snapshot(self, value):
+        """Show the archived frame of the slider's step."""
+        frame = self.archive.frame(int(float(value)))
+        self.running = False
+        self.current_step = frame.step
+        self.max_temp_val = max(self.max_temp_val, np.max(frame.temperature))
+        self.max_frag_val = max(self.max_frag_val, np.max(frame.fragments))
+        self.max_obs_val = max(self.max_obs_val, np.max(frame.observations))
+        self.update_plots(frame.temperature, frame.fragments, frame.observations, frame.bh_locs, frame.ent_locs)
+        self.stats_label.config(text=f"Replay Step: {frame.step} | BH events: {len(frame.black_holes)} | "
+                                     f"Total Entropy: {np.sum(frame.fragments):.0f}")
+
+    def show_loading(self):
+        self.loading_text_ref = self.fig.text(0.5, 0.5, 'Now Loading...', 
+                                              ha='center', va='center', 
+                                              fontsize=30, color=ACCENT_SECONDARY, 
+                                              weight='bold', transform=self.fig.transFigure)
+        self.canvas.draw_idle()
+
+    def hide_loading(self):
+        if self.loading_text_ref:
+            self.loading_text_ref.remove()
+            self.loading_text_ref = None
+            self.renderer.invalidate()
+
+    def start_simulation(self):
+        if not self.running:
+            self.show_loading()
+            self.running = True
+            self.finished = False
+            if self.viewer is not None:
+                # Following the bus happens in poll_frames; there is nothing to step here
+                return
+            self._worker = threading.Thread(target=self.run_simulation, daemon=True)
+            self._worker.start()
+
+    def pause_simulation(self):
+        self.running = False
+        self.hide_loading()
+
+    def _stop_worker(self):
+        self.running = False
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def reset_simulation(self):
+        if self.viewer is not None:
+            messagebox.showinfo("Attached Viewer", "Reset the simulation in the process that runs it.")
+            return
+        self._stop_worker()
+        self.simulator.reset()
+        self.current_step = 0
+        self.finished = False
+        self._drain_frame()
+        self._records.clear()
+        self.entropy_series.clear()
+        self.temp_series.clear()
+        self.log_panel.clear()
+        self.max_temp_val = self.simulator.params.cbr_strength * 10
+        self.max_frag_val = 1
+        self.max_obs_val = 1
+
+        self.hide_loading()
+        self.progress_bar['value'] = 0
+        self.renderer.reset()
+        self.stats_label.config(text="Step: 0 | BH events: 0 | Total Entropy: 0")
+    
+    def export_data(self):
+        """Export simulation data to CSV file"""
+        if self.viewer is not None:
+            messagebox.showinfo("Attached Viewer", "Export the data from the process that runs the simulation.")
+            return
+        if not self.simulator.step_data:
+            messagebox.showwarning("No Data", "No simulation data to export. Please run the simulation first.")
+            return
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_filename = f"quantum_sim_data_{timestamp}.csv"
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            initialfile=default_filename,
+            title="Export Simulation Data"
+        )
+        
+        if filename:
+            success = self.simulator.export_to_csv(filename)
+            if success:
+                messagebox.showinfo("Export Complete", 
+                                   f"Data successfully exported to:\n{filename}\n\n"
+                                   f"Total steps: {self.simulator.step_count}")
+            else:
+                messagebox.showerror("Export Failed", "Failed to export data. Please try again.")
+
+    def run_simulation(self):
+        """Stepping thread: runs the engine and publishes frames; never touches Tk."""
+        sim = self.simulator
+        next_time = time.perf_counter()
+        frame_period = self.frame_interval / 1000
+        last_publish = -np.inf
+        unpublished = None
+        while self.running and sim.step_count < self.steps:
+            _, temp_matrix, frag_matrix, obs_matrix, bh_locs, ent_locs = sim.step()
+            prof = self.profiler if self.profiler.enabled else None
+
+            self.max_temp_val = max(self.max_temp_val, np.max(temp_matrix) if temp_matrix.size > 0 else 0)
+            self.max_frag_val = max(self.max_frag_val, np.max(frag_matrix) if frag_matrix.size > 0 else 0)
+            self.max_obs_val = max(self.max_obs_val, np.max(obs_matrix) if obs_matrix.size > 0 else 0)
+
+            self._records.append((sim.step_count, sim.last_events,
+                                  sim.total_entropy_history[-1], sim.total_temp_history[-1]))
+            unpublished = (temp_matrix, frag_matrix, obs_matrix, bh_locs, ent_locs)
+            # The fields are views into the engine's buffers, so a frame costs three copies: only make
+            # one when the display can take it (slot empty) or the queued frame is a frame period old
+            now = time.perf_counter()
+            if self._frames.empty() or now - last_publish >= frame_period or sim.step_count >= self.steps:
+                self._publish_fields(*unpublished)
+                last_publish, unpublished = now, None
+            if prof is not None:
+                prof.lap('gui_publish')
+
+            if self.checkpoint and self.checkpoint_every and sim.step_count % self.checkpoint_every == 0:
+                save_checkpoint(sim, self.checkpoint)
+
+            if self.delay > 0:
+                next_time += self.delay
+                pause = next_time - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+                else:
+                    next_time = time.perf_counter()
+
+        if unpublished is not None:
+            # Paused between frames: show the step the simulation stopped at
+            self._publish_fields(*unpublished)
+        if self.running and sim.step_count >= self.steps:
+            if self.checkpoint:
+                save_checkpoint(sim, self.checkpoint)
+            self.finished = True
+        self.running = False
+
+    def _publish_fields(self, temp_matrix, frag_matrix, obs_matrix, bh_locs, ent_locs):
+        # Copies: the Tk thread draws the frame while this thread keeps stepping
+        sim = self.simulator
+        self._publish(Frame(sim.step_count, temp_matrix.copy(), frag_matrix.copy(), obs_matrix.copy(),
+                            bh_locs, ent_locs, sim.bh_events))
+
+    def _publish(self, frame):
+        # Single producer: if the display has not taken the last frame yet, replace it
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            self._drain_frame()
+            self._frames.put_nowait(frame)
+
+    def _drain_frame(self):
+        try:
+            return self._frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _read_bus(self):
+        """Newest bus frame as a Frame copied out of shared memory (None if nothing new), plus the totals since the last call."""
+        viewer = self.viewer
+        rows, self._history_pos = viewer.history(self._history_pos)
+        for step, total_entropy, total_temp in rows.tolist():
+            self.entropy_series.append(int(step), total_entropy)
+            self.temp_series.append(int(step), total_temp)
+        # Copied: the frame is drawn after this returns, by which time the publisher may reuse its slot
+        bus_frame = viewer.latest(copy=True) if self.running else None
+        if bus_frame is None:
+            if viewer.closed and self.running:
+                self.running = False
+                self.finished = True
+            return None
+        self.max_temp_val = max(self.max_temp_val, np.max(bus_frame.temp))
+        self.max_frag_val = max(self.max_frag_val, np.max(bus_frame.frag))
+        self.max_obs_val = max(self.max_obs_val, np.max(bus_frame.obs))
+        if not self._causality_synced:
+            # A late joiner starts from the publisher's value
+            self._causality_synced = True
+            self._set_causality_slider(bus_frame.causality)
+        return Frame(bus_frame.step, bus_frame.temp, bus_frame.frag, bus_frame.obs, bus_frame.bh_locs,
+                     bus_frame.ent_locs, bus_frame.bh_events)
+
+    def _drain_records(self):
+        """Move every finished step's totals into the stats history and its events into the log."""
+        records = []
+        while self._records:
+            records.append(self._records.popleft())
+        for step, _, total_entropy, total_temp in records:
+            self.entropy_series.append(step, total_entropy)
+            self.temp_series.append(step, total_temp)
+        self.log_panel.add_steps([(step, events) for step, events, _, _ in records])
+        self.log_panel.flush()
+
+    def _update_rates(self):
+        now = time.perf_counter()
+        elapsed = now - self._rate_time
+        if elapsed < 0.5:
+            return
+        step_count = self.simulator.step_count if self.viewer is None else self.current_step
+        self.steps_per_sec = (step_count - self._rate_steps) / elapsed
+        self.fps = self._rate_frames / elapsed
+        self._rate_time, self._rate_steps, self._rate_frames = now, step_count, 0
+
+    def poll_frames(self):
+        """Tk main loop side: draw the newest frame (older ones were dropped) and reschedule."""
+        prof = self.profiler if self.profiler.enabled else None
+        if prof is not None:
+            prof.begin()
+        if self.viewer is not None:
+            frame = self._read_bus()
+        else:
+            frame = self._drain_frame()
+            self._drain_records()
+        if prof is not None:
+            prof.lap('gui_log')
+        if frame is not None:
+            self.current_step = frame.step
+            self.progress_bar['value'] = (frame.step / self.steps) * 100
+            if prof is not None:
+                self._update_profile_overlay()
+            self.update_plots(frame.temp, frame.frag, frame.obs, frame.bh_locs, frame.ent_locs)
+            self._rate_frames += 1
+            if prof is not None:
+                prof.lap('gui_render')
+        self._update_rates()
+        if frame is not None:
+            self.stats_label.config(text=f"Step: {frame.step} | BH events: {frame.bh_events} | "
+                                         f"Total Entropy: {np.sum(frame.frag):.0f} | "
+                                         f"{self.steps_per_sec:.0f} steps/s | {self.fps:.0f} fps")
+        elif self.finished:
+            self.finished = False
+            self.progress_bar['value'] = 100
+            if self.viewer is not None:
+                self.stats_label.config(text=f"Publisher closed | Last step: {self.current_step}")
+            else:
+                self.stats_label.config(text=f"Simulation Complete | Steps: {self.steps} | Total Entropy: {np.sum(self.simulator.entropy_fragments):.0f}")
+            self.hide_loading()
+        self.root.after(self.frame_interval, self.poll_frames)
+
+    def update_plots(self, temp_matrix, frag_matrix, obs_matrix, bh_locs, ent_locs):
+        
+        if self.loading_text_ref:
+            self.hide_loading()
+
+        self.renderer.update((temp_matrix, frag_matrix, obs_matrix),
+                             (self.max_temp_val, self.max_frag_val, self.max_obs_val),
+                             bh_locs, ent_locs, self.entropy_series, self.temp_series)
+
+# --------------------------
+# --- Main Execution ---
+# --------------------------
+def main(size=5, steps=500, delay=0.5, seed=None, params=None, replay=None, simulator=None,
+         checkpoint=None, checkpoint_every=0, fps=20, log_lines=2000, profiler=None, publish=None, attach=None):
+    """Run the GUI on a simulator, or with `attach` as a viewer of the frame bus of that name.
+
+    `publish` names a frame bus that this GUI's simulator also publishes to.
+    """
+    root = tk.Tk()
+    if attach:
+        viewer = FrameViewer(attach)
+        gui = SimulationGUI(root, None, steps=steps, fps=fps, log_lines=log_lines, viewer=viewer)
+        gui.log_panel.text.insert(tk.END, f"Attached to frame bus '{attach}': events are not shared, "
+                                          f"only frames and totals\n", "step_header")
+        gui.start_simulation()
+        gui.poll_frames()
+        root.mainloop()
+        viewer.close()
+        return gui
+    archive = SnapshotArchive(replay) if replay else None
+    if archive is not None:
+        size = archive.size
+    # The log panel formats events itself, so the engine's per-step log string is not needed
+    sim = simulator if simulator is not None else FinalGridSimulator(size=size, seed=seed, params=params,
+                                                                     log_level=LOG_OFF)
+    if profiler is not None:
+        sim.profiler = profiler
+    if publish:
+        sim.bus = FramePublisher(sim.shape, name=publish, regions=sim.regions, fps=fps)
+    gui = SimulationGUI(root, sim, steps=steps, delay=delay, archive=archive,
+                        checkpoint=checkpoint, checkpoint_every=checkpoint_every, fps=fps,
+                        log_lines=log_lines)
+    gui.poll_frames()
+    root.mainloop()
+    gui._stop_worker()
+    sim.close()
+    sim.profiler.close()
+    return gui
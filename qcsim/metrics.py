@@ -0,0 +1,181 @@
+"""Streaming per-step metrics: buffered CSV or columnar binary output."""
+import csv
+import json
+import os
+import shutil
+from collections import deque
+
+import numpy as np
+
+# Per-step row layout shared by step_data, the sinks and export_to_csv
+STEP_FIELDS = ['step', 'total_entropy', 'total_temperature',
+               'bh_events_total', 'bh_events_this_step',
+               'entanglement_pairs', 'observations_this_step',
+               'entanglement_effects_this_step', 'causality_strength']
+
+# Little-endian on-disk dtypes of the columnar format
+FIELD_DTYPES = {
+    'step': '<i8',
+    'total_entropy': '<f8',
+    'total_temperature': '<f8',
+    'bh_events_total': '<i8',
+    'bh_events_this_step': '<i8',
+    'entanglement_pairs': '<i8',
+    'observations_this_step': '<i8',
+    'entanglement_effects_this_step': '<i8',
+    'causality_strength': '<f8',
+}
+
+METRICS_FORMATS = ('csv', 'columns')
+
+class MetricsSink:
+    """Append-only metrics stream with a bounded in-memory ring.
+
+    Rows are buffered and written every `flush_every` steps, either as CSV
+    (`fmt='csv'`, `path` is a file) or as one raw little-endian column
+    file per field plus a `schema.json` (`fmt='columns'`, `path` is a
+    directory). Only the last `ring_size` rows stay in memory, for live
+    plots. `checkpoint()` flushes and fsyncs so everything written so far
+    survives a crash. `resume_rows` reopens an existing stream for
+    appending after cutting it back to that many rows (see checkpoint.py);
+    `append` appends to whatever the stream already holds (a new stream
+    is created if there is none).
+    """
+    def __init__(self, path, fmt='csv', flush_every=100, ring_size=10000, fsync_every=0, resume_rows=None,
+                 append=False):
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format '{fmt}', expected one of {METRICS_FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self.flush_every = max(1, flush_every)
+        self.fsync_every = fsync_every
+        self.ring = deque(maxlen=ring_size)
+        self.rows_written = 0
+        self._buffer = []
+        self._rows_since_fsync = 0
+        if resume_rows is not None:
+            self._truncate(resume_rows)
+            self.rows_written = resume_rows
+        elif append:
+            existing = self._existing_rows()
+            append = existing is not None
+            self.rows_written = existing or 0
+        self._open(append=resume_rows is not None or append)
+
+    def _existing_rows(self):
+        """Rows already in the stream at `path`, or None when there is no stream yet."""
+        if self.fmt == 'csv':
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return None
+            with open(self.path, 'rb') as f:
+                return max(0, sum(1 for _ in f) - 1)
+        if not os.path.exists(os.path.join(self.path, 'schema.json')):
+            return None
+        column = os.path.join(self.path, f"{STEP_FIELDS[0]}.bin")
+        if not os.path.exists(column):
+            return 0
+        return os.path.getsize(column) // np.dtype(FIELD_DTYPES[STEP_FIELDS[0]]).itemsize
+
+    def _open(self, append=False):
+        if self.fmt == 'csv':
+            self._file = open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if not append:
+                self._writer.writerow(STEP_FIELDS)
+            self._files = [self._file]
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            if not append:
+                with open(os.path.join(self.path, 'schema.json'), 'w', encoding='utf-8') as f:
+                    json.dump({name: FIELD_DTYPES[name] for name in STEP_FIELDS}, f, indent=1)
+            self._columns = {name: open(os.path.join(self.path, f"{name}.bin"), 'ab' if append else 'wb')
+                             for name in STEP_FIELDS}
+            self._files = list(self._columns.values())
+
+    def _truncate(self, rows):
+        """Cut an existing stream back to its first `rows` rows."""
+        if self.fmt == 'csv':
+            with open(self.path, 'rb+') as f:
+                for _ in range(rows + 1):
+                    if not f.readline():
+                        raise ValueError(f"'{self.path}' has fewer than {rows} rows")
+                f.truncate(f.tell())
+            return
+        for name in STEP_FIELDS:
+            column = os.path.join(self.path, f"{name}.bin")
+            nbytes = rows * np.dtype(FIELD_DTYPES[name]).itemsize
+            if os.path.getsize(column) < nbytes:
+                raise ValueError(f"'{column}' has fewer than {rows} rows")
+            os.truncate(column, nbytes)
+
+    def append(self, row):
+        self.ring.append(row)
+        self._buffer.append(row)
+        self._rows_since_fsync += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+            if self.fsync_every and self._rows_since_fsync >= self.fsync_every:
+                self.checkpoint()
+
+    def flush(self):
+        """Write buffered rows to the OS (no fsync)."""
+        if self._buffer:
+            if self.fmt == 'csv':
+                self._writer.writerows([row[name] for name in STEP_FIELDS] for row in self._buffer)
+            else:
+                for name, f in self._columns.items():
+                    np.fromiter((row[name] for row in self._buffer), dtype=FIELD_DTYPES[name],
+                                count=len(self._buffer)).tofile(f)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        for f in self._files:
+            f.flush()
+
+    def checkpoint(self):
+        """Flush and fsync; everything appended so far is durable afterwards."""
+        self.flush()
+        for f in self._files:
+            os.fsync(f.fileno())
+        self._rows_since_fsync = 0
+
+    def reset(self):
+        """Discard everything and start an empty stream at the same path."""
+        self.close()
+        self.ring.clear()
+        self.rows_written = 0
+        self._buffer = []
+        self._rows_since_fsync = 0
+        self._open()
+
+    def close(self):
+        if self._files and not self._files[0].closed:
+            self.checkpoint()
+            for f in self._files:
+                f.close()
+
+    def export_csv(self, filename):
+        """Finalise the stream into a CSV at `filename`."""
+        self.flush()
+        if self.fmt == 'csv':
+            if os.path.abspath(filename) != os.path.abspath(self.path):
+                shutil.copyfile(self.path, filename)
+            return
+        columns = read_metrics(self.path)
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(STEP_FIELDS)
+            writer.writerows(zip(*(columns[name].tolist() for name in STEP_FIELDS)))
+
+def read_metrics(path):
+    """Load a metrics stream (CSV file or columns directory) as {field: array}."""
+    if os.path.isdir(path):
+        with open(os.path.join(path, 'schema.json'), encoding='utf-8') as f:
+            schema = json.load(f)
+        columns = {name: np.fromfile(os.path.join(path, f"{name}.bin"), dtype=np.dtype(dtype))
+                   for name, dtype in schema.items()}
+        # A crash between column writes can leave columns of unequal length
+        n = min(len(c) for c in columns.values())
+        return {name: c[:n] for name, c in columns.items()}
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return {name: np.array([row[name] for row in rows], dtype=FIELD_DTYPES[name]) for name in STEP_FIELDS}
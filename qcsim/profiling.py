@@ -0,0 +1,150 @@
+"""Per-phase wall-time and allocation profiling.
+
+    prof = PhaseProfiler(window=1000, allocations=True)
+    sim = FinalGridSimulator(size=256, profiler=prof)
+    ...
+    print(prof.format_summary())
+    prof.enabled = False            # instrumented code skips every hook
+
+Timing is lap-based: `begin()` marks the start of a unit of work in the
+calling thread and each `lap(phase)` charges the time since the previous
+mark to `phase`. Each phase keeps its last `window` samples, from which
+percentiles are computed on demand.
+
+With `allocations=True`, tracemalloc is started and every lap also
+records the peak number of bytes allocated above the phase's starting
+point (its temporaries plus whatever it kept). tracemalloc is
+process-wide and slows allocation-heavy code noticeably, so allocation
+figures from concurrent threads overlap; use them to compare phases,
+not as exact accounting. Laps from several threads (the stepping thread
+and the Tk thread) may share one profiler: the phase table is guarded
+by a lock and summaries are computed from a snapshot taken under it.
+"""
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+class PhaseStats:
+    """Ring of the last `window` (seconds, bytes) samples of one phase, plus running totals."""
+    __slots__ = ('times', 'allocs', 'count', 'total_time', 'total_alloc')
+
+    def __init__(self, window):
+        self.times = np.zeros(window)
+        self.allocs = np.zeros(window, dtype=np.int64)
+        self.count = 0
+        self.total_time = 0.0
+        self.total_alloc = 0
+
+    def add(self, seconds, alloc):
+        k = self.count % self.times.size
+        self.times[k] = seconds
+        self.allocs[k] = alloc
+        self.count += 1
+        self.total_time += seconds
+        self.total_alloc += alloc
+
+    def window(self):
+        n = min(self.count, self.times.size)
+        return self.times[:n], self.allocs[:n]
+
+class PhaseProfiler:
+    """Rolling per-phase timings; switch off at runtime with `enabled = False`."""
+    def __init__(self, window=1000, allocations=False, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.phases = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self.allocations = allocations
+
+    @property
+    def allocations(self):
+        return self._allocations
+
+    @allocations.setter
+    def allocations(self, value):
+        self._allocations = bool(value)
+        if self._allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not self._allocations and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def begin(self):
+        """Start timing a unit of work (a step, a frame) in the calling thread."""
+        local = self._local
+        if self._allocations:
+            tracemalloc.reset_peak()
+            local.memory = tracemalloc.get_traced_memory()[0]
+        local.mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time (and allocations) since the last begin/lap in this thread to `phase`."""
+        now = time.perf_counter()
+        local = self._local
+        alloc = 0
+        if self._allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            alloc = max(0, peak - getattr(local, 'memory', current))
+            tracemalloc.reset_peak()
+            local.memory = current
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = PhaseStats(self.window)
+            stats.add(now - getattr(local, 'mark', now), alloc)
+        local.mark = time.perf_counter()
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+
+    def _snapshot(self):
+        """[(phase, count, times, allocs)] copied under the lock."""
+        with self._lock:
+            return [(name, stats.count, *(a.copy() for a in stats.window()))
+                    for name, stats in self.phases.items()]
+
+    def summary(self, percentiles=PERCENTILES):
+        """{phase: {count, mean_ms, p<q>_ms..., alloc_kib, share}} over each phase's window.
+
+        `share` is the phase's fraction of the summed mean times.
+        """
+        out = {}
+        for name, count, times, allocs in self._snapshot():
+            row = {'count': count, 'mean_ms': float(times.mean()) * 1000}
+            for q, value in zip(percentiles, np.percentile(times, percentiles)):
+                row[f"p{q}_ms"] = float(value) * 1000
+            row['alloc_kib'] = float(allocs.mean()) / 1024
+            out[name] = row
+        total = sum(row['mean_ms'] for row in out.values()) or 1.0
+        for row in out.values():
+            row['share'] = row['mean_ms'] / total
+        return out
+
+    def format_summary(self, percentiles=PERCENTILES):
+        """The summary as a fixed-width text table."""
+        rows = self.summary(percentiles)
+        if not rows:
+            return "No profile samples"
+        head = f"{'phase (ms)':<20} {'mean':>8}" + ''.join(f" {f'p{q}':>8}" for q in percentiles)
+        head += f" {'share':>6}"
+        if self._allocations:
+            head += f" {'alloc':>10}"
+        lines = [head]
+        for name, row in rows.items():
+            line = f"{name:<20} {row['mean_ms']:8.3f}" + ''.join(f" {row[f'p{q}_ms']:8.3f}" for q in percentiles)
+            line += f" {row['share']:6.1%}"
+            if self._allocations:
+                line += f" {row['alloc_kib']:7.1f} KiB"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def close(self):
+        self.allocations = False
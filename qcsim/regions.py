@@ -0,0 +1,150 @@
+"""Region label maps: which cells belong to which agent, and per-region parameters.
+
+    regions = RegionMap.background(256)
+    yy, xx = np.ogrid[:256, :256]
+    regions.paint((yy - 60)**2 + (xx - 60)**2 < 20**2, obs_prob=0.2, resolve_frac=0.6)
+    regions.paint(np.s_[150:180, 100:220])                # agent defaults from SimulationParams
+    sim = FinalGridSimulator(size=256, regions=regions)
+
+Every cell carries an integer label. Label 0 is the background and
+defaults to bg_obs_prob/bg_resolve_frac; every other label is an agent
+and defaults to agent_obs_prob/agent_resolve_frac. A label can override
+any of REGION_FIELDS in its row of the parameter table; unset entries
+(NaN) keep following SimulationParams, so parameter changes mid-run
+still reach them. The per-cell parameter arrays are one gather,
+`row[labels]`, per field.
+"""
+import os
+
+import numpy as np
+
+REGION_FIELDS = ('obs_prob', 'resolve_frac', 'cbr_strength', 'uncert_prob')
+BACKGROUND = 0
+
+class RegionMap:
+    """A (size, size) integer label map plus a parameter table with one row per label."""
+    def __init__(self, labels, table=None):
+        labels = np.array(labels, dtype=np.intp)
+        if labels.ndim != 2 or labels.shape[0] != labels.shape[1]:
+            raise ValueError(f"Region labels must be a square 2-D array, got shape {labels.shape}")
+        if labels.size and labels.min() < 0:
+            raise ValueError("Region labels must be non-negative")
+        self.labels = labels
+        self.table = {name: np.full(0, np.nan) for name in REGION_FIELDS}
+        self._grow(int(labels.max()) + 1 if labels.size else 1)
+        for label, values in (table or {}).items():
+            self.set_params(label, **values)
+
+    @classmethod
+    def background(cls, size):
+        """A map without agents."""
+        return cls(np.zeros((size, size), dtype=np.intp))
+
+    @classmethod
+    def square(cls, size, span=range(1, 4)):
+        """One agent on rows and columns `span` (clipped to the grid): the classic 3x3 layout."""
+        labels = np.zeros((size, size), dtype=np.intp)
+        idx = [k for k in span if k < size]
+        labels[np.ix_(idx, idx)] = 1
+        return cls(labels)
+
+    @property
+    def size(self):
+        return self.labels.shape[0]
+
+    @property
+    def count(self):
+        """Number of labels (rows of the parameter table)."""
+        return self.table[REGION_FIELDS[0]].size
+
+    @property
+    def agent_mask(self):
+        return self.labels != BACKGROUND
+
+    def _grow(self, count):
+        if count > self.count:
+            for name, row in self.table.items():
+                self.table[name] = np.concatenate([row, np.full(count - row.size, np.nan)])
+
+    def paint(self, where, label=None, **values):
+        """Give the cells selected by `where` (boolean mask or index) `label`; returns the label.
+
+        Without `label` a new one is allocated. `values` set the label's
+        parameters, as in `set_params`.
+        """
+        if label is None:
+            label = self.count
+        if label < 0:
+            raise ValueError("Region labels must be non-negative")
+        self.labels[where] = label
+        self._grow(label + 1)
+        self.set_params(label, **values)
+        return label
+
+    def set_params(self, label, **values):
+        """Override REGION_FIELDS for `label`; None restores the SimulationParams default."""
+        unknown = set(values) - set(REGION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown region parameter(s): {', '.join(sorted(unknown))}")
+        self._grow(label + 1)
+        for name, value in values.items():
+            self.table[name][label] = np.nan if value is None else value
+
+    def defaults(self, params):
+        """{field: (count,) array} of the SimulationParams value each label falls back to."""
+        agent = np.arange(self.count) != BACKGROUND
+        return {
+            'obs_prob': np.where(agent, params.agent_obs_prob, params.bg_obs_prob),
+            'resolve_frac': np.where(agent, params.agent_resolve_frac, params.bg_resolve_frac),
+            'cbr_strength': np.full(self.count, params.cbr_strength, dtype=np.float64),
+            'uncert_prob': np.full(self.count, params.uncertainty_prob, dtype=np.float64),
+        }
+
+    def resolve(self, params):
+        """{field: (size, size) array}: each label's parameters, defaults filled in, gathered per cell."""
+        out = {}
+        for name, default in self.defaults(params).items():
+            row = self.table[name]
+            out[name] = np.where(np.isnan(row), default, row)[self.labels]
+        return out
+
+    def boundary_segments(self):
+        """(k, 2, 2) line segments along every edge between differently labelled cells.
+
+        Points are (x, y) = (column, row) in cell coordinates, cell centres
+        on integers, ready for a matplotlib LineCollection over imshow. The
+        grid edge counts as background, so agents touching it are closed.
+        """
+        padded = np.pad(self.labels, 1, constant_values=BACKGROUND)
+        # Vertical edges at x = c - 0.5 between columns c-1 and c of row r
+        r, c = np.nonzero(padded[1:-1, :-1] != padded[1:-1, 1:])
+        vertical = np.stack([np.stack([c - 0.5, r - 0.5], axis=-1), np.stack([c - 0.5, r + 0.5], axis=-1)], axis=1)
+        # Horizontal edges at y = r - 0.5 between rows r-1 and r of column c
+        r, c = np.nonzero(padded[:-1, 1:-1] != padded[1:, 1:-1])
+        horizontal = np.stack([np.stack([c - 0.5, r - 0.5], axis=-1), np.stack([c + 0.5, r - 0.5], axis=-1)], axis=1)
+        return np.concatenate([vertical, horizontal]).astype(np.float64)
+
+    def to_arrays(self):
+        out = {'labels': self.labels}
+        out.update((f"param_{name}", row) for name, row in self.table.items())
+        return out
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        regions = cls(arrays['labels'])
+        regions._grow(len(arrays[f"param_{REGION_FIELDS[0]}"]))
+        for name in REGION_FIELDS:
+            regions.table[name][...] = arrays[f"param_{name}"]
+        return regions
+
+    def save(self, path):
+        """Write `to_arrays()` to an .npz file atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays({name: data[name] for name in data.files})
@@ -0,0 +1,158 @@
+"""Seeded, block-drawn random number streams for the grid engine."""
+import numpy as np
+
+# One independent substream per kind of draw, so changing how one phase
+# consumes randomness never shifts the numbers seen by the others. Each dense
+# field has its own stream, so a step sees the same numbers whatever the block size.
+STREAM_KINDS = ('events', 'black_hole', 'observation', 'fluctuation_temp', 'fluctuation_frag', 'entanglement')
+
+EVENTS_LOW = 500
+EVENTS_HIGH = 1500
+
+_NO_CELLS = np.empty(0, dtype=np.intp)
+
+class StepDraws:
+    """Dense random inputs of one step, all with the simulator's state shape.
+
+    `events` holds whole numbers in [EVENTS_LOW, EVENTS_HIGH] as float64,
+    the dtype they are multiplied in. `noise_temp` and `noise_frag` are
+    unit noise in [-1, 1); the engine scales them by the fluctuation
+    amplitude and (1 - causality). Rare events (black holes, observations)
+    are not rolled per cell; see `SimulationRNG.sample_cells`.
+    """
+    __slots__ = ('events', 'noise_temp', 'noise_frag')
+
+    def __init__(self, events, noise_temp, noise_frag):
+        self.events = events
+        self.noise_temp = noise_temp
+        self.noise_frag = noise_frag
+
+class SimulationRNG:
+    """Block random-number source built on NumPy Generators.
+
+    Each step's dense per-cell draws (event counts, fluctuation noise)
+    come from whole-array calls made once every `block_steps` steps; rare
+    events are sampled per step with `sample_cells`. A given seed produces
+    bit-identical histories whatever `block_steps` is. `spawn(n)` returns n
+    statistically independent streams for parallel workers or replicas.
+    """
+    def __init__(self, seed=None, block_steps=1, bit_generator=np.random.PCG64):
+        if block_steps < 1:
+            raise ValueError("block_steps must be at least 1")
+        self.seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.block_steps = block_steps
+        self.bit_generator = bit_generator
+        children = self.seed_seq.spawn(len(STREAM_KINDS))
+        self.streams = {kind: np.random.Generator(bit_generator(child))
+                        for kind, child in zip(STREAM_KINDS, children)}
+        self.entanglement = self.streams['entanglement']
+        self._block = None
+        self._block_shape = None
+        self._block_pos = 0
+
+    @property
+    def seed(self):
+        return self.seed_seq.entropy
+
+    def spawn(self, n):
+        """n independent child streams with the same block size and bit generator."""
+        return [SimulationRNG(child, self.block_steps, self.bit_generator)
+                for child in self.seed_seq.spawn(n)]
+
+    def get_state(self):
+        """(meta, arrays) capturing every stream and any partly used block.
+
+        `meta` is JSON-serialisable; `arrays` holds the pre-drawn block.
+        """
+        seq = self.seed_seq.state
+        meta = {
+            'seed_seq': {**seq, 'spawn_key': list(seq['spawn_key'])},
+            'block_steps': self.block_steps,
+            'bit_generator': self.bit_generator.__name__,
+            'streams': {kind: _jsonable(g.bit_generator.state) for kind, g in self.streams.items()},
+            'block_shape': list(self._block_shape) if self._block is not None else None,
+            'block_pos': self._block_pos,
+        }
+        arrays = {}
+        if self._block is not None:
+            arrays = {name: getattr(self._block, name) for name in StepDraws.__slots__}
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        """Rebuild a SimulationRNG that continues exactly where get_state() was taken."""
+        seq = dict(meta['seed_seq'])
+        # __init__ spawns one child per stream; start the count so it ends where it was
+        seq['n_children_spawned'] -= len(STREAM_KINDS)
+        seq['spawn_key'] = tuple(seq['spawn_key'])
+        rng = cls(np.random.SeedSequence(**seq), meta['block_steps'], getattr(np.random, meta['bit_generator']))
+        for kind, state in meta['streams'].items():
+            rng.streams[kind].bit_generator.state = _from_jsonable(state)
+        if meta['block_shape'] is not None:
+            rng._block = StepDraws(*(np.asarray(arrays[name]) for name in StepDraws.__slots__))
+            rng._block_shape = tuple(meta['block_shape'])
+            rng._block_pos = meta['block_pos']
+        return rng
+
+    def _fill_block(self, shape):
+        size = (self.block_steps,) + tuple(shape)
+        s = self.streams
+        block = self._block
+        if block is None or block.noise_temp.shape != size:
+            block = StepDraws(np.empty(size), np.empty(size), np.empty(size))
+        # Every draw refills the previous block's arrays in place. Event counts are
+        # floor(LOW + u * (HIGH - LOW + 1)) rather than integers(), which has no `out=`
+        events = block.events
+        s['events'].random(out=events)
+        events *= EVENTS_HIGH - EVENTS_LOW + 1
+        np.floor(events, out=events)
+        events += EVENTS_LOW
+        for kind, noise in (('fluctuation_temp', block.noise_temp), ('fluctuation_frag', block.noise_frag)):
+            # Same numbers as uniform(-1.0, 1.0): -1 + 2 * u
+            s[kind].random(out=noise)
+            noise *= 2.0
+            noise -= 1.0
+        self._block = block
+        self._block_shape = tuple(shape)
+        self._block_pos = 0
+
+    def draws(self, shape):
+        """Random inputs for the next step of a simulator with state `shape`."""
+        if self._block is None or self._block_pos >= self.block_steps or self._block_shape != tuple(shape):
+            self._fill_block(shape)
+        k = self._block_pos
+        self._block_pos += 1
+        b = self._block
+        return StepDraws(b.events[k], b.noise_temp[k], b.noise_frag[k])
+
+    def sample_cells(self, kind, cells, prob):
+        """Ascending flat indices of the cells hit by an event of probability `prob` each.
+
+        `cells` is an ascending index array of candidate cells, or an int n
+        for cells 0..n-1. A Binomial(n, prob) count followed by that many
+        distinct cells chosen uniformly is distributed exactly like one
+        Bernoulli(prob) roll per cell, but costs O(events) instead of O(n).
+        """
+        g = self.streams[kind]
+        n = cells if isinstance(cells, int) else len(cells)
+        k = g.binomial(n, min(max(prob, 0.0), 1.0)) if n else 0
+        if not k:
+            return _NO_CELLS
+        picked = g.choice(n, size=k, replace=False)
+        picked.sort()
+        return picked if isinstance(cells, int) else cells[picked]
+
+def _jsonable(state):
+    """Bit generator state with arrays (e.g. MT19937 keys) turned into tagged lists."""
+    if isinstance(state, dict):
+        return {k: _jsonable(v) for k, v in state.items()}
+    if isinstance(state, np.ndarray):
+        return {'__ndarray__': state.tolist(), 'dtype': state.dtype.str}
+    return state
+
+def _from_jsonable(state):
+    if isinstance(state, dict):
+        if '__ndarray__' in state:
+            return np.asarray(state['__ndarray__'], dtype=state['dtype'])
+        return {k: _from_jsonable(v) for k, v in state.items()}
+    return state
@@ -0,0 +1,262 @@
+"""Memory-mapped field snapshots with random-access replay.
+
+An archive is a directory:
+
+    index.json          shape, dtype, capacity, record interval, frame count
+    steps.npy           (capacity,) step number of each frame
+    temperature.npy     (capacity, *shape) preallocated, memory-mapped
+    fragments.npy       (capacity, *shape)
+    observations.npy    (capacity, *shape)
+    black_holes.bin     flat cell indices of every frame, concatenated (int64)
+    entanglements.bin   flat (a, b) pair indices of every frame, concatenated
+    *_offsets.npy       (capacity + 1,) frame boundaries into the .bin files
+
+The .npy files are ordinary NumPy arrays, so any frame can be read with
+`np.load(..., mmap_mode='r')` without loading the rest of the archive.
+`index.json` is rewritten (atomically) only after the frames it counts
+have been flushed, so a crashed run leaves a readable archive.
+"""
+import json
+import os
+
+import numpy as np
+
+SNAPSHOT_FIELDS = ('temperature', 'fragments', 'observations')
+EVENT_STREAMS = ('black_holes', 'entanglements')
+
+INDEX_FILE = 'index.json'
+
+class Snapshot:
+    """One archived frame; the field arrays are read-only memory-mapped views."""
+    __slots__ = ('step', 'temperature', 'fragments', 'observations', 'black_holes', 'entanglements', 'size')
+
+    def __init__(self, step, temperature, fragments, observations, black_holes, entanglements, size):
+        self.step = step
+        self.temperature = temperature
+        self.fragments = fragments
+        self.observations = observations
+        self.black_holes = black_holes
+        self.entanglements = entanglements
+        self.size = size
+
+    def _cells(self, flat):
+        rows, cols = np.divmod(np.asarray(flat), self.size)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    @property
+    def bh_locs(self):
+        return self._cells(self.black_holes)
+
+    @property
+    def ent_locs(self):
+        return self._cells(self.entanglements.ravel())
+
+def _open_grown(path, rows, keep):
+    """The .npy at `path` memory-mapped read-write with at least `rows` rows.
+
+    A shorter array is copied (its first `keep` rows) into a new file of
+    `rows` rows, which then replaces it.
+    """
+    old = np.load(path, mmap_mode='r+')
+    if len(old) >= rows:
+        return old
+    tmp = path + '.tmp'
+    new = np.lib.format.open_memmap(tmp, mode='w+', dtype=old.dtype, shape=(rows,) + old.shape[1:])
+    new[:keep] = old[:keep]
+    new.flush()
+    del old
+    os.replace(tmp, path)
+    return new
+
+# --------------------------
+# --- SnapshotRecorder ---
+# --------------------------
+class SnapshotRecorder:
+    """Append field snapshots every `every` steps into a preallocated archive.
+
+    The field files are allocated for `capacity` frames on the first
+    `record()` call, when the state shape is known. Frames reach the disk
+    every `flush_every` records and on `close()`. `resume_frames` reopens an
+    existing archive and continues after its first `resume_frames` frames,
+    growing it to `capacity` frames if it was allocated for fewer.
+    """
+    def __init__(self, path, capacity, every=1, dtype=np.float64, flush_every=16, resume_frames=None):
+        if capacity < 1 or every < 1:
+            raise ValueError("capacity and every must be at least 1")
+        self.path = path
+        self.capacity = capacity
+        self.every = every
+        self.dtype = np.dtype(dtype)
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._arrays = None
+        self._unflushed = 0
+        if resume_frames is not None:
+            self._reopen(resume_frames)
+
+    def wants(self, step):
+        return step % self.every == 0
+
+    def _allocate(self, shape):
+        os.makedirs(self.path, exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        self.shape = tuple(shape)
+        self._arrays = {name: open_memmap(os.path.join(self.path, f"{name}.npy"), mode='w+',
+                                          dtype=self.dtype, shape=(self.capacity,) + self.shape)
+                        for name in SNAPSHOT_FIELDS}
+        self._steps = open_memmap(os.path.join(self.path, 'steps.npy'), mode='w+', dtype='<i8',
+                                  shape=(self.capacity,))
+        self._offsets = {}
+        self._events = {}
+        for name in EVENT_STREAMS:
+            self._offsets[name] = open_memmap(os.path.join(self.path, f"{name}_offsets.npy"), mode='w+',
+                                              dtype='<i8', shape=(self.capacity + 1,))
+            self._events[name] = open(os.path.join(self.path, f"{name}.bin"), 'wb')
+        self._write_index()
+
+    def _reopen(self, frames):
+        with open(os.path.join(self.path, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        if frames > index['count']:
+            raise ValueError(f"Snapshot archive '{self.path}' has fewer than {frames} frames")
+        self.shape = tuple(index['shape'])
+        # A resumed run may go on for longer than the one that allocated the archive
+        self.capacity = max(self.capacity, index['capacity'])
+        self.every = index['every']
+        self.dtype = np.dtype(index['dtype'])
+        self.count = frames
+        load = lambda name, rows, keep: _open_grown(os.path.join(self.path, f"{name}.npy"), rows, keep)
+        self._arrays = {name: load(name, self.capacity, frames) for name in SNAPSHOT_FIELDS}
+        self._steps = load('steps', self.capacity, frames)
+        self._offsets = {}
+        self._events = {}
+        for name in EVENT_STREAMS:
+            self._offsets[name] = load(f"{name}_offsets", self.capacity + 1, frames + 1)
+            stream = os.path.join(self.path, f"{name}.bin")
+            os.truncate(stream, int(self._offsets[name][frames]) * 8)
+            self._events[name] = open(stream, 'ab')
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            'shape': list(self.shape),
+            'dtype': self.dtype.str,
+            'capacity': self.capacity,
+            'every': self.every,
+            'count': self.count,
+        }
+        tmp = os.path.join(self.path, INDEX_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+    def record(self, step, temperature, fragments, observations, black_holes=(), entanglements=()):
+        if self._arrays is None:
+            self._allocate(np.shape(temperature))
+        if self.count >= self.capacity:
+            raise ValueError(f"Snapshot archive '{self.path}' is full ({self.capacity} frames)")
+        k = self.count
+        self._arrays['temperature'][k] = temperature
+        self._arrays['fragments'][k] = fragments
+        self._arrays['observations'][k] = observations
+        self._steps[k] = step
+        for name, flat in zip(EVENT_STREAMS, (black_holes, entanglements)):
+            flat = np.asarray(flat, dtype='<i8').ravel()
+            flat.tofile(self._events[name])
+            self._offsets[name][k + 1] = self._offsets[name][k] + flat.size
+        self.count += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._arrays is None:
+            return
+        for f in self._events.values():
+            f.flush()
+        for array in list(self._arrays.values()) + [self._steps] + list(self._offsets.values()):
+            array.flush()
+        self._write_index()
+        self._unflushed = 0
+
+    def reset(self):
+        """Start over: already-allocated files are reused from frame 0."""
+        if self._arrays is not None:
+            for f in self._events.values():
+                f.seek(0)
+                f.truncate()
+        self.count = 0
+        self.flush()
+
+    def close(self):
+        if self._arrays is None:
+            return
+        self.flush()
+        for f in self._events.values():
+            f.close()
+        self._arrays = None
+
+# --------------------------
+# --- SnapshotArchive ---
+# --------------------------
+class SnapshotArchive:
+    """Read-only, random-access view of an archive written by SnapshotRecorder.
+
+    Nothing is loaded up front: fields are memory-mapped and `frame(step)`
+    touches only the pages of that one frame.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        self.shape = tuple(index['shape'])
+        self.size = self.shape[-1]
+        self.every = index['every']
+        self.count = index['count']
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+        self._arrays = {name: load(name)[:self.count] for name in SNAPSHOT_FIELDS}
+        self.steps = load('steps')[:self.count]
+        self._offsets = {name: load(f"{name}_offsets")[:self.count + 1] for name in EVENT_STREAMS}
+        self._events = {name: np.memmap(os.path.join(path, f"{name}.bin"), dtype='<i8', mode='r')
+                        if os.path.getsize(os.path.join(path, f"{name}.bin")) else np.empty(0, dtype='<i8')
+                        for name in EVENT_STREAMS}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for k in range(self.count):
+            yield self.frame_at(k)
+
+    def field(self, name):
+        """The (frames, *shape) memory-mapped array of one field."""
+        return self._arrays[name]
+
+    def index_of(self, step):
+        """Frame index of the latest snapshot at or before `step`."""
+        k = int(np.searchsorted(self.steps, step, side='right')) - 1
+        if k < 0:
+            raise KeyError(f"No snapshot at or before step {step}")
+        return k
+
+    def frame_at(self, k):
+        start, stop = self._offsets['black_holes'][k:k + 2]
+        black_holes = self._events['black_holes'][start:stop]
+        start, stop = self._offsets['entanglements'][k:k + 2]
+        entanglements = self._events['entanglements'][start:stop].reshape(-1, 2)
+        a = self._arrays
+        return Snapshot(int(self.steps[k]), a['temperature'][k], a['fragments'][k], a['observations'][k],
+                        black_holes, entanglements, self.size)
+
+    def frame(self, step):
+        """Snapshot of `step` (or the closest recorded step before it)."""
+        return self.frame_at(self.index_of(step))
+
+    def totals(self, name, chunk=64):
+        """Per-frame sum of a field, streamed `chunk` frames at a time."""
+        data = self._arrays[name]
+        out = np.empty(self.count)
+        axes = tuple(range(1, data.ndim))
+        for k in range(0, self.count, chunk):
+            out[k:k + chunk] = data[k:k + chunk].sum(axis=axes)
+        return out
@@ -0,0 +1,170 @@
+"""Streaming per-cell statistics of a run, in O(grid) memory.
+
+    stats = RunningStats(every=10)
+    sim = FinalGridSimulator(size=256, stats=stats)
+    ...
+    stats.save('stats.npz')
+    total = merge_stats([RunningStats.load(p) for p in paths])
+
+Temperature and fragments are sampled every `every` steps with Welford's
+update (mean, M2, min, max per cell). Black holes and observations are
+counted per cell on every step. Accumulators of the same shape merge
+exactly (Chan et al.'s pairwise formula), so replicas or parallel
+workers can be combined in any order.
+"""
+import os
+
+import numpy as np
+
+STATS_FIELDS = ('temperature', 'fragments')
+COUNT_FIELDS = ('black_holes', 'observations')
+
+class RunningStats:
+    """Per-cell running mean/variance/min/max of the fields plus per-cell event counts.
+
+    The arrays are allocated on the first update, when the state shape is
+    known. `samples` counts Welford updates, `steps` counts steps.
+    """
+    def __init__(self, every=1):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.every = every
+        self.shape = None
+        self.samples = 0
+        self.steps = 0
+
+    def _allocate(self, shape):
+        self.shape = tuple(shape)
+        self.mean = {name: np.zeros(shape) for name in STATS_FIELDS}
+        self.m2 = {name: np.zeros(shape) for name in STATS_FIELDS}
+        self.min = {name: np.full(shape, np.inf) for name in STATS_FIELDS}
+        self.max = {name: np.full(shape, -np.inf) for name in STATS_FIELDS}
+        self.counts = {name: np.zeros(shape, dtype=np.int64) for name in COUNT_FIELDS}
+        self._delta = np.empty(shape)
+        self._work = np.empty(shape)
+
+    def reset(self):
+        self.shape = None
+        self.samples = 0
+        self.steps = 0
+
+    def update(self, step, temperature, fragments, black_holes=(), observations=()):
+        """Count this step's events; sample the fields if `step` is a multiple of `every`.
+
+        `black_holes` and `observations` are flat cell indices, each cell at
+        most once per step.
+        """
+        if self.shape is None:
+            self._allocate(np.shape(temperature))
+        self.steps += 1
+        for name, flat in zip(COUNT_FIELDS, (black_holes, observations)):
+            self.counts[name].reshape(-1)[np.asarray(flat, dtype=np.intp)] += 1
+        if step % self.every:
+            return
+        self.samples += 1
+        delta, work = self._delta, self._work
+        for name, x in zip(STATS_FIELDS, (temperature, fragments)):
+            mean = self.mean[name]
+            np.subtract(x, mean, out=delta)
+            mean += np.divide(delta, self.samples, out=work)
+            self.m2[name] += np.multiply(delta, np.subtract(x, mean, out=work), out=work)
+            np.minimum(self.min[name], x, out=self.min[name])
+            np.maximum(self.max[name], x, out=self.max[name])
+
+    def variance(self, name, ddof=0):
+        """Per-cell variance of field `name` (NaN where there are too few samples)."""
+        n = self.samples - ddof
+        if n <= 0:
+            return np.full(self.shape, np.nan)
+        return self.m2[name] / n
+
+    def merge(self, other):
+        """Fold `other` (same shape) into this accumulator."""
+        if other.shape is None:
+            return self
+        if self.shape is None:
+            self._allocate(other.shape)
+        elif self.shape != other.shape:
+            raise ValueError(f"Cannot merge statistics of shape {other.shape} into {self.shape}")
+        na, nb = self.samples, other.samples
+        n = na + nb
+        for name in STATS_FIELDS:
+            if nb:
+                delta = other.mean[name] - self.mean[name]
+                self.mean[name] += delta * (nb / n)
+                self.m2[name] += other.m2[name] + delta * delta * (na * nb / n)
+            np.minimum(self.min[name], other.min[name], out=self.min[name])
+            np.maximum(self.max[name], other.max[name], out=self.max[name])
+        for name in COUNT_FIELDS:
+            self.counts[name] += other.counts[name]
+        self.samples = n
+        self.steps += other.steps
+        return self
+
+    def split(self):
+        """One accumulator per index of the leading axis (e.g. per replica of an ensemble)."""
+        parts = []
+        for r in range(self.shape[0]):
+            part = RunningStats(self.every)
+            part._allocate(self.shape[1:])
+            for name in STATS_FIELDS:
+                for kind in ('mean', 'm2', 'min', 'max'):
+                    getattr(part, kind)[name][...] = getattr(self, kind)[name][r]
+            for name in COUNT_FIELDS:
+                part.counts[name][...] = self.counts[name][r]
+            part.samples, part.steps = self.samples, self.steps
+            parts.append(part)
+        return parts
+
+    def to_arrays(self):
+        """Everything as a flat {name: array} dict: the raw accumulators plus derived rates."""
+        out = {'samples': np.array(self.samples), 'steps': np.array(self.steps), 'every': np.array(self.every)}
+        if self.shape is None:
+            return out
+        for name in STATS_FIELDS:
+            out[f"{name}_mean"] = self.mean[name]
+            out[f"{name}_m2"] = self.m2[name]
+            out[f"{name}_var"] = self.variance(name)
+            out[f"{name}_min"] = self.min[name]
+            out[f"{name}_max"] = self.max[name]
+        for name in COUNT_FIELDS:
+            out[f"{name}_count"] = self.counts[name]
+            out[f"{name}_rate"] = self.counts[name] / max(self.steps, 1)
+        return out
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        stats = cls(int(arrays['every']))
+        stats.samples = int(arrays['samples'])
+        stats.steps = int(arrays['steps'])
+        if 'temperature_mean' not in arrays:
+            return stats
+        stats._allocate(np.shape(arrays['temperature_mean']))
+        for name in STATS_FIELDS:
+            stats.mean[name][...] = arrays[f"{name}_mean"]
+            stats.m2[name][...] = arrays[f"{name}_m2"]
+            stats.min[name][...] = arrays[f"{name}_min"]
+            stats.max[name][...] = arrays[f"{name}_max"]
+        for name in COUNT_FIELDS:
+            stats.counts[name][...] = arrays[f"{name}_count"]
+        return stats
+
+    def save(self, path):
+        """Write `to_arrays()` to an .npz file atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays({name: data[name] for name in data.files})
+
+def merge_stats(items):
+    """A new accumulator holding the merge of every RunningStats in `items`."""
+    items = list(items)
+    total = RunningStats(items[0].every if items else 1)
+    for stats in items:
+        total.merge(stats)
+    return total
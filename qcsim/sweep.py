@@ -0,0 +1,220 @@
+"""Parameter sweeps over a process pool.
+
+Every (parameter point, seed) pair is one task. Tasks are grouped into
+chunks, each chunk runs in a worker process, and finished tasks are
+appended to one tidy CSV (one row per task and step, with the task's
+size, steps and boundary). A `.done` manifest
+next to the CSV lists finished task ids, so rerunning the same sweep
+after a crash only runs the unfinished tasks. With a ResultCache
+directory, runs already simulated by any earlier sweep are read back
+instead of simulated again.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import ResultCache
+from .engine import FinalGridSimulator, SimulationParams
+from .events import LOG_OFF
+from .metrics import STEP_FIELDS
+
+# causality_strength is constant per task and already a parameter column
+METRIC_FIELDS = [name for name in STEP_FIELDS if name != 'causality_strength']
+# Settings of a task besides its parameters, so sweeps appended to one table stay apart
+RUN_FIELDS = ['size', 'steps', 'boundary']
+
+def grid_points(grid):
+    """Cartesian product of {param_name: [values]} as a list of dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def task_id(point, seed, size, steps, boundary):
+    """Id of a task; a point that spells out a default value is the same task as one that leaves it out."""
+    params = SimulationParams.from_dict(point).to_dict()
+    key = json.dumps({'point': params, 'seed': seed, 'size': size, 'steps': steps, 'boundary': boundary},
+                     sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def run_task(task):
+    """Run one (point, seed) simulation and return its per-step metric rows."""
+    params = SimulationParams.from_dict(task['point'])
+    if task.get('cache'):
+        step_data = ResultCache(task['cache'], task['cache_bytes']).run(
+            size=task['size'], steps=task['steps'], seed=task['seed'], params=params,
+            boundary=task['boundary']).step_data
+    else:
+        sim = FinalGridSimulator(size=task['size'], seed=task['seed'], boundary=task['boundary'],
+                                 log_level=LOG_OFF, params=params)
+        for _ in range(task['steps']):
+            sim.step()
+        step_data = sim.step_data
+    rows = []
+    for step, data in enumerate(step_data, start=1):
+        row = {'task_id': task['task_id'], 'seed': task['seed']}
+        row.update((k, task[k]) for k in RUN_FIELDS)
+        row.update(task['point'])
+        row['step'] = step
+        row.update((k, data[k]) for k in METRIC_FIELDS[1:])
+        rows.append(row)
+    return task['task_id'], rows
+
+def run_chunk(tasks):
+    return [run_task(task) for task in tasks]
+
+def _print_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else float('inf')
+    print(f"[sweep] {done}/{total} tasks | {rate:.2f} tasks/s | ETA {eta:.0f}s", file=sys.stderr)
+
+def _read_manifest(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+def _last_kept_line_end(data, whole, finished):
+    """Offset in `data` just past the last complete line to keep: a finished task's row, or the header.
+
+    `whole` says whether `data` starts at the beginning of the file; if
+    it does not and holds no such line, returns None (read further back).
+    """
+    lines = data.split(b'\n')
+    # The piece after the last newline is empty or a half-written row
+    end = len(data) - len(lines[-1])
+    for k in range(len(lines) - 2, -1, -1):
+        line = lines[k]
+        if k == 0:
+            # The header when `whole`, else possibly a partial line
+            return end if whole else None
+        if line.split(b',', 1)[0].decode('utf-8', 'replace') in finished:
+            return end
+        end -= len(line) + 1
+    return 0 if whole else None
+
+def _truncate_unfinished(out, finished):
+    """Cut the rows of tasks that were being written when a previous run died.
+
+    Rows are written task by task and tasks are marked done only once
+    their rows are on disk, so unfinished rows (and a half-written line)
+    can only be at the end of the table: only that tail is read.
+    """
+    if not os.path.exists(out):
+        return
+    with open(out, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        chunk = 1 << 16
+        while True:
+            start = max(0, size - chunk)
+            f.seek(start)
+            keep = _last_kept_line_end(f.read(size - start), start == 0, finished)
+            if keep is not None:
+                break
+            chunk *= 4
+        if start + keep < size:
+            f.truncate(start + keep)
+
+def _read_header(out):
+    if not os.path.exists(out) or os.path.getsize(out) == 0:
+        return None
+    with open(out, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+def _merge_header(out, header, fieldnames, defaults):
+    """The column layout to append with: the table's own, widened by any new parameter columns.
+
+    New parameter columns are added in front of the metric columns, and
+    the table is rewritten once with its existing rows holding the
+    parameter's default (those tasks ran with it). Any other difference
+    means the table is not from a compatible sweep.
+    """
+    added = [name for name in fieldnames if name not in header]
+    foreign = [name for name in added if name not in defaults]
+    foreign += [name for name in header if name not in fieldnames and name not in defaults]
+    if foreign:
+        raise ValueError(f"{out} has a different column layout (mismatched columns: {', '.join(foreign)}); "
+                         "write to a new --out or pass resume=False")
+    if not added:
+        return header
+    at = header.index(METRIC_FIELDS[0])
+    merged = header[:at] + added + header[at:]
+    fill = {name: defaults[name] for name in added}
+    tmp = out + '.tmp'
+    with open(out, newline='', encoding='utf-8') as src, open(tmp, 'w', newline='', encoding='utf-8') as dst:
+        writer = csv.DictWriter(dst, fieldnames=merged)
+        writer.writeheader()
+        for row in csv.DictReader(src):
+            writer.writerow({**fill, **row})
+    os.replace(tmp, out)
+    return merged
+
+def run_sweep(points, seeds, out, size=5, steps=500, boundary='open', workers=None,
+              chunk_size=1, resume=True, progress=_print_progress, cache=None, cache_bytes=1 << 30):
+    """Run every point x seed and append the tidy per-step table to `out`.
+
+    Returns the number of tasks run in this call (finished tasks from a
+    previous run are skipped when `resume` is true). `cache` is a
+    ResultCache directory shared by the workers, bounded by `cache_bytes`.
+    """
+    param_names = []
+    for point in points:
+        SimulationParams.from_dict(point)  # validate names early, in the parent
+        param_names.extend(n for n in point if n not in param_names)
+
+    manifest = out + '.done'
+    if not resume:
+        for path in (out, manifest):
+            if os.path.exists(path):
+                os.remove(path)
+    finished = _read_manifest(manifest)
+    _truncate_unfinished(out, finished)
+
+    tasks = []
+    for point in points:
+        for seed in seeds:
+            tid = task_id(point, seed, size, steps, boundary)
+            if tid not in finished:
+                tasks.append({'task_id': tid, 'point': point, 'seed': seed,
+                              'size': size, 'steps': steps, 'boundary': boundary,
+                              'cache': cache, 'cache_bytes': cache_bytes})
+    total = len(tasks)
+    if not tasks:
+        return 0
+
+    fieldnames = ['task_id', 'seed'] + RUN_FIELDS + param_names + METRIC_FIELDS
+    defaults = SimulationParams().to_dict()
+    header = _read_header(out)
+    write_header = header is None
+    if not write_header:
+        # Append in the layout of the table being resumed, widened by new parameter columns
+        fieldnames = _merge_header(out, header, fieldnames, defaults)
+    # Parameter columns a point does not set hold the value it ran with: the default
+    fill = {name: defaults[name] for name in fieldnames if name in defaults}
+    chunks = [tasks[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    start = time.perf_counter()
+    done = 0
+
+    with open(out, 'a', newline='', encoding='utf-8') as table, \
+         open(manifest, 'a', encoding='utf-8') as done_file, \
+         ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(table, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        futures = [pool.submit(run_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            results = future.result()
+            for tid, rows in results:
+                writer.writerows({**fill, **row} for row in rows)
+            table.flush()
+            os.fsync(table.fileno())
+            # Only mark tasks done once their rows are on disk
+            done_file.write(''.join(tid + '\n' for tid, _ in results))
+            done_file.flush()
+            done += len(results)
+            if progress:
+                progress(done, total, time.perf_counter() - start)
+    return total
@@ -0,0 +1,306 @@
+"""Graph topologies: diffusion as a sparse mat-vec over an arbitrary cell graph.
+
+    topo = GraphTopology.hexagonal(256, periodic=True)
+    topo = GraphTopology.small_world(512, rewire=0.05, seed=1)
+    topo = GraphTopology.load_edge_list('causal.edges')
+    sim = FinalGridSimulator(size=topo.size, topology=topo)
+
+Nodes are the flat cell indices 0..size*size-1 of the usual (size, size)
+state, so events, regions, snapshots and the GUI work unchanged. A graph
+of N nodes gets the smallest grid with size*size >= N; the padding cells
+(ids N and up) are isolated and inactive: the simulator keeps them at
+zero and never picks them for events or entanglement. The row-normalised adjacency W (row i averages the
+neighbours of i; an isolated node averages itself, i.e. keeps its value)
+is built once in CSR form, and diffusion is (1 - rate) * x + rate * W @ x:
+one sparse mat-vec per field per step, with scipy's CSR kernel when scipy
+is installed and a NumPy gather/reduceat otherwise. Either way the
+product is written into the caller's buffer; the scratch it needs is
+allocated once per row band. Row bands of the grid are contiguous CSR
+row ranges, so tiled stepping works as on the lattice.
+"""
+import numpy as np
+
+TOPOLOGIES = ('lattice', 'hex', 'small-world')
+
+def _scipy_sparse():
+    """scipy.sparse, or None when scipy is not installed."""
+    try:
+        import scipy.sparse
+    except ImportError:
+        return None
+    return scipy.sparse
+
+def _csr_kernels():
+    """scipy's in-place CSR kernels behind `csr_matrix @`: (y += A @ x, Y += A @ X), or None without scipy."""
+    if _scipy_sparse() is None:
+        return None
+    try:
+        from scipy.sparse._sparsetools import csr_matvec, csr_matvecs
+    except ImportError:
+        return None
+    return csr_matvec, csr_matvecs
+
+def _grid_size(nodes):
+    size = 1
+    while size * size < nodes:
+        size += 1
+    return size
+
+class GraphTopology:
+    """Row-normalised CSR adjacency over the size*size cells of a grid.
+
+    Drop-in replacement for DiffusionKernel: same `neighbor_mean` and
+    `apply` interface, including row bands.
+    """
+    # Reported in place of the lattice boundary mode (checkpoint and sweep metadata)
+    boundary = 'graph'
+
+    def __init__(self, size, indptr, indices, weights, kind='edges', use_scipy=True, nodes=None):
+        self.size = size
+        self.cells = size * size
+        # Nodes 0..nodes-1 are the graph; the rest of the grid is padding
+        self.nodes = self.cells if nodes is None else int(nodes)
+        if not 1 <= self.nodes <= self.cells:
+            raise ValueError(f"A {size}x{size} grid holds 1..{self.cells} nodes, got {self.nodes}")
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.indptr.shape != (self.cells + 1,):
+            raise ValueError(f"indptr must have {self.cells + 1} entries for a {size}x{size} grid")
+        if np.any(np.diff(self.indptr) < 1):
+            raise ValueError("Every node needs at least one entry (isolated nodes average themselves)")
+        self.kind = kind
+        self._kernels = _csr_kernels() if use_scipy else None
+        # CSR row ranges of the row bands, and scratch per (band, fields), built on first use
+        self._bands = {}
+        self._scratch = {}
+
+    @classmethod
+    def from_edges(cls, src, dst, size=None, weights=None, directed=False, kind='edges', use_scipy=True,
+                   nodes=None):
+        """Build from edge arrays (node ids 0..N-1, N = `nodes` or the largest id + 1).
+
+        Undirected edges diffuse both ways; directed edges carry node i's
+        mean over its out-neighbours. Repeated edges add up their weights.
+        """
+        src = np.asarray(src, dtype=np.intp).reshape(-1)
+        dst = np.asarray(dst, dtype=np.intp).reshape(-1)
+        w = np.ones(src.size) if weights is None else np.asarray(weights, dtype=np.float64).reshape(-1)
+        if src.shape != dst.shape or w.shape != src.shape:
+            raise ValueError("Edge arrays must have the same length")
+        if nodes is None:
+            nodes = int(max(src.max(), dst.max())) + 1 if src.size else 1
+        size = _grid_size(nodes) if size is None else size
+        cells = size * size
+        if nodes > cells or src.size and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= nodes):
+            raise ValueError(f"Node ids must be in 0..{min(nodes, cells) - 1} for a {size}x{size} grid")
+        if not directed:
+            src, dst, w = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([w, w])
+        # Isolated nodes get a self-loop so they keep their value
+        isolated = np.flatnonzero(np.bincount(src, minlength=cells) == 0)
+        src = np.concatenate([src, isolated])
+        dst = np.concatenate([dst, isolated])
+        w = np.concatenate([w, np.ones(isolated.size)])
+
+        keys, inverse = np.unique(src * cells + dst, return_inverse=True)
+        w = np.bincount(inverse.reshape(-1), weights=w)
+        rows, indices = np.divmod(keys, cells)
+        totals = np.bincount(rows, weights=w, minlength=cells)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=cells))])
+        return cls(size, indptr, indices, w / totals[rows], kind=kind, use_scipy=use_scipy, nodes=nodes)
+
+    @classmethod
+    def lattice(cls, size, boundary='open', use_scipy=True):
+        """The 4-neighbour grid of DiffusionKernel as a graph (same boundary modes)."""
+        r, c = np.divmod(np.arange(size * size), size)
+        src, dst = [], []
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nr, nc = r + dr, c + dc
+            inside = (nr >= 0) & (nr < size) & (nc >= 0) & (nc < size)
+            if boundary == 'periodic':
+                nr, nc, inside = nr % size, nc % size, np.ones_like(inside)
+            elif boundary == 'reflecting':
+                # Out-of-grid neighbours mirror the cell itself
+                nr, nc, inside = np.where(inside, nr, r), np.where(inside, nc, c), np.ones_like(inside)
+            src.append(r[inside] * size + c[inside])
+            dst.append(nr[inside] * size + nc[inside])
+        return cls.from_edges(np.concatenate(src), np.concatenate(dst), size=size, directed=True,
+                              kind=f"lattice-{boundary}", use_scipy=use_scipy, nodes=size * size)
+
+    @classmethod
+    def hexagonal(cls, size, periodic=False, use_scipy=True):
+        """6-neighbour hexagonal lattice in offset rows (odd rows shifted right by half a cell)."""
+        if periodic and size % 2:
+            raise ValueError("A periodic hexagonal lattice needs an even size")
+        r, c = np.divmod(np.arange(size * size), size)
+        odd = r % 2
+        src, dst = [], []
+        for dr, dc_even, dc_odd in ((0, -1, -1), (0, 1, 1), (-1, -1, 0), (-1, 0, 1), (1, -1, 0), (1, 0, 1)):
+            nr, nc = r + dr, c + np.where(odd, dc_odd, dc_even)
+            inside = (nr >= 0) & (nr < size) & (nc >= 0) & (nc < size)
+            if periodic:
+                nr, nc, inside = nr % size, nc % size, np.ones_like(inside)
+            src.append(r[inside] * size + c[inside])
+            dst.append(nr[inside] * size + nc[inside])
+        return cls.from_edges(np.concatenate(src), np.concatenate(dst), size=size, directed=True,
+                              kind='hex-periodic' if periodic else 'hex', use_scipy=use_scipy, nodes=size * size)
+
+    @classmethod
+    def small_world(cls, size, rewire=0.1, seed=None, use_scipy=True):
+        """Watts-Strogatz graph: a periodic 4-neighbour lattice with each edge's far end
+        rewired to a random node with probability `rewire`."""
+        rng = np.random.default_rng(seed)
+        cells = size * size
+        r, c = np.divmod(np.arange(cells), size)
+        src = np.concatenate([np.arange(cells), np.arange(cells)])
+        dst = np.concatenate([r * size + (c + 1) % size, (r + 1) % size * size + c])
+        moved = np.flatnonzero(rng.random(src.size) < rewire)
+        # A uniform node other than the source
+        far = rng.integers(0, cells - 1, size=moved.size) if cells > 1 else np.zeros(moved.size, dtype=np.intp)
+        dst[moved] = far + (far >= src[moved])
+        return cls.from_edges(src, dst, size=size, kind='small-world', use_scipy=use_scipy, nodes=cells)
+
+    @classmethod
+    def load_edge_list(cls, path, size=None, directed=False, use_scipy=True):
+        """Read 'src dst [weight]' lines (whitespace or comma separated, '#' comments)."""
+        with open(path, encoding='utf-8') as f:
+            text = f.read().replace(',', ' ')
+        rows = np.loadtxt(text.splitlines(), ndmin=2)
+        if rows.size == 0:
+            rows = np.empty((0, 2))
+        if rows.shape[1] < 2:
+            raise ValueError(f"{path}: expected 'src dst [weight]' per line")
+        weights = rows[:, 2] if rows.shape[1] > 2 else None
+        return cls.from_edges(rows[:, 0].astype(np.intp), rows[:, 1].astype(np.intp), size=size,
+                              weights=weights, directed=directed, use_scipy=use_scipy)
+
+    @property
+    def embedded(self):
+        """True when node ids follow grid positions (lattice, hex, small-world); False for edge lists."""
+        return self.kind != 'edges'
+
+    @property
+    def degree(self):
+        """Stored neighbours per node (isolated nodes count their self-loop)."""
+        return np.diff(self.indptr)
+
+    def _band(self, r0, r1):
+        band = self._bands.get((r0, r1))
+        if band is None:
+            lo, hi = r0 * self.size, r1 * self.size
+            a, b = self.indptr[lo], self.indptr[hi]
+            band = (self.indptr[lo:hi + 1] - a, self.indices[a:b], self.weights[a:b])
+            self._bands[(r0, r1)] = band
+        return band
+
+    def _buffers(self, r0, r1, n):
+        """Scratch of a band for n fields: (X, Y) of scipy's kernel, or the NumPy path's gathered terms."""
+        buffers = self._scratch.get((r0, r1, n))
+        if buffers is None:
+            indptr, indices, _ = self._band(r0, r1)
+            if self._kernels is not None:
+                buffers = (np.empty((self.cells, n)), np.empty((len(indptr) - 1, n)))
+            else:
+                buffers = (np.empty((n, len(indices))), np.empty((n, len(indptr) - 1)))
+            self._scratch[(r0, r1, n)] = buffers
+        return buffers
+
+    def neighbor_mean(self, field, rows=None):
+        """W @ field over the last two axes (optionally only the nodes of one band of rows)."""
+        r0, r1 = rows if rows is not None else (0, self.size)
+        out = np.empty(field.shape[:-2] + (max(r1 - r0, 0), self.size))
+        return self.neighbor_mean_into(field, (r0, r1), out)
+
+    def neighbor_mean_into(self, field, rows, out):
+        """`neighbor_mean(field, rows)` computed into `out` (the band's shape) without allocating."""
+        r0, r1 = rows
+        if r1 <= r0:
+            return out
+        x = field.reshape(-1, self.cells)
+        n = len(x)
+        indptr, indices, weights = self._band(r0, r1)
+        nodes = len(indptr) - 1
+        if self._kernels is not None:
+            matvec, matvecs = self._kernels
+            if n == 1 and out.flags.c_contiguous:
+                # One field: x and y are views, nothing is copied
+                y = out.reshape(nodes)
+                y[...] = 0.0
+                matvec(nodes, self.cells, indptr, indices, weights, x.reshape(self.cells), y)
+                return out
+            # Several fields (an ensemble): the kernel takes them as columns
+            xt, yt = self._buffers(r0, r1, n)
+            np.copyto(xt, x.T)
+            yt[...] = 0.0
+            matvecs(nodes, self.cells, n, indptr, indices, weights, xt, yt)
+            np.copyto(out, yt.T.reshape(out.shape))
+            return out
+        terms, sums = self._buffers(r0, r1, n)
+        # mode='clip' (the indices are in range) makes take write straight into `terms`, unbuffered
+        np.take(x, indices, axis=-1, out=terms, mode='clip')
+        terms *= weights
+        np.add.reduceat(terms, indptr[:-1], axis=-1, out=sums)
+        np.copyto(out, sums.reshape(out.shape))
+        return out
+
+    def apply(self, field, rate, rows=None, out=None, work=None):
+        """Relax `field` towards its neighbour mean by `rate`; `out` and `work` as in DiffusionKernel.apply."""
+        r0, r1 = rows if rows is not None else (0, self.size)
+        mid = field[..., r0:r1, :]
+        if out is None:
+            mean = self.neighbor_mean(field, (r0, r1))
+            mean *= rate
+            return mid * (1 - rate) + mean
+        self.neighbor_mean_into(field, (r0, r1), work)
+        work *= rate
+        np.multiply(mid, 1 - rate, out=out)
+        out += work
+        return out
+
+    def _neighbors(self, nodes):
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        counts = ends - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.indices[offsets + np.arange(counts.sum())]
+
+    def within(self, source, hops):
+        """Ascending nodes at graph distance 1..hops from `source` (breadth-first over out-edges)."""
+        reached = np.array([source], dtype=np.intp)
+        frontier = reached
+        for _ in range(hops):
+            frontier = np.setdiff1d(self._neighbors(frontier), reached)
+            if not frontier.size:
+                break
+            reached = np.union1d(reached, frontier)
+        return reached[reached != source]
+
+    def sample_pairs(self, rng, k, hops):
+        """Up to k disjoint pairs (a, b) with b drawn uniformly within `hops` of a.
+
+        Sources are distinct uniform nodes; a source whose neighbourhood is
+        already used up is skipped, so fewer than k pairs may come back.
+        Padding cells are isolated, so they are never a source or a target.
+        """
+        k = min(int(k), self.nodes // 2)
+        sources = rng.choice(self.nodes, size=k, replace=False)
+        taken = set(sources.tolist())
+        a, b = [], []
+        for source in sources:
+            candidates = self.within(int(source), hops)
+            candidates = candidates[~np.isin(candidates, list(taken))]
+            if not candidates.size:
+                continue
+            target = int(candidates[rng.integers(candidates.size)])
+            taken.add(target)
+            a.append(int(source))
+            b.append(target)
+        return np.array(a, dtype=np.intp), np.array(b, dtype=np.intp)
+
+    def to_arrays(self):
+        return {'size': np.array(self.size), 'nodes': np.array(self.nodes), 'indptr': self.indptr,
+                'indices': self.indices, 'weights': self.weights, 'kind': np.array(self.kind)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(int(arrays['size']), arrays['indptr'], arrays['indices'], arrays['weights'],
+                   kind=str(arrays['kind']), nodes=int(arrays['nodes']) if 'nodes' in arrays else None)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from qcsim import bench, GraphTopology, SimulationParams
+
+def _report(**values):
+    return {'meta': {}, 'results': {name: bench._metric(value, unit, higher)
+                                    for name, (value, unit, higher) in values.items()}}
+
+BASE = _report(rate=(100.0, 'steps/s', True), memory=(1000.0, 'bytes', False), fps=(30.0, 'fps', True))
+
+def test_compare_signs_changes_by_direction():
+    current = _report(rate=(80.0, 'steps/s', True), memory=(900.0, 'bytes', False), new=(1.0, 'x', True))
+    rows = {name: row for name, *row in bench.compare(current, BASE, threshold=0.1)}
+    assert set(rows) == {'rate', 'memory'}  # only metrics present in both
+    old, new, change, regressed = rows['rate']
+    assert change == pytest.approx(-0.2) and regressed
+    old, new, change, regressed = rows['memory']
+    assert change == pytest.approx(0.1) and not regressed
+
+def test_compare_threshold_and_zero_baseline():
+    base = _report(rate=(100.0, 'steps/s', True), zero=(0.0, 'bytes', False))
+    current = _report(rate=(95.0, 'steps/s', True), zero=(10.0, 'bytes', False))
+    rows = bench.compare(current, base, threshold=0.1)
+    assert [(name, regressed) for name, *_, regressed in rows] == [('rate', False)]
+
+@pytest.mark.parametrize('rate, status', [(100.0, 0), (50.0, 1)])
+def test_main_fails_on_regression(tmp_path, monkeypatch, capsys, rate, status):
+    baseline = tmp_path / 'base.json'
+    baseline.write_text(json.dumps(BASE))
+    current = _report(rate=(rate, 'steps/s', True), memory=(1000.0, 'bytes', False))
+    monkeypatch.setattr(bench, 'run_benchmarks', lambda **kwargs: current)
+    out = tmp_path / 'new.json'
+    assert bench.main(out=str(out), baseline=str(baseline), threshold=0.15, quick=True) == status
+    assert json.loads(out.read_text()) == current
+    assert ('REGRESSION' in capsys.readouterr().out) == bool(status)
+
+def test_quick_suite_reports_every_metric():
+    report = bench.run_benchmarks(sizes=(5,), regimes=('default',), frame_sizes=(), min_time=0.01,
+                                  log=lambda line: None)
+    results = report['results']
+    assert set(results) == {'step.default.5', 'peak_memory.default.5', 'step_alloc.5', 'step_alloc.hex.5',
+                            'export_csv'}
+    assert all(metric['value'] > 0 for metric in results.values())
+    assert not results['step_alloc.5']['higher_is_better']
+
+# Rare events off: their records are the one allocation that legitimately scales with the cell count
+NO_RARE_EVENTS = SimulationParams(bh_prob=0.0, agent_obs_prob=0.0, bg_obs_prob=0.0,
+                                  entanglement_prob=0.5, entanglement_attempts=4)
+
+def test_step_allocations_do_not_grow_with_the_grid():
+    small = bench.bench_step_alloc(32, steps=10, params=NO_RARE_EVENTS.replace())
+    large = bench.bench_step_alloc(256, steps=10, params=NO_RARE_EVENTS.replace())
+    field = 256 * 256 * 8
+    assert large < small + 4096 < field / 16
+
+def test_default_step_allocates_no_dense_temporaries():
+    size = 256
+    assert bench.bench_step_alloc(size, steps=10) < size * size * 8 / 4
+
+@pytest.mark.parametrize('use_scipy', (True, False))
+def test_graph_step_allocations_do_not_grow_with_the_grid(use_scipy):
+    def alloc(size):
+        topology = GraphTopology.hexagonal(size, use_scipy=use_scipy)
+        return bench.bench_step_alloc(size, steps=10, params=NO_RARE_EVENTS.replace(), topology=topology)
+    small, large = alloc(32), alloc(256)
+    assert large < small + 4096 < 256 * 256 * 8 / 16
@@ -0,0 +1,106 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationParams, LOG_OFF
+from qcsim.cache import ResultCache, RunResult, run_key
+from qcsim.metrics import STEP_FIELDS
+
+PARAMS = SimulationParams(causality_strength=0.4, bh_prob=0.05)
+
+def _result(key, steps=20):
+    columns = {name: np.arange(steps, dtype=np.float64) for name in STEP_FIELDS}
+    return RunResult(key, columns)
+
+def _size(cache, key):
+    return os.path.getsize(cache._file(key))
+
+def _age(cache, key, seconds_ago):
+    t = time.time() - seconds_ago
+    os.utime(cache._file(key), (t, t))
+
+def test_hit_matches_a_fresh_run(tmp_path):
+    cache = ResultCache(tmp_path)
+    first = cache.run(size=6, steps=25, seed=3, params=PARAMS)
+    hit = cache.run(size=6, steps=25, seed=3, params=PARAMS)
+    assert not first.cached and hit.cached
+    sim = FinalGridSimulator(size=6, seed=3, log_level=LOG_OFF, params=PARAMS.replace())
+    for _ in range(25):
+        sim.step()
+    assert hit.step_data == sim.step_data
+    for name in STEP_FIELDS:
+        np.testing.assert_array_equal(hit.columns[name], first.columns[name])
+    np.testing.assert_array_equal(hit.total_entropy_history, [row['total_entropy'] for row in sim.step_data])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stores'], stats['entries']) == (1, 1, 1, 1)
+
+def test_unseeded_runs_are_not_cached(tmp_path):
+    cache = ResultCache(tmp_path)
+    assert run_key(6, 10, None) is None
+    cache.run(size=6, steps=10)
+    stats = cache.stats()
+    assert stats['uncacheable'] == 1 and stats['entries'] == 0
+
+def test_lru_eviction_under_a_small_limit(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1 << 30)
+    keys = ['aa01', 'bb02', 'cc03']
+    for age, key in zip((30, 20, 10), keys):
+        cache.put(_result(key))
+        _age(cache, key, age)
+    # A hit makes the oldest entry the most recently used
+    assert cache.get('aa01') is not None
+    cache.max_bytes = _size(cache, 'aa01') + _size(cache, 'cc03')
+    cache.put(_result('dd04'))
+    assert cache.get('bb02') is None and cache.get('cc03') is None
+    assert cache.get('aa01') is not None and cache.get('dd04') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 2 and stats['entries'] == 2
+    assert stats['bytes'] == _size(cache, 'aa01') + _size(cache, 'dd04') <= cache.max_bytes
+
+def test_empty_shard_directories_are_removed(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put(_result('aa01'))
+    cache.put(_result('bb02'))
+    assert sorted(os.listdir(cache._objects)) == ['aa', 'bb']
+    _age(cache, 'aa01', 10)
+    cache.evict(_size(cache, 'bb02'))
+    assert os.listdir(cache._objects) == ['bb']
+    cache.clear()
+    assert os.listdir(cache._objects) == []
+    assert cache.stats()['entries'] == 0
+
+def test_temporaries_count_and_stale_ones_are_removed(tmp_path):
+    cache = ResultCache(tmp_path, tmp_max_age=60)
+    cache.put(_result('aa01'))
+    entry = _size(cache, 'aa01')
+    live = os.path.join(cache._tmp, 'bb02.1.tmp')
+    stale = os.path.join(cache._objects, 'aa', 'cc03.2.tmp')
+    for path in (live, stale):
+        with open(path, 'wb') as f:
+            f.write(b'x' * entry)
+    t = time.time() - 120
+    os.utime(stale, (t, t))
+    # The live temporary takes the entry's room; the stale one is deleted, not counted
+    assert cache.evict(entry) == 1
+    assert not os.path.exists(stale) and os.path.exists(live)
+    assert cache.get('aa01') is None
+    stats = cache.stats()
+    assert stats['evicted_bytes'] == 2 * entry and stats['entries'] == 0
+
+def test_put_and_stats_do_not_scan(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    cache.put(_result('aa01'))
+    def scan():
+        raise AssertionError("scanned the object tree")
+    monkeypatch.setattr(cache, '_scan', scan)
+    cache.put(_result('bb02'))
+    cache.put(_result('bb02'))
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['stores'] == 3
+    assert stats['bytes'] == _size(cache, 'aa01') + _size(cache, 'bb02')
+    # Going over the limit is what triggers a scan
+    cache.max_bytes = stats['bytes'] - 1
+    with pytest.raises(AssertionError, match="scanned"):
+        cache.put(_result('cc03'))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from qcsim import (EnsembleSimulator, FinalGridSimulator, GraphTopology, RegionMap, RunningStats, SimulationParams,
+                   SimulationRNG, load_checkpoint, save_checkpoint, LOG_OFF)
+
+PARAMS = SimulationParams(bh_prob=0.05, entanglement_prob=0.5, causality_strength=0.4)
+
+def _sim(**kwargs):
+    return FinalGridSimulator(size=8, log_level=LOG_OFF, params=PARAMS.replace(),
+                              rng=SimulationRNG(6, block_steps=5), **kwargs)
+
+def _assert_same(a, b):
+    assert a.step_count == b.step_count and a.bh_events == b.bh_events
+    assert list(a.step_data) == list(b.step_data)
+    for name in ('local_temperature', 'entropy_fragments', 'postponed_buffer', 'observation_count',
+                 'entangled_with'):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+def _steps(sim, n):
+    for _ in range(n):
+        sim.step()
+
+@pytest.mark.parametrize('extra', ({}, {'topology': 'hex'}, {'regions': 'painted'}))
+def test_resume_is_bit_identical(tmp_path, extra):
+    kwargs = {}
+    if extra.get('topology'):
+        kwargs['topology'] = GraphTopology.hexagonal(8)
+    if extra.get('regions'):
+        regions = RegionMap.background(8)
+        regions.paint(np.s_[2:5, 1:7], obs_prob=0.4, cbr_strength=3.0)
+        kwargs['regions'] = regions
+    path = str(tmp_path / 'run.ckpt')
+    straight = _sim(**kwargs)
+    _steps(straight, 23)
+    interrupted = _sim(**kwargs)
+    # Mid RNG block, so the partly used block is part of the state
+    _steps(interrupted, 13)
+    save_checkpoint(interrupted, path)
+    resumed = load_checkpoint(path)
+    _steps(resumed, 10)
+    _assert_same(resumed, straight)
+
+def test_stats_resume(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    straight = _sim(stats=RunningStats())
+    _steps(straight, 12)
+    interrupted = _sim(stats=RunningStats())
+    _steps(interrupted, 5)
+    save_checkpoint(interrupted, path)
+    resumed = load_checkpoint(path)
+    _steps(resumed, 7)
+    for name in ('temperature', 'fragments'):
+        np.testing.assert_array_equal(resumed.stats.mean[name], straight.stats.mean[name])
+        np.testing.assert_array_equal(resumed.stats.m2[name], straight.stats.m2[name])
+    np.testing.assert_array_equal(resumed.stats.counts['black_holes'], straight.stats.counts['black_holes'])
+
+def test_checkpoint_is_atomic_and_typed(tmp_path):
+    path = tmp_path / 'run.ckpt'
+    sim = _sim()
+    sim.step()
+    save_checkpoint(sim, str(path))
+    assert path.exists() and not (tmp_path / 'run.ckpt.tmp').exists()
+    with pytest.raises(TypeError):
+        save_checkpoint(EnsembleSimulator(2, size=4), str(path))
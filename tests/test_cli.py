@@ -0,0 +1,49 @@
+import csv
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from qcsim.cli import GUI_MODULES, main
+from qcsim.metrics import STEP_FIELDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def test_import_does_not_load_gui():
+    code = f"import sys, qcsim, qcsim.cli; print(sorted(m for m in {GUI_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
+
+def test_headless_run_writes_csv(tmp_path, capsys):
+    out = tmp_path / 'run.csv'
+    assert main(['run', '--size', '6', '--steps', '12', '--seed', '1', '--out', str(out)]) == 0
+    rows = _read(out)
+    assert list(rows[0]) == list(STEP_FIELDS)
+    assert [int(row['step']) for row in rows] == list(range(1, 13))
+    assert 'Steps: 12' in capsys.readouterr().out
+
+def test_seeded_runs_repeat(tmp_path, capsys):
+    a, b = tmp_path / 'a.csv', tmp_path / 'b.csv'
+    for out in (a, b):
+        main(['run', '--size', '5', '--steps', '20', '--seed', '4', '--causality', '0.3', '--out', str(out)])
+    assert _read(a) == _read(b)
+
+def test_resume_with_more_steps_grows_the_snapshot_archive(tmp_path):
+    from qcsim import SnapshotArchive
+    straight, resumed, ckpt = tmp_path / 'straight', tmp_path / 'resumed', str(tmp_path / 'run.ckpt')
+    common = ['run', '--size', '6', '--seed', '3', '--snapshot-every', '3']
+    main(common + ['--steps', '30', '--snapshots', str(straight)])
+    main(common + ['--steps', '12', '--snapshots', str(resumed), '--checkpoint', ckpt])
+    # The archive was allocated for 4 frames; the resumed run records 10
+    assert main(common + ['--steps', '30', '--snapshots', str(resumed), '--checkpoint', ckpt, '--resume']) == 0
+    a, b = SnapshotArchive(str(straight)), SnapshotArchive(str(resumed))
+    assert len(b) == 10 and b.steps.tolist() == a.steps.tolist()
+    for name in ('temperature', 'fragments', 'observations'):
+        np.testing.assert_array_equal(b.field(name), a.field(name))
+    for x, y in zip(a, b):
+        assert (x.bh_locs, x.ent_locs) == (y.bh_locs, y.ent_locs)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from qcsim import DiffusionKernel, DIFFUSION_BOUNDARIES
+
+def reference_diffusion(field, rate, boundary):
+    """The original per-cell loop of FinalGridSimulator.step, extended to the wrapped and mirrored edges."""
+    size = field.shape[0]
+    out = field.copy()
+    for i in range(size):
+        for j in range(size):
+            neighbors = []
+            for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                ni, nj = i + di, j + dj
+                if 0 <= ni < size and 0 <= nj < size:
+                    neighbors.append((ni, nj))
+                elif boundary == 'periodic':
+                    neighbors.append((ni % size, nj % size))
+                elif boundary == 'reflecting':
+                    neighbors.append((i, j))
+            if neighbors:
+                avg = np.mean([field[ni, nj] for ni, nj in neighbors])
+                out[i, j] = field[i, j] * (1 - rate) + avg * rate
+    return out
+
+SIZES = (1, 2, 5, 13)
+RATE = 0.2 * 0.8
+
+def _field(size, seed=0):
+    return np.random.default_rng(seed).uniform(0, 1000, (size, size))
+
+@pytest.mark.parametrize('boundary', DIFFUSION_BOUNDARIES)
+@pytest.mark.parametrize('size', SIZES)
+def test_kernel_matches_loop(size, boundary):
+    field = _field(size)
+    expected = reference_diffusion(field, RATE, boundary)
+    np.testing.assert_array_equal(DiffusionKernel(size, boundary).apply(field, RATE), expected)
+
+@pytest.mark.parametrize('boundary', DIFFUSION_BOUNDARIES)
+@pytest.mark.parametrize('size', SIZES)
+def test_out_path_matches_loop(size, boundary):
+    field = _field(size, seed=1)
+    expected = reference_diffusion(field, RATE, boundary)
+    out, work = np.empty_like(field), np.empty_like(field)
+    result = DiffusionKernel(size, boundary).apply(field, RATE, out=out, work=work)
+    assert result is out
+    np.testing.assert_array_equal(out, expected)
+
+@pytest.mark.parametrize('boundary', DIFFUSION_BOUNDARIES)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('bands', (2, 3))
+def test_bands_stitch_to_loop(size, boundary, bands):
+    field = _field(size, seed=2)
+    expected = reference_diffusion(field, RATE, boundary)
+    kernel = DiffusionKernel(size, boundary)
+    cuts = np.linspace(0, size, min(bands, size) + 1).astype(int)
+    stitched = np.empty_like(field)
+    banded_out = np.empty_like(field)
+    work = np.empty_like(field)
+    for r0, r1 in zip(cuts[:-1], cuts[1:]):
+        stitched[r0:r1] = kernel.apply(field, RATE, (r0, r1))
+        kernel.apply(field, RATE, (r0, r1), out=banded_out[r0:r1], work=work[r0:r1])
+    np.testing.assert_array_equal(stitched, expected)
+    np.testing.assert_array_equal(banded_out, expected)
+
+def test_leading_axes_diffuse_independently():
+    fields = np.stack([_field(7, seed) for seed in range(3)])
+    kernel = DiffusionKernel(7, 'periodic')
+    diffused = kernel.apply(fields, RATE)
+    for k in range(3):
+        np.testing.assert_array_equal(diffused[k], reference_diffusion(fields[k], RATE, 'periodic'))
+
+def test_unknown_boundary():
+    with pytest.raises(ValueError):
+        DiffusionKernel(4, 'mirror')
@@ -0,0 +1,33 @@
+import numpy as np
+
+from qcsim import EnsembleSimulator, FinalGridSimulator, SimulationParams, LOG_OFF
+
+def test_histories_and_replica_local_pairs():
+    params = SimulationParams(entanglement_prob=1.0, entanglement_attempts=4)
+    ens = EnsembleSimulator(16, size=5, seed=2, params=params)
+    entropy, temp = ens.run(12)
+    assert entropy.shape == temp.shape == (16, 12)
+    pairs = ens.entanglement.pairs()
+    assert len(pairs)
+    np.testing.assert_array_equal(ens.replica_of(pairs[:, 0]), ens.replica_of(pairs[:, 1]))
+    # Independent replicas do not evolve in lockstep
+    assert len(np.unique(entropy[:, -1])) == 16
+
+def test_seeded_ensembles_repeat():
+    a = EnsembleSimulator(8, size=4, seed=9).run(10)
+    b = EnsembleSimulator(8, size=4, seed=9).run(10)
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
+
+def test_ensemble_statistics_match_single_runs():
+    replicas, steps = 200, 30
+    entropy, _ = EnsembleSimulator(replicas, size=5, seed=0).run(steps)
+    singles = []
+    for seed in range(replicas):
+        sim = FinalGridSimulator(size=5, seed=1000 + seed, log_level=LOG_OFF)
+        for _ in range(steps):
+            sim.step()
+        singles.append(sim.total_entropy_history[-1])
+    singles = np.array(singles)
+    stderr = np.sqrt(entropy[:, -1].var() / replicas + singles.var() / replicas)
+    assert abs(entropy[:, -1].mean() - singles.mean()) < 5 * stderr
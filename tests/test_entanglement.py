@@ -0,0 +1,55 @@
+import numpy as np
+
+from qcsim.entanglement import EntanglementRegistry, sample_pairs
+
+def _assert_involution(reg):
+    paired = np.flatnonzero(reg.partner >= 0)
+    np.testing.assert_array_equal(reg.partner[reg.partner[paired]], paired)
+    np.testing.assert_array_equal(reg.paired, paired)
+
+def test_relinking_releases_the_old_partners():
+    reg = EntanglementRegistry(10)
+    reg.link([0, 2], [1, 3])
+    assert reg.pairs().tolist() == [[0, 1], [2, 3]] and len(reg) == 2
+    reg.link([1], [2])  # 0 and 3 lose their partners
+    assert reg.pairs().tolist() == [[1, 2]]
+    assert reg.partner[0] == reg.partner[3] == -1
+    _assert_involution(reg)
+    reg.unlink([2])
+    assert len(reg) == 0 and np.all(reg.partner == -1)
+
+def test_random_relinking_keeps_an_involution():
+    rng = np.random.default_rng(5)
+    reg = EntanglementRegistry(64)
+    for _ in range(200):
+        a, b = sample_pairs(rng, 64, rng.integers(1, 8))
+        reg.link(a, b)
+        _assert_involution(reg)
+        pairs = reg.pairs()
+        assert np.all(pairs[:, 0] < pairs[:, 1])
+        assert len(np.unique(pairs)) == pairs.size == 2 * len(reg)
+
+def test_direct_writes_need_invalidate():
+    reg = EntanglementRegistry(4)
+    assert reg.paired.size == 0
+    reg.partner[:] = [1, 0, -1, -1]
+    assert reg.paired.size == 0  # cached
+    reg.invalidate()
+    assert reg.paired.tolist() == [0, 1]
+
+def test_scatter_effect_reads_every_source_before_adding():
+    reg = EntanglementRegistry(6)
+    reg.link([0, 2], [1, 5])
+    values = np.array([10.0, 20.0, 30.0, 40.0, 50.0, 60.0])
+    observed = np.array([True, True, True, True, False, False])
+    sources, targets, amounts = reg.scatter_effect(observed, values, 0.5)
+    assert sources.tolist() == [0, 1, 2] and targets.tolist() == [1, 0, 5]
+    # 0 and 1 heat each other from their values before the step
+    np.testing.assert_allclose(amounts, [5.0, 10.0, 15.0])
+    np.testing.assert_allclose(values, [20.0, 25.0, 30.0, 40.0, 50.0, 75.0])
+
+def test_sample_pairs_is_disjoint_and_capped():
+    rng = np.random.default_rng(1)
+    a, b = sample_pairs(rng, 9, 100)
+    assert len(a) == len(b) == 4
+    assert len(np.unique(np.concatenate([a, b]))) == 8
@@ -0,0 +1,50 @@
+import numpy as np
+
+from qcsim import (FinalGridSimulator, SimulationParams, StepEvents, EVENT_BLACK_HOLE, EVENT_OBSERVATION,
+                   EVENT_ENTANGLEMENT_CREATED, EVENT_ENTANGLEMENT_EFFECT, LOG_OFF, LOG_SUMMARY, LOG_EVENTS)
+
+def _busy_sim(log_level=LOG_OFF):
+    params = SimulationParams(bh_prob=0.2, entanglement_prob=1.0, entanglement_attempts=3,
+                              agent_obs_prob=0.5, bg_obs_prob=0.5)
+    return FinalGridSimulator(size=8, seed=5, log_level=log_level, params=params)
+
+def test_records_match_state_and_step_data():
+    sim = _busy_sim()
+    bh_total = 0
+    for _ in range(30):
+        sim.step()
+        ev = sim.last_events
+        row = sim.step_data[-1]
+        bh_total += len(ev.black_holes)
+        assert row['bh_events_this_step'] == ev.count(EVENT_BLACK_HOLE)
+        assert row['observations_this_step'] == ev.count(EVENT_OBSERVATION)
+        assert row['entanglement_pairs'] == ev.count(EVENT_ENTANGLEMENT_CREATED)
+        assert row['entanglement_effects_this_step'] == ev.count(EVENT_ENTANGLEMENT_EFFECT)
+        # Observation numbers are the cells' counters after the step
+        np.testing.assert_array_equal(ev.observation_counts, sim.observation_count.reshape(-1)[ev.observations])
+        assert np.all(ev.resolved > 0)
+        # Effects go from an observed cell to its partner (every cell has postponed information here)
+        assert set(ev.effect_sources.tolist()) <= set(ev.observations.tolist())
+        np.testing.assert_array_equal(sim.entangled_with[ev.effect_sources], ev.effect_targets)
+    assert bh_total == sim.bh_events > 0
+
+def test_log_levels():
+    quiet = _busy_sim(LOG_OFF)
+    summary = _busy_sim(LOG_SUMMARY)
+    full = _busy_sim(LOG_EVENTS)
+    for _ in range(5):
+        logs = [sim.step()[0] for sim in (quiet, summary, full)]
+    assert logs[0] == ""
+    assert logs[1].count("\n") == 1 and "BlackHoles:" in logs[1]
+    assert logs[2] == full.last_events.format(LOG_EVENTS)
+    kinds = [kind for kind, _ in full.last_events.lines()]
+    assert len(kinds) == sum(full.last_events.counts().values())
+
+def test_cells_and_locations():
+    ev = StepEvents(1, 5)
+    ev.black_holes = np.array([0, 7, 24])
+    ev.entanglements_created = np.array([[1, 23]])
+    assert ev.bh_locs == [(0, 0), (1, 2), (4, 4)]
+    assert ev.ent_locs == [(0, 1), (4, 3)]
+    assert ev.counts() == {EVENT_BLACK_HOLE: 3, EVENT_OBSERVATION: 0, EVENT_ENTANGLEMENT_CREATED: 1,
+                           EVENT_ENTANGLEMENT_EFFECT: 0}
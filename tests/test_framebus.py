@@ -0,0 +1,104 @@
+import os
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from qcsim import framebus
+from qcsim.framebus import FramePublisher, FrameViewer
+
+SIZE = 4
+
+@pytest.fixture(autouse=True)
+def same_process_attach(monkeypatch):
+    # Viewer and publisher share this process's resource tracker: a viewer unregistering the
+    # block (as it must in its own process) would drop the publisher's registration
+    monkeypatch.setattr(framebus, '_attach', lambda name: shared_memory.SharedMemory(name=name))
+
+@pytest.fixture
+def bus():
+    publisher = FramePublisher((SIZE, SIZE), name=f"qcsim-test-bus-{os.getpid()}", points=4, history=8,
+                               control=False)
+    viewer = FrameViewer(publisher.name)
+    yield publisher, viewer
+    viewer.close()
+    publisher.close()
+
+def _publish(publisher, step, black_holes=(1, 2), entanglements=((0, 5),)):
+    fields = [np.full((SIZE, SIZE), step * 10.0 + k) for k in range(3)]
+    publisher.publish(step, *fields, np.array(black_holes), np.array(entanglements), step, step * 1.5, step * 2.5,
+                      0.8)
+    return fields
+
+def test_viewer_reads_the_newest_frame_once(bus):
+    publisher, viewer = bus
+    assert viewer.latest() is None
+    _publish(publisher, 1)
+    fields = _publish(publisher, 2, black_holes=(3, 6, 9))
+    frame = viewer.latest()
+    assert frame.step == 2 and frame.valid()
+    for got, sent in zip((frame.temp, frame.frag, frame.obs), fields):
+        np.testing.assert_array_equal(got, sent)
+    assert frame.black_holes.tolist() == [3, 6, 9]
+    assert frame.bh_locs.tolist() == [[0, 3], [1, 2], [2, 1]]
+    assert frame.ent_locs.tolist() == [[0, 0], [1, 1]]
+    assert (frame.total_entropy, frame.total_temp, frame.causality) == (3.0, 5.0, 0.8)
+    assert viewer.latest() is None
+    rows, since = viewer.history()
+    assert since == 2 and rows[:, 0].tolist() == [1, 2]
+
+def test_views_go_stale_two_publishes_later_but_copies_do_not(bus):
+    publisher, viewer = bus
+    _publish(publisher, 1)
+    view = viewer.latest()
+    _publish(publisher, 2)
+    copied = viewer.latest(copy=True)
+    assert copied.step == 2 and copied.valid()
+    _publish(publisher, 3)
+    assert not view.valid()  # its slot now holds step 3
+    assert view.copy() is None  # a copy of a reused slot is dropped, never returned torn
+    _publish(publisher, 4)
+    _publish(publisher, 5)
+    assert copied.valid()
+    np.testing.assert_array_equal(copied.temp, np.full((SIZE, SIZE), 20.0))
+    assert copied.black_holes.tolist() == [1, 2] and copied.total_temp == 5.0
+    assert viewer.latest(copy=True).step == 5
+
+def test_copy_keeps_nothing_in_shared_memory(bus):
+    publisher, viewer = bus
+    _publish(publisher, 1)
+    frame = viewer.latest(copy=True)
+    viewer.close()  # would fail to unmap (and the test would leak) if the copy still held views
+    assert viewer.shm is None
+    assert frame.temp.base is None
+    np.testing.assert_array_equal(frame.frag, np.full((SIZE, SIZE), 11.0))
+
+def test_points_and_history_are_capped(bus):
+    publisher, viewer = bus
+    for step in range(1, 13):
+        _publish(publisher, step, black_holes=range(10), entanglements=[(k, k + 1) for k in range(6)])
+    frame = viewer.latest()
+    assert frame.black_holes.size == 4 and frame.entanglements.shape == (4, 2)
+    rows, since = viewer.history()
+    assert since == 12 and rows[:, 0].tolist() == list(range(5, 13))
+    rows, _ = viewer.history(since=10)
+    assert rows[:, 0].tolist() == [11, 12]
+
+def test_closing_the_publisher_is_seen_by_viewers(bus):
+    publisher, viewer = bus
+    assert not viewer.closed
+    publisher.close()
+    assert viewer.closed
+
+def test_fps_throttles_frames_but_not_totals():
+    publisher = FramePublisher((SIZE, SIZE), name=f"qcsim-test-fps-{os.getpid()}", fps=1, control=False)
+    viewer = FrameViewer(publisher.name)
+    try:
+        published = [publisher.publish(step, *(np.zeros((SIZE, SIZE)),) * 3, np.empty(0, dtype=np.intp),
+                                       np.empty((0, 2), dtype=np.intp), 0, 0.0, 0.0, 0.5) for step in (1, 2, 3)]
+        assert published == [True, False, False]
+        assert viewer.latest().step == 1 and viewer.steps == 3
+    finally:
+        viewer.close()
+        publisher.close()
@@ -0,0 +1,361 @@
+import os
+import queue
+from collections import deque
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tkinter')
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from qcsim import gui, FinalGridSimulator, LOG_OFF
+from qcsim.events import StepEvents
+from qcsim.profiling import PhaseProfiler
+from qcsim.regions import RegionMap
+
+SIZE = 6
+
+def _panels():
+    fig, ((ax_temp, ax_frag), (ax_obs, ax_stats)) = plt.subplots(2, 2, figsize=(8, 6), dpi=50)
+    canvas = FigureCanvasAgg(fig)
+    regions = RegionMap.square(SIZE)
+    fields = [gui.FieldView(fig, ax, (SIZE, SIZE), title, cmap, 'yellow', title, regions)
+              for ax, title, cmap in ((ax_temp, 'temp', 'inferno'), (ax_frag, 'frag', 'viridis'),
+                                      (ax_obs, 'obs', 'plasma'))]
+    renderer = gui.FrameRenderer(fig, canvas, fields, gui.StatsView(ax_stats, ax_stats.twinx()))
+    return fig, canvas, renderer
+
+def _series(*ys):
+    entropy, temp = gui.MinMaxSeries(), gui.MinMaxSeries()
+    for x, y in enumerate(ys):
+        entropy.append(x, y)
+        temp.append(x, y / 2)
+    return entropy, temp
+
+def _frame(seed, v_max):
+    rng = np.random.default_rng(seed)
+    matrices = [rng.random((SIZE, SIZE)) * v_max for _ in range(3)]
+    return matrices, [v_max] * 3, [(1, 2), (3, 3)], [(0, seed % SIZE)]
+
+# ---------------------------
+# --- Blitted rendering ---
+# ---------------------------
+def test_unchanged_scale_blits_and_matches_a_full_draw():
+    fig, canvas, renderer = _panels()
+    image = renderer.fields[0].image
+    renderer.update(*_frame(1, 5.0), *_series(0.2, 0.4))
+    assert renderer.background is not None and not renderer.dirty
+    background = renderer.background
+
+    draws = []
+    canvas.mpl_connect('draw_event', draws.append)
+    matrices, v_maxes, bh_locs, ent_locs = _frame(2, 4.0)
+    renderer.update(matrices, v_maxes, bh_locs, ent_locs, *_series(0.2, 0.4, 0.3))
+    assert draws == []  # blitted onto the cached background
+    assert renderer.background is background
+    assert renderer.fields[0].image is image  # artists updated in place
+    np.testing.assert_array_equal(image.get_array(), matrices[0])
+    blitted = np.asarray(canvas.buffer_rgba()).copy()
+
+    renderer.invalidate()
+    renderer.draw()
+    assert len(draws) == 1
+    np.testing.assert_array_equal(np.asarray(canvas.buffer_rgba()), blitted)
+    plt.close(fig)
+
+def test_growing_scale_or_axis_forces_a_full_draw():
+    fig, canvas, renderer = _panels()
+    renderer.update(*_frame(1, 5.0), *_series(0.2, 0.4))
+    draws = []
+    canvas.mpl_connect('draw_event', draws.append)
+
+    renderer.update(*_frame(2, 50.0), *_series(0.2, 0.4, 0.3))
+    assert len(draws) == 1  # colour scale grew: colorbar redrawn
+    assert renderer.fields[0].vmax == pytest.approx(60.0)
+
+    renderer.update(*_frame(3, 40.0), *_series(0.2, 0.4, 0.3, 7.0))
+    assert len(draws) == 2  # y range grew: ticks redrawn
+    lo, hi = renderer.stats.ax.get_ylim()
+    assert lo <= 0.2 and hi >= 7.0
+
+    renderer.update(*_frame(4, 40.0), *_series(0.2, 0.4, 0.3, 7.0, 6.0))
+    assert len(draws) == 2
+    plt.close(fig)
+
+def test_reset_clears_the_panels():
+    fig, canvas, renderer = _panels()
+    renderer.update(*_frame(1, 5.0), *_series(0.2, 0.4))
+    renderer.reset()
+    for view in renderer.fields:
+        assert view.vmax == 1
+        assert not np.any(view.image.get_array())
+        assert len(view.bh.get_offsets()) == 0
+    assert len(renderer.stats.entropy_line.get_xdata()) == 0
+    plt.close(fig)
+
+# ---------------------------
+# --- Frame pipeline ---
+# ---------------------------
+def _stepping_gui(sim, steps, frame_interval=60_000):
+    # Only the state run_simulation touches; no Tk root is needed
+    g = gui.SimulationGUI.__new__(gui.SimulationGUI)
+    g.simulator, g.steps, g.delay, g.running, g.finished = sim, steps, 0, True, False
+    g.checkpoint, g.checkpoint_every, g.profiler = None, 0, PhaseProfiler()
+    g.max_temp_val = g.max_frag_val = g.max_obs_val = 1
+    g._frames, g._records, g.frame_interval = queue.Queue(maxsize=1), deque(), frame_interval
+    g.published = []
+    publish = g._publish
+    g._publish = lambda frame: (g.published.append(frame), publish(frame))
+    return g
+
+class EmptyQueue(queue.Queue):
+    """A frame slot that is drained as soon as a frame is put."""
+    def put_nowait(self, item):
+        pass
+
+    def empty(self):
+        return True
+
+def _quiet_sim():
+    return FinalGridSimulator(size=SIZE, seed=3, log_level=LOG_OFF)
+
+def test_only_frames_the_display_can_take_are_copied():
+    sim = _quiet_sim()
+    g = _stepping_gui(sim, steps=50)
+    g.run_simulation()
+    # The first step fills the empty slot; nothing is due again until the last step
+    assert [f.step for f in g.published] == [1, 50]
+    assert len(g._records) == 50 and g.finished and not g.running
+    last = g._frames.get_nowait()
+    assert last is g.published[-1]
+    np.testing.assert_array_equal(last.temp, sim.local_temperature)
+    np.testing.assert_array_equal(last.frag, sim.entropy_fragments)
+    for field in (last.temp, last.frag, last.obs):
+        assert field.flags.writeable  # a copy, not the engine's read-only view
+        assert not np.shares_memory(field, sim.local_temperature)
+        assert not np.shares_memory(field, sim.entropy_fragments)
+
+def test_an_empty_slot_gets_the_next_frame():
+    sim = _quiet_sim()
+    g = _stepping_gui(sim, steps=10)
+    g._frames = EmptyQueue()  # the display takes every frame at once
+    g.run_simulation()
+    assert [f.step for f in g.published] == list(range(1, 11))
+
+def test_pause_publishes_the_step_it_stopped_at():
+    sim = _quiet_sim()
+    g = _stepping_gui(sim, steps=100)
+    step = sim.step
+
+    def pausing_step(**kwargs):
+        if sim.step_count == 29:
+            g.running = False
+        return step(**kwargs)
+
+    sim.step = pausing_step
+    g.run_simulation()
+    assert sim.step_count == 30 and not g.finished
+    assert [f.step for f in g.published] == [1, 30]
+    np.testing.assert_array_equal(g.published[-1].temp, sim.local_temperature)
+
+def test_a_due_frame_replaces_the_queued_one():
+    sim = _quiet_sim()
+    g = _stepping_gui(sim, steps=10, frame_interval=0)
+    g.run_simulation()
+    assert [f.step for f in g.published] == list(range(1, 11))
+    assert g._frames.get_nowait().step == 10 and g._frames.empty()
+
+# ---------------------------
+# --- Decimated series ---
+# ---------------------------
+def test_series_vertices_stay_within_budget():
+    series = gui.MinMaxSeries(budget=100)
+    ys = np.random.default_rng(0).random(20_000)
+    for x, y in enumerate(ys):
+        series.append(x, y)
+        if x % 997 == 0:
+            assert len(series.vertices()[0]) <= 103
+    xs, vs = series.vertices()
+    assert len(xs) <= 103
+    assert series.samples == len(ys) and series.stride > 1
+    assert np.all(np.diff(xs) >= 0)  # drawn in x order
+
+def test_series_keeps_extremes_spikes_and_the_last_point():
+    series = gui.MinMaxSeries(budget=50)
+    ys = np.sin(np.arange(10_001) / 300.0)
+    ys[4321] = 25.0  # a one-step black-hole burst
+    ys[7777] = -25.0
+    for x, y in enumerate(ys):
+        series.append(x, float(y))
+    xs, vs = series.vertices()
+    assert (series.ymin, series.ymax) == (-25.0, 25.0)
+    assert vs.max() == 25.0 and xs[vs.argmax()] == 4321
+    assert vs.min() == -25.0 and xs[vs.argmin()] == 7777
+    assert (xs[-1], vs[-1]) == (10_000, ys[-1])
+    assert series.first == (0, 0.0)
+
+def test_series_matches_the_raw_points_below_budget():
+    series = gui.MinMaxSeries(budget=100)
+    ys = [3.0, 1.0, 4.0, 1.5, 5.0]
+    for x, y in enumerate(ys):
+        series.append(x, y)
+    # Stride 1: each bucket's min and max are the same sample
+    points = list(dict.fromkeys(zip(*series.vertices())))
+    assert points == list(enumerate(ys))
+    series.clear()
+    assert series.samples == 0 and len(series.vertices()[0]) == 0
+
+# ---------------------------
+# --- Log panel ---
+# ---------------------------
+class FakeText:
+    """The slice of the Tk Text API LogPanel uses, as a list of (line, tag)."""
+    def __init__(self):
+        self.lines = []
+        self.inserts = 0
+
+    def insert(self, index, *args):
+        assert index == gui.tk.END
+        self.inserts += 1
+        self.lines += [(text, tag) for text, tag in zip(args[0::2], args[1::2])]
+
+    def delete(self, first, last):
+        assert first == "1.0"
+        if last == gui.tk.END:
+            self.lines.clear()
+        else:
+            del self.lines[:int(last.split('.')[0]) - 1]
+
+    def yview(self, *args):
+        pass
+
+def _events(step, black_holes=(), observations=()):
+    events = StepEvents(step, SIZE)
+    events.black_holes = np.array(black_holes, dtype=np.intp)
+    events.observations = np.array(observations, dtype=np.intp)
+    events.observation_counts = np.ones(len(observations), dtype=np.int64)
+    events.resolved = np.zeros(len(observations))
+    return events
+
+def test_log_writes_each_flush_in_one_insert_with_event_tags():
+    text = FakeText()
+    panel = gui.LogPanel(text, max_lines=100, interval=60)
+    panel.add_steps([(1, _events(1, black_holes=[0, 7])), (2, _events(2, observations=[3]))])
+    panel.flush(force=True)
+    assert text.inserts == 1
+    assert [tag for _, tag in text.lines] == ['step_header', 'bh_event', 'bh_event', 'step_header', 'observation']
+    assert text.lines[2][0].startswith('[Cell 1,1]')
+    panel.add_steps([(3, _events(3, black_holes=[1]))])
+    panel.flush()  # within the interval: buffered
+    assert text.inserts == 1
+    panel.flush(force=True)
+    assert text.inserts == 2 and len(text.lines) == 7
+
+def test_log_ring_and_widget_stay_bounded():
+    text = FakeText()
+    panel = gui.LogPanel(text, max_lines=50, interval=0)
+    for step in range(1, 301):
+        panel.add_steps([(step, _events(step, black_holes=[step % SIZE]))])
+        panel.flush()
+        # Trimmed in bulk once 10% over the cap
+        assert len(text.lines) <= 50 + 50 // 10 + 2
+    assert len(panel.lines) == 50
+    assert panel.lines[0][0] == 251 and panel.lines[-1][0] == 300
+    assert text.lines[-1][0].startswith(f'[Cell 0,{300 % SIZE}]')
+
+def test_large_batch_keeps_only_the_newest_lines():
+    text = FakeText()
+    panel = gui.LogPanel(text, max_lines=10, interval=0)
+    panel.add_steps([(step, _events(step, black_holes=[0, 1])) for step in range(1, 1001)])
+    assert [step for step, _, _ in panel.lines] == [996, 996, 997, 997, 998, 998, 999, 999, 1000, 1000]
+    panel.flush()
+    assert text.inserts == 1 and len(text.lines) == 10  # 15 written, trimmed back to the cap
+    assert text.lines[-1] == ('[Cell 0,1] ⚫BlackHole! Fragments adjusted\n', 'bh_event')
+
+def test_filter_redraws_from_the_ring():
+    text = FakeText()
+    panel = gui.LogPanel(text, max_lines=100, interval=60)
+    panel.add_steps([(1, _events(1, black_holes=[0], observations=[1])), (2, _events(2, observations=[2]))])
+    panel.flush(force=True)
+    panel.set_filter(gui.LOG_FILTERS["Black holes"])
+    assert [tag for _, tag in text.lines] == ['step_header', 'bh_event']
+    panel.set_filter(gui.LOG_FILTERS["Observations"])
+    assert [tag for _, tag in text.lines] == ['step_header', 'observation', 'step_header', 'observation']
+    panel.set_filter(gui.LOG_FILTERS["All events"])
+    assert len(text.lines) == 5
+    panel.clear()
+    assert text.lines == [] and len(panel.lines) == 0
+
+# ---------------------------
+# --- Frame bus viewer ---
+# ---------------------------
+def test_bus_frames_are_copied_before_drawing(monkeypatch):
+    from multiprocessing import shared_memory
+    from qcsim import framebus
+    # Publisher and viewer in one process: see tests/test_framebus.py
+    monkeypatch.setattr(framebus, '_attach', lambda name: shared_memory.SharedMemory(name=name))
+    publisher = framebus.FramePublisher((SIZE, SIZE), name=f"qcsim-test-gui-{os.getpid()}", control=False)
+    g = gui.SimulationGUI.__new__(gui.SimulationGUI)
+    g.viewer = framebus.FrameViewer(publisher.name)
+    g.running, g.finished, g._history_pos, g._causality_synced = True, False, 0, True
+    g.max_temp_val = g.max_frag_val = g.max_obs_val = 1
+    g.entropy_series, g.temp_series = gui.MinMaxSeries(), gui.MinMaxSeries()
+    no_events = (np.empty(0, dtype=np.intp), np.empty((0, 2), dtype=np.intp))
+    try:
+        for step in (1, 2, 3):
+            publisher.publish(step, *(np.full((SIZE, SIZE), float(step)),) * 3, *no_events, 0, step, step, 0.5)
+            if step == 1:
+                frame = g._read_bus()
+        # Two publishes later the slot holds step 3; the GUI's frame is unaffected
+        assert frame.step == 1 and np.all(frame.temp == 1.0) and np.all(frame.obs == 1.0)
+        assert g._read_bus().step == 3 and g._read_bus() is None
+        assert g.entropy_series.samples == 3 and g.max_temp_val == 3
+    finally:
+        g.viewer.close()
+        publisher.close()
+
+class FakeSlider:
+    """A tk.Scale: any change schedules one command call, made with the value at the next idle pass."""
+    def __init__(self, command):
+        self.command, self.value, self.pending = command, 0.0, False
+
+    def set(self, value):
+        if value != self.value:
+            self.value, self.pending = value, True
+
+    def drag(self, value):
+        self.set(value)
+        self.idle()
+
+    def idle(self):
+        if self.pending:
+            self.pending = False
+            self.command(str(self.value))
+
+class FakeViewer:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, **control):
+        self.sent.append(control)
+
+class FakeLabel:
+    def config(self, text):
+        self.text = text
+
+def test_viewer_sends_only_user_slider_moves():
+    g = gui.SimulationGUI.__new__(gui.SimulationGUI)
+    g.viewer, g._slider_set, g.causality_label = FakeViewer(), None, FakeLabel()
+    g.causality_slider = FakeSlider(g.update_causality)
+    # The default params on start-up, then the publisher's value from the first frame
+    g._set_causality_slider(0.8)
+    g._set_causality_slider(0.3)
+    g.causality_slider.idle()
+    assert g.viewer.sent == [] and g.causality_label.text == "Causality Strength: 0.30"
+    g.causality_slider.drag(0.55)
+    g._set_causality_slider(0.4)
+    g.causality_slider.drag(0.3)
+    assert g.viewer.sent == [{'causality_strength': 0.55}, {'causality_strength': 0.3}]
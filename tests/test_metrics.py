@@ -0,0 +1,63 @@
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, LOG_OFF
+from qcsim.cli import main
+from qcsim.metrics import MetricsSink, STEP_FIELDS, read_metrics
+
+def _columns(rows):
+    return {name: np.array([row[name] for row in rows]) for name in STEP_FIELDS}
+
+@pytest.mark.parametrize('fmt,name', (('csv', 'm.csv'), ('columns', 'm')))
+def test_stream_matches_step_data_with_bounded_ring(tmp_path, fmt, name):
+    path = str(tmp_path / name)
+    sim = FinalGridSimulator(size=5, seed=2, log_level=LOG_OFF, metrics=MetricsSink(path, fmt, flush_every=7,
+                                                                                   ring_size=10))
+    reference = FinalGridSimulator(size=5, seed=2, log_level=LOG_OFF)
+    for _ in range(25):
+        sim.step()
+        reference.step()
+    sim.close()
+    assert len(sim.step_data) == 10
+    assert list(sim.step_data) == reference.step_data[-10:]
+    streamed = read_metrics(path)
+    expected = _columns(reference.step_data)
+    for field in STEP_FIELDS:
+        np.testing.assert_array_equal(streamed[field], expected[field])
+
+@pytest.mark.parametrize('fmt,name', (('csv', 'm.csv'), ('columns', 'm')))
+def test_resume_rows_cuts_back_and_append_keeps(tmp_path, fmt, name):
+    path = str(tmp_path / name)
+    sink = MetricsSink(path, fmt)
+    sim = FinalGridSimulator(size=4, seed=1, log_level=LOG_OFF, metrics=sink)
+    for _ in range(8):
+        sim.step()
+    sim.close()
+    MetricsSink(path, fmt, resume_rows=5).close()
+    assert len(read_metrics(path)['step']) == 5
+    appended = MetricsSink(path, fmt, append=True)
+    assert appended.rows_written == 5
+    appended.append(dict(sim.step_data[-1]))
+    appended.close()
+    assert read_metrics(path)['step'].tolist() == [1, 2, 3, 4, 5, 8]
+
+def test_resuming_a_checkpoint_without_metrics_appends_to_the_stream(tmp_path, capsys):
+    ck, stream = str(tmp_path / 'run.ckpt'), str(tmp_path / 'metrics.csv')
+    common = ['run', '--size', '5', '--seed', '3', '--checkpoint', ck]
+    main(common + ['--steps', '4', '--metrics', stream])
+    main(common + ['--steps', '6', '--resume'])
+    # The checkpoint at step 6 has no stream attached; attaching one now must not wipe it
+    main(common + ['--steps', '9', '--resume', '--metrics', stream])
+    assert read_metrics(stream)['step'].tolist() == [1, 2, 3, 4, 7, 8, 9]
+
+def test_failed_export_still_closes_the_simulator(tmp_path, capsys):
+    name = f"qcsim-test-{os.getpid()}"
+    code = main(['run', '--size', '5', '--seed', '3', '--steps', '10', '--publish', name,
+                 '--out', str(tmp_path / 'missing' / 'run.csv')])
+    assert code == 1
+    # Closing the simulator closes its frame bus, which removes the shared-memory block
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from qcsim import FinalGridSimulator, LOG_OFF
+from qcsim.profiling import PhaseProfiler
+
+def test_laps_charge_time_to_phases():
+    prof = PhaseProfiler(window=4)
+    for _ in range(10):
+        prof.begin()
+        time.sleep(0.002)
+        prof.lap('slow')
+        prof.lap('fast')
+    summary = prof.summary()
+    assert summary['slow']['count'] == summary['fast']['count'] == 10
+    assert prof.phases['slow'].window()[0].size == 4  # ring of the last `window` samples
+    assert summary['slow']['mean_ms'] >= 2.0 > summary['fast']['mean_ms']
+    assert summary['slow']['p50_ms'] <= summary['slow']['p99_ms']
+    assert sum(row['share'] for row in summary.values()) == pytest.approx(1.0)
+    assert 'slow' in prof.format_summary()
+    prof.reset()
+    assert prof.summary() == {} and prof.format_summary() == "No profile samples"
+
+def test_simulator_laps_every_phase_each_step():
+    prof = PhaseProfiler()
+    sim = FinalGridSimulator(size=8, seed=0, log_level=LOG_OFF, profiler=prof)
+    for _ in range(5):
+        sim.step()
+    counts = {name: row['count'] for name, row in prof.summary().items()}
+    assert counts and set(counts.values()) == {5}
+
+def test_summary_and_reset_are_safe_while_another_thread_laps():
+    prof = PhaseProfiler(window=8)
+    stop = threading.Event()
+    errors = []
+
+    def lapper():
+        try:
+            k = 0
+            prof.begin()
+            while not stop.is_set():
+                prof.lap(f"phase{k % 5000}")  # new keys keep growing the table
+                k += 1
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    worker = threading.Thread(target=lapper)
+    worker.start()
+    try:
+        deadline = time.perf_counter() + 1.0
+        rounds = 0
+        while time.perf_counter() < deadline:
+            prof.summary()
+            prof.format_summary()
+            rounds += 1
+            if rounds % 20 == 0:
+                prof.reset()
+    finally:
+        stop.set()
+        worker.join()
+    assert not errors
+    assert rounds > 0
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationParams, LOG_OFF
+from qcsim.regions import RegionMap
+
+def test_square_matches_the_classic_layout():
+    regions = RegionMap.square(5)
+    expected = np.zeros((5, 5), dtype=bool)
+    expected[1:4, 1:4] = True
+    np.testing.assert_array_equal(regions.agent_mask, expected)
+    assert RegionMap.square(2).labels.tolist() == [[0, 0], [0, 1]]  # clipped to the grid
+
+def test_paint_resolve_and_defaults_fall_through():
+    regions = RegionMap.background(6)
+    hot = regions.paint(np.s_[0:2, 0:2], obs_prob=0.5)
+    plain = regions.paint(np.s_[4:, 4:])
+    assert (hot, plain, regions.count) == (1, 2, 3)
+    params = SimulationParams(agent_obs_prob=0.2, bg_obs_prob=0.01, cbr_strength=3.0)
+    values = regions.resolve(params)
+    assert values['obs_prob'][0, 0] == 0.5
+    assert values['obs_prob'][5, 5] == 0.2  # NaN entry: agent default
+    assert values['obs_prob'][3, 3] == 0.01  # background default
+    assert np.all(values['cbr_strength'] == 3.0)
+    regions.set_params(hot, obs_prob=None)
+    assert regions.resolve(params)['obs_prob'][0, 0] == 0.2
+    with pytest.raises(ValueError):
+        regions.set_params(hot, temperature=1.0)
+    with pytest.raises(ValueError):
+        RegionMap(np.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        RegionMap(-np.ones((2, 2)))
+
+def test_parameter_changes_reach_unset_entries_mid_run():
+    regions = RegionMap.background(4)
+    regions.paint(np.s_[:2, :], obs_prob=0.9)
+    sim = FinalGridSimulator(size=4, seed=0, log_level=LOG_OFF, regions=regions)
+    sim.set_params(bg_obs_prob=0.3)
+    assert np.all(sim.obs_prob[:2] == 0.9) and np.all(sim.obs_prob[2:] == 0.3)
+    groups = {prob: cells.tolist() for cells, prob in sim._obs_groups}
+    assert groups == {0.3: list(range(8, 16)), 0.9: list(range(8))}
+
+def test_boundary_segments_outline_each_region():
+    regions = RegionMap.background(4)
+    regions.paint(np.s_[1:3, 1:3])
+    segments = regions.boundary_segments()
+    assert segments.shape == (8, 2, 2)  # a 2x2 block: 8 unit edges
+    xs, ys = segments[..., 0], segments[..., 1]
+    assert xs.min() == ys.min() == 0.5 and xs.max() == ys.max() == 2.5
+    # Agents on the grid edge are closed along it
+    assert len(RegionMap(np.ones((3, 3), dtype=int)).boundary_segments()) == 12
+    assert len(RegionMap.background(3).boundary_segments()) == 0
+
+def test_save_load_round_trip(tmp_path):
+    regions = RegionMap.background(5)
+    regions.paint(np.s_[0, :], obs_prob=0.4, resolve_frac=0.7)
+    regions.paint(np.s_[4, 4], label=5, cbr_strength=1.5)
+    path = str(tmp_path / 'regions.npz')
+    regions.save(path)
+    loaded = RegionMap.load(path)
+    np.testing.assert_array_equal(loaded.labels, regions.labels)
+    assert loaded.count == regions.count == 6
+    for name, row in regions.table.items():
+        np.testing.assert_array_equal(loaded.table[name], row)
+    params = SimulationParams()
+    for name, values in regions.resolve(params).items():
+        np.testing.assert_array_equal(loaded.resolve(params)[name], values)
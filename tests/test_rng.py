@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationRNG, LOG_OFF
+from qcsim.rng import EVENTS_HIGH, EVENTS_LOW
+
+def _run(rng, steps=15, size=6):
+    sim = FinalGridSimulator(size=size, rng=rng, log_level=LOG_OFF)
+    for _ in range(steps):
+        sim.step()
+    return sim
+
+@pytest.mark.parametrize('block_steps', (1, 4, 7))
+def test_seed_and_block_size_fix_the_run(block_steps):
+    a = _run(SimulationRNG(21, block_steps=block_steps))
+    b = _run(SimulationRNG(21, block_steps=block_steps))
+    assert a.step_data == b.step_data
+    np.testing.assert_array_equal(a.local_temperature, b.local_temperature)
+    assert _run(SimulationRNG(22, block_steps=block_steps)).step_data != a.step_data
+
+def test_block_size_does_not_change_the_run():
+    a = _run(SimulationRNG(21, block_steps=1))
+    b = _run(SimulationRNG(21, block_steps=7))
+    assert a.step_data == b.step_data
+    np.testing.assert_array_equal(a.local_temperature, b.local_temperature)
+    np.testing.assert_array_equal(a.entropy_fragments, b.entropy_fragments)
+
+def test_state_round_trip_mid_block():
+    rng = SimulationRNG(5, block_steps=4)
+    for _ in range(6):
+        rng.draws((3, 3))
+    rng.sample_cells('black_hole', 9, 0.5)
+    copy = SimulationRNG.from_state(*rng.get_state())
+    for _ in range(5):
+        a, b = rng.draws((3, 3)), copy.draws((3, 3))
+        np.testing.assert_array_equal(a.events, b.events)
+        np.testing.assert_array_equal(a.noise_temp, b.noise_temp)
+        np.testing.assert_array_equal(a.noise_frag, b.noise_frag)
+    np.testing.assert_array_equal(rng.sample_cells('observation', 9, 0.5), copy.sample_cells('observation', 9, 0.5))
+
+def test_draw_ranges_and_spawned_streams():
+    children = SimulationRNG(1, block_steps=3).spawn(2)
+    first = [child.draws((50, 50)) for child in children]
+    assert children[0].block_steps == 3
+    assert not np.array_equal(first[0].noise_temp, first[1].noise_temp)
+    d = first[0]
+    assert d.events.min() >= EVENTS_LOW and d.events.max() <= EVENTS_HIGH
+    assert d.noise_temp.min() >= -1 and d.noise_temp.max() < 1
+    with pytest.raises(ValueError):
+        SimulationRNG(0, block_steps=0)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationParams, SimulationRNG, LOG_OFF
+
+@pytest.mark.parametrize('n, prob', [(50, 0.3), (400, 0.01)])
+def test_sampled_cells_are_independent_bernoulli_rolls(n, prob):
+    rng = SimulationRNG(11)
+    trials = 4000
+    hits = np.zeros(n)
+    counts = np.empty(trials)
+    for t in range(trials):
+        cells = rng.sample_cells('black_hole', n, prob)
+        assert np.all(np.diff(cells) > 0)  # ascending and distinct
+        hits[cells] += 1
+        counts[t] = cells.size
+    # Count per call ~ Binomial(n, prob); each cell hit with probability prob
+    se = np.sqrt(n * prob * (1 - prob) / trials)
+    assert abs(counts.mean() - n * prob) < 5 * se
+    assert counts.var() == pytest.approx(n * prob * (1 - prob), rel=0.15)
+    rate_se = np.sqrt(prob * (1 - prob) / trials)
+    assert np.all(np.abs(hits / trials - prob) < 5.5 * rate_se)
+
+def test_candidate_subsets_and_edge_probabilities():
+    rng = SimulationRNG(3)
+    candidates = np.array([2, 5, 7, 11, 13, 40])
+    seen = set()
+    for _ in range(200):
+        cells = rng.sample_cells('observation', candidates, 0.5)
+        assert np.all(np.diff(cells) > 0)
+        seen.update(cells.tolist())
+    assert seen == set(candidates.tolist())
+    np.testing.assert_array_equal(rng.sample_cells('observation', candidates, 1.0), candidates)
+    np.testing.assert_array_equal(rng.sample_cells('observation', 10, 2.0), np.arange(10))
+    assert rng.sample_cells('observation', 10, 0.0).size == 0
+    assert rng.sample_cells('observation', 10, -1.0).size == 0
+    assert rng.sample_cells('observation', 0, 0.5).size == 0
+    assert rng.sample_cells('observation', candidates[:0], 0.5).size == 0
+
+def test_simulator_event_rates_follow_the_probabilities():
+    params = SimulationParams(bh_prob=0.02, agent_obs_prob=0.0, bg_obs_prob=0.0)
+    sim = FinalGridSimulator(size=20, seed=9, log_level=LOG_OFF, params=params)
+    steps = 300
+    for _ in range(steps):
+        sim.step()
+    cells = 20 * 20 * steps
+    expected = cells * 0.02
+    assert abs(sim.bh_events - expected) < 5 * np.sqrt(expected)
+    assert all(row['observations_this_step'] == 0 for row in sim.step_data)
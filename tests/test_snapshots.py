@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationParams, SnapshotArchive, SnapshotRecorder, LOG_OFF
+
+PARAMS = SimulationParams(bh_prob=0.05, entanglement_prob=0.5)
+
+def _record(path, steps=20, every=3, flush_every=2):
+    sim = FinalGridSimulator(size=6, seed=4, log_level=LOG_OFF, params=PARAMS.replace(),
+                             snapshots=SnapshotRecorder(path, capacity=10, every=every, flush_every=flush_every))
+    frames = {}
+    for _ in range(steps):
+        _, temp, frag, obs, bh_locs, ent_locs = sim.step(copy=True)
+        if sim.step_count % every == 0:
+            frames[sim.step_count] = (temp, frag, obs, bh_locs, ent_locs)
+    return sim, frames
+
+def test_random_access_replay_matches_the_run(tmp_path):
+    path = str(tmp_path / 'snaps')
+    sim, frames = _record(path)
+    sim.close()
+    archive = SnapshotArchive(path)
+    assert len(archive) == len(frames) == 6
+    assert archive.steps.tolist() == sorted(frames)
+    for step in reversed(sorted(frames)):
+        frame = archive.frame(step)
+        temp, frag, obs, bh_locs, ent_locs = frames[step]
+        np.testing.assert_array_equal(frame.temperature, temp)
+        np.testing.assert_array_equal(frame.fragments, frag)
+        np.testing.assert_array_equal(frame.observations, obs)
+        assert frame.bh_locs == bh_locs
+        assert frame.ent_locs == ent_locs
+    # Steps between snapshots resolve to the one before
+    assert archive.frame(10).step == 9
+    with pytest.raises(KeyError):
+        archive.frame(2)
+    np.testing.assert_allclose(archive.totals('fragments'), [frames[s][1].sum() for s in sorted(frames)])
+
+def test_unclosed_archive_is_readable_up_to_the_last_flush(tmp_path):
+    path = str(tmp_path / 'snaps')
+    sim, frames = _record(path, steps=15, flush_every=2)
+    # 5 frames recorded, the index was last written after the 4th
+    assert len(SnapshotArchive(path)) == 4
+    sim.close()
+    assert len(SnapshotArchive(path)) == 5
+
+def test_full_archive_refuses_more_frames(tmp_path):
+    rec = SnapshotRecorder(str(tmp_path / 'snaps'), capacity=1)
+    rec.record(1, np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2)))
+    with pytest.raises(ValueError, match='full'):
+        rec.record(2, np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2)))
+    rec.close()
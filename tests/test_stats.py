@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from qcsim import FinalGridSimulator, SimulationParams, LOG_OFF
+from qcsim.stats import RunningStats, merge_stats
+
+PARAMS = SimulationParams(bh_prob=0.05)
+
+def _run(stats, steps=30, seed=2):
+    sim = FinalGridSimulator(size=6, seed=seed, log_level=LOG_OFF, params=PARAMS.replace(), stats=stats)
+    temps, frags, bh, obs = [], [], np.zeros(36, dtype=np.int64), np.zeros(36, dtype=np.int64)
+    for _ in range(steps):
+        sim.step()
+        ev = sim.last_events
+        np.add.at(bh, ev.black_holes, 1)
+        np.add.at(obs, ev.observations, 1)
+        if sim.step_count % stats.every == 0:
+            temps.append(sim.local_temperature.copy())
+            frags.append(sim.entropy_fragments.copy())
+    return np.array(temps), np.array(frags), bh.reshape(6, 6), obs.reshape(6, 6)
+
+def test_matches_the_stored_history():
+    stats = RunningStats(every=3)
+    temps, frags, bh, obs = _run(stats)
+    assert stats.samples == 10 and stats.steps == 30
+    for name, history in (('temperature', temps), ('fragments', frags)):
+        np.testing.assert_allclose(stats.mean[name], history.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(stats.variance(name), history.var(axis=0), rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(stats.variance(name, ddof=1), history.var(axis=0, ddof=1), rtol=1e-9, atol=1e-9)
+        np.testing.assert_array_equal(stats.min[name], history.min(axis=0))
+        np.testing.assert_array_equal(stats.max[name], history.max(axis=0))
+    assert bh.sum() > 0
+    np.testing.assert_array_equal(stats.counts['black_holes'], bh)
+    np.testing.assert_array_equal(stats.counts['observations'], obs)
+
+def test_merge_equals_one_pass_over_all_samples():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(100.0, 5.0, size=(40, 4, 4))
+    whole, parts = RunningStats(), [RunningStats() for _ in range(3)]
+    for step, x in enumerate(samples, 1):
+        whole.update(step, x, x * 2, black_holes=[step % 16])
+        parts[step % 3].update(step, x, x * 2, black_holes=[step % 16])
+    merged = merge_stats(parts)
+    assert (merged.samples, merged.steps) == (whole.samples, whole.steps) == (40, 40)
+    for name in ('temperature', 'fragments'):
+        np.testing.assert_allclose(merged.mean[name], whole.mean[name], rtol=1e-13)
+        np.testing.assert_allclose(merged.m2[name], whole.m2[name], rtol=1e-10)
+        np.testing.assert_array_equal(merged.min[name], whole.min[name])
+        np.testing.assert_array_equal(merged.max[name], whole.max[name])
+    np.testing.assert_array_equal(merged.counts['black_holes'], whole.counts['black_holes'])
+    # Merge order does not matter
+    reversed_merge = merge_stats(parts[::-1])
+    np.testing.assert_allclose(reversed_merge.m2['temperature'], merged.m2['temperature'], rtol=1e-12)
+
+def test_merge_rejects_other_shapes_and_ignores_empty():
+    a, b = RunningStats(), RunningStats()
+    a.update(1, np.ones((2, 2)), np.ones((2, 2)))
+    assert a.merge(RunningStats()) is a and a.samples == 1
+    b.update(1, np.ones((3, 3)), np.ones((3, 3)))
+    with pytest.raises(ValueError):
+        a.merge(b)
+
+def test_save_load_round_trip(tmp_path):
+    stats = RunningStats(every=2)
+    _run(stats, steps=10)
+    path = str(tmp_path / 'stats.npz')
+    stats.save(path)
+    loaded = RunningStats.load(path)
+    assert (loaded.every, loaded.samples, loaded.steps) == (2, 5, 10)
+    for name, a in stats.to_arrays().items():
+        np.testing.assert_array_equal(loaded.to_arrays()[name], a)
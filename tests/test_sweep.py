@@ -0,0 +1,83 @@
+import csv
+
+import pytest
+
+from qcsim.sweep import _truncate_unfinished, grid_points, run_sweep, task_id
+
+def _rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def _sorted_rows(path):
+    return sorted(_rows(path), key=lambda row: (row['task_id'], int(row['step'])))
+
+def _sweep(out, grid, seeds=(0, 1), **kwargs):
+    return run_sweep(grid_points(grid), list(seeds), str(out), size=4, steps=5, workers=2, progress=None, **kwargs)
+
+def test_resume_drops_rows_of_unfinished_tasks(tmp_path):
+    clean, out = tmp_path / 'clean.csv', tmp_path / 'out.csv'
+    grid = {'causality_strength': [0.2, 0.8]}
+    _sweep(clean, grid)
+    _sweep(out, grid, seeds=(0,))
+    # A crash mid-write: rows of a task that never made it into the manifest, then half a line
+    unfinished = task_id({'causality_strength': 0.2}, 1, 4, 5, 'open')
+    with open(out, 'a', encoding='utf-8') as f:
+        f.write(f'{unfinished},1,4,5,open,0.2,1,2,3,0,0,0,0,0\n{unfinished},1,4,5,open,0.2,2,2')
+    assert _sweep(out, grid) == 2
+    assert _sorted_rows(out) == _sorted_rows(clean)
+
+def test_truncation_reads_back_past_long_tails(tmp_path):
+    out = tmp_path / 'table.csv'
+    row = 'unfinished000000,0,' + '1' * 100 + '\n'
+    out.write_text('task_id,seed,x\nfinished00000000,0,1\n' + row * 5000 + 'unfinish', encoding='utf-8')
+    _truncate_unfinished(str(out), {'finished00000000'})
+    assert out.read_text(encoding='utf-8') == 'task_id,seed,x\nfinished00000000,0,1\n'
+    _truncate_unfinished(str(out), set())
+    assert out.read_text(encoding='utf-8') == 'task_id,seed,x\n'
+
+def test_new_parameter_columns_are_added_not_dropped(tmp_path):
+    out = tmp_path / 'out.csv'
+    _sweep(out, {'bh_prob': [0.02]}, seeds=(0,))
+    _sweep(out, {'diffusion_rate': [0.3, 0.5]}, seeds=(0,))
+    rows = _rows(out)
+    assert list(rows[0])[:7] == ['task_id', 'seed', 'size', 'steps', 'boundary', 'bh_prob', 'diffusion_rate']
+    first = {task_id({'bh_prob': 0.02}, 0, 4, 5, 'open')}
+    for row in rows:
+        if row['task_id'] in first:
+            assert (float(row['bh_prob']), float(row['diffusion_rate'])) == (0.02, 0.2)
+        else:
+            assert float(row['bh_prob']) == 0.01
+            assert float(row['diffusion_rate']) in (0.3, 0.5)
+    assert len(rows) == 3 * 5
+
+def test_foreign_table_is_rejected(tmp_path):
+    out = tmp_path / 'out.csv'
+    out.write_text('replica,step,total_entropy\n0,1,2.0\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='column layout'):
+        _sweep(out, {'bh_prob': [0.02]}, seeds=(0,))
+
+def test_points_spelling_out_defaults_are_not_rerun(tmp_path):
+    out = tmp_path / 'out.csv'
+    assert task_id({'bh_prob': 0.01}, 0, 4, 5, 'open') == task_id({}, 0, 4, 5, 'open')
+    assert _sweep(out, {'causality_strength': [0.8]}) == 2
+    # bh_prob=0.01 is the default: only the 0.02 tasks are new
+    assert _sweep(out, {'causality_strength': [0.8], 'bh_prob': [0.01, 0.02]}) == 2
+    rows = _rows(out)
+    assert len(rows) == 4 * 5
+    assert len({row['task_id'] for row in rows}) == 4
+
+def test_rows_record_size_steps_and_boundary(tmp_path):
+    out = tmp_path / 'out.csv'
+    _sweep(out, {'bh_prob': [0.02]}, seeds=(0,))
+    run_sweep(grid_points({'bh_prob': [0.02]}), [0], str(out), size=6, steps=3, boundary='periodic',
+              workers=1, progress=None)
+    rows = _rows(out)
+    assert len(rows) == 5 + 3
+    runs = {(row['size'], row['steps'], row['boundary']) for row in rows}
+    assert runs == {('4', '5', 'open'), ('6', '3', 'periodic')}
+
+def test_tables_without_run_columns_are_not_resumed(tmp_path):
+    out = tmp_path / 'out.csv'
+    out.write_text('task_id,seed,bh_prob,step,total_entropy\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='size, steps, boundary'):
+        _sweep(out, {'bh_prob': [0.02]}, seeds=(0,))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from qcsim import EnsembleSimulator, FinalGridSimulator, SimulationParams, LOG_OFF
+
+PARAMS = SimulationParams(bh_prob=0.05, entanglement_prob=0.5, entanglement_attempts=3, bg_obs_prob=0.05)
+
+def _run(tiles, threads=None, boundary='open', size=17, steps=25):
+    sim = FinalGridSimulator(size=size, seed=8, boundary=boundary, log_level=LOG_OFF, params=PARAMS.replace(),
+                             tiles=tiles, threads=threads)
+    for _ in range(steps):
+        sim.step()
+    sim.close()
+    return sim
+
+@pytest.mark.parametrize('boundary', ('open', 'periodic', 'reflecting'))
+@pytest.mark.parametrize('tiles,threads', ((2, None), (5, 2), (40, 3)))
+def test_tiled_runs_match_untiled(tiles, threads, boundary):
+    ref = _run(1, boundary=boundary)
+    sim = _run(tiles, threads, boundary=boundary)
+    assert sim.step_data == ref.step_data
+    np.testing.assert_array_equal(sim.local_temperature, ref.local_temperature)
+    np.testing.assert_array_equal(sim.entropy_fragments, ref.entropy_fragments)
+    np.testing.assert_array_equal(sim.observation_count, ref.observation_count)
+
+def test_bands_cover_the_grid():
+    sim = FinalGridSimulator(size=10, tiles=4, log_level=LOG_OFF)
+    bands = sim.bands
+    assert bands[0][0] == 0 and bands[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(bands, bands[1:]))
+    assert len(FinalGridSimulator(size=3, tiles=8, log_level=LOG_OFF).bands) == 3
+
+def test_tiled_ensemble_matches_untiled():
+    a = EnsembleSimulator(4, size=9, seed=3, tiles=1).run(10)
+    b = EnsembleSimulator(4, size=9, seed=3, tiles=3).run(10)
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
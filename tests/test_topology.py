@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from qcsim import EnsembleSimulator, FinalGridSimulator, GraphTopology, SimulationParams, LOG_OFF
+from qcsim.cache import run_key
+from qcsim.diffusion import DiffusionKernel
+from qcsim.topology import _scipy_sparse
+
+# Busy enough that every phase fires on a 3x3 grid
+PARAMS = SimulationParams(bh_prob=0.3, agent_obs_prob=0.5, bg_obs_prob=0.5, entanglement_prob=1.0,
+                          entanglement_attempts=2)
+PATH = ([0, 1, 2, 3], [1, 2, 3, 4])  # 5 nodes on a 3x3 grid: cells 5..8 are padding
+
+def _path(**kwargs):
+    return GraphTopology.from_edges(*PATH, **kwargs)
+
+@pytest.mark.parametrize('boundary', ('open', 'periodic', 'reflecting'))
+@pytest.mark.parametrize('use_scipy', (True, False))
+def test_lattice_graph_matches_the_stencil(boundary, use_scipy):
+    if use_scipy and _scipy_sparse() is None:
+        pytest.skip("scipy not installed")
+    field = np.random.default_rng(0).random((2, 7, 7))
+    graph = GraphTopology.lattice(7, boundary, use_scipy=use_scipy)
+    stencil = DiffusionKernel(7, boundary)
+    np.testing.assert_allclose(graph.apply(field, 0.2), stencil.apply(field, 0.2), rtol=1e-14)
+    np.testing.assert_allclose(graph.apply(field, 0.2, rows=(2, 5)), stencil.apply(field, 0.2, rows=(2, 5)),
+                               rtol=1e-14)
+
+def test_padding_cells_stay_inactive():
+    topo = _path()
+    assert (topo.size, topo.nodes, topo.embedded) == (3, 5, False)
+    sim = FinalGridSimulator(size=3, seed=1, log_level=LOG_OFF, params=PARAMS.replace(), topology=topo)
+    assert not sim.agent_mask.any()  # no square agent on arbitrary node ids
+    padding = np.arange(9) >= 5
+    events = {'black_holes': set(), 'observations': set(), 'pairs': set()}
+    for _ in range(200):
+        _, temp, frag, _, _, _ = sim.step()
+        ev = sim.last_events
+        events['black_holes'].update(ev.black_holes.tolist())
+        events['observations'].update(ev.observations.tolist())
+        events['pairs'].update(ev.entanglements_created.ravel().tolist())
+        # The totals are taken before diffusion, from the fields now in the back buffers
+        before = (sim._temp_back, sim._frag_back)
+        for field in (temp, frag, *before, sim.postponed_buffer, sim.observation_count):
+            assert not field.reshape(-1)[padding].any()
+        assert np.all(sim.entangled_with[padding] == -1)
+        assert sim.total_temp_history[-1] == pytest.approx(before[0].reshape(-1)[:5].sum(), rel=1e-12)
+        assert sim.total_entropy_history[-1] == pytest.approx(before[1].reshape(-1)[:5].sum(), rel=1e-12)
+    for name, cells in events.items():
+        assert cells == set(range(5)), name
+
+def test_ensemble_padding_and_entanglement_range():
+    params = PARAMS.replace(entanglement_range=2)
+    sim = EnsembleSimulator(3, size=3, seed=2, params=params, topology=_path())
+    for _ in range(50):
+        sim.step()
+        pairs = sim.last_events.entanglements_created
+        assert np.all(pairs % 9 < 5)
+        assert np.all(pairs[:, 0] // 9 == pairs[:, 1] // 9)
+    assert not sim.local_temperature[:, 1:, 2:].any() and not sim.local_temperature[:, 2, :].any()
+
+def test_nodes_are_part_of_the_identity():
+    topo = _path()
+    assert GraphTopology.from_arrays(topo.to_arrays()).nodes == 5
+    bigger = _path(nodes=7)
+    assert bigger.size == 3 and bigger.nodes == 7
+    np.testing.assert_array_equal(bigger.indptr, topo.indptr)  # padding is isolated either way
+    assert run_key(3, 10, 1, topology=topo) != run_key(3, 10, 1, topology=bigger)
+    with pytest.raises(ValueError):
+        _path(nodes=4)
+    with pytest.raises(ValueError):
+        _path(size=2)